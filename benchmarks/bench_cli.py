@@ -0,0 +1,87 @@
+"""
+Cli parsing and command dispatch on large clis: `docopt_handler` vs
+`argparse_handler` with many subcommands, and `docopt_command_finder`
+with large command modules.
+
+    poetry run python benchmarks/bench_cli.py
+"""
+from argparse import ArgumentParser
+from types import ModuleType
+from types import SimpleNamespace
+from common import measure
+from common import report
+from kapow.handlers.argparse import argparse_handler
+from kapow.handlers.docopt import docopt_command_finder
+from kapow.handlers.docopt import docopt_handler
+
+SIZES = (10, 100)
+
+
+def docopt_docs(commands: int) -> str:
+    usage = "\n".join(
+        f"  bench command-{i} <name> [--count=<n>] [--debug]" for i in range(commands)
+    )
+    return (
+        "bench v0.1.0\n\n"
+        "Usage:\n"
+        f"{usage}\n"
+        "  bench --help\n"
+        "  bench --version\n\n"
+        "Options:\n"
+        "  --count=<n>    Repeat count [default: 1].\n"
+        "  --debug        Run in debug mode.\n"
+        "  -h --help      Show this help message.\n"
+        "  -v --version   Show app version.\n"
+    )
+
+
+def argparse_parser(commands: int) -> ArgumentParser:
+    parser = ArgumentParser(prog="bench")
+    subparsers = parser.add_subparsers()
+    for i in range(commands):
+        sub_parser = subparsers.add_parser(f"command-{i}")
+        sub_parser.add_argument("name")
+        sub_parser.add_argument("--count", type=int, default=1)
+        sub_parser.add_argument("--debug", action="store_true")
+        sub_parser.set_defaults(command=f"command_{i}")
+    return parser
+
+
+def command_module(commands: int) -> ModuleType:
+    module = ModuleType("bench_commands")
+    for i in range(commands):
+        exec(f"def command_{i}(ctx):\n    pass\n", module.__dict__)
+    return module
+
+
+def run() -> dict:
+    results = {}
+    for size in SIZES:
+        argv = [f"command-{size - 1}", "buddy", "--count=3"]
+        app = SimpleNamespace(name="bench", version="0.1.0", cli_args=argv)
+
+        docopt_parse = docopt_handler(docopt_docs(size))
+        results[f"parse/docopt/{size} commands"] = measure(
+            lambda: docopt_parse(app, SimpleNamespace())
+        )
+        argparse_parse = argparse_handler(argparse_parser(size))
+        results[f"parse/argparse/{size} commands"] = measure(
+            lambda: argparse_parse(app, SimpleNamespace())
+        )
+        results[f"build/argparse/{size} commands"] = measure(
+            lambda: argparse_parser(size)
+        )
+
+        ctx = SimpleNamespace()
+        docopt_parse(app, ctx)
+        module = command_module(size)
+        results[f"dispatch/first run/{size} commands"] = measure(
+            lambda: docopt_command_finder(module)(app, ctx)
+        )
+        finder = docopt_command_finder(module)
+        results[f"dispatch/indexed/{size} commands"] = measure(lambda: finder(app, ctx))
+    return results
+
+
+if __name__ == "__main__":
+    report("cli parsing and dispatch", run())
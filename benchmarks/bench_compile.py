@@ -0,0 +1,51 @@
+"""
+Calls per second of an application's main function, before and after
+`Application.compile()`. The handlers do no work, so this measures the
+pipeline's own per-call overhead.
+
+    poetry run python benchmarks/bench_compile.py
+"""
+from common import measure
+from common import report
+from kapow import Application
+
+
+def noop_handler(app, ctx):
+    return app, ctx
+
+
+def command(ctx):
+    pass
+
+
+def make_app() -> Application:
+    return Application(
+        "bench",
+        "0.1.0",
+        cli_handler=noop_handler,
+        env_handler=noop_handler,
+        appdir_handler=noop_handler,
+        config_handler=noop_handler,
+        context_handler=noop_handler,
+        logging_config_handler=noop_handler,
+        command_func=command,
+    )
+
+
+def run() -> dict:
+    app = make_app()
+    main = app.main
+    compiled = make_app().compile()
+    return {
+        "app.main()": measure(lambda: app.main()),
+        "main = app.main; main()": measure(main),
+        "app.compile()()": measure(compiled),
+    }
+
+
+if __name__ == "__main__":
+    results = run()
+    report("main() overhead", results)
+    print()
+    for name, result in results.items():
+        print(f"  {name:<24} {1 / result['best']:12,.0f} calls/s")
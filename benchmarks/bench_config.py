@@ -0,0 +1,89 @@
+"""
+Compare the tomlkit and tomllib config parsers on small and large config
+files, time `kapow.schema` validation of the parsed configs, and time
+`kapow.layers` merging three config files with and without its cache.
+
+    poetry run python benchmarks/bench_config.py
+"""
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from common import measure
+from common import report
+from kapow import layers
+from kapow.handlers.core import tomlkit_parser
+from kapow.handlers.core import tomllib_parser
+from kapow.schema import Field
+from kapow.schema import Schema
+
+SMALL_CONFIG = """
+# This is an example toml configuration file.
+[app]
+debug = true
+wrk_dir = "/home/user/.local/share/app/wrk_dir"
+"""
+
+
+def large_config(tables: int = 100, keys: int = 10) -> str:
+    lines = []
+    for i in range(tables):
+        lines.append(f"[section_{i}]")
+        for j in range(keys):
+            lines.append(f"# comment {j}")
+            lines.append(f"key_{j} = {j}")
+            lines.append(f'name_{j} = "value {j}"')
+            lines.append(f"list_{j} = [1, 2, 3]")
+    return "\n".join(lines)
+
+
+SMALL_SCHEMA = {"app": {"debug": Field(bool, default=False), "wrk_dir": str}}
+
+
+def large_schema(tables: int = 100, keys: int = 10) -> dict:
+    return {
+        f"section_{i}": {
+            **{f"key_{j}": int for j in range(keys)},
+            **{f"name_{j}": str for j in range(keys)},
+            **{f"list_{j}": [int] for j in range(keys)},
+        }
+        for i in range(tables)
+    }
+
+
+def run() -> dict:
+    results = {}
+    for size, content, spec in (
+        ("small", SMALL_CONFIG, SMALL_SCHEMA),
+        ("large", large_config(), large_schema()),
+    ):
+        for name, parser in (("tomlkit", tomlkit_parser), ("tomllib", tomllib_parser)):
+            results[f"{size}/{name}"] = measure(lambda: parser(content))
+        results[f"{size}/schema compile"] = measure(lambda: Schema(spec))
+        schema = Schema(spec)
+        config = tomllib_parser(content)
+        results[f"{size}/schema validate"] = measure(lambda: schema(config))
+
+    with TemporaryDirectory() as tmpdir:
+        files = {}
+        for layer in layers.FILE_LAYERS:
+            files[layer] = Path(tmpdir, f"{layer}.toml")
+            files[layer].write_text(SMALL_CONFIG)
+        cache_file = Path(tmpdir, "layers.cache")
+        overlays = {"env": {"app": {"debug": False}}}
+
+        def load(cached):
+            return layers.load(
+                files,
+                overlays,
+                layers.LAYERS,
+                tomllib_parser,
+                cache_file=cache_file if cached else None,
+            )
+
+        results["layers/uncached"] = measure(lambda: load(False))
+        load(True)
+        results["layers/cached"] = measure(lambda: load(True))
+    return results
+
+
+if __name__ == "__main__":
+    report("config parsers", run())
@@ -0,0 +1,65 @@
+"""
+Log throughput of the default logging setup, with the handlers called
+directly on the logging thread and through `logging_config_factory(queue=True)`.
+
+"calling thread" is the time the application spends in log calls,
+"drained" includes waiting for the queue listener to finish writing.
+
+    poetry run python benchmarks/bench_logging.py
+"""
+import contextlib
+import logging
+import os
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from kapow import logqueue
+from kapow.handlers.core import logging_config_factory
+
+RECORDS = 20_000
+
+
+def configure(tmpdir: str, queue: bool) -> SimpleNamespace:
+    app = SimpleNamespace(name="bench", context_class=SimpleNamespace)
+    ctx = SimpleNamespace(
+        dirs=SimpleNamespace(app_home=Path(tmpdir), log_dir=Path(tmpdir)),
+        files=SimpleNamespace(),
+    )
+    logging_config_factory(queue=queue)(app, ctx)
+    return app
+
+
+def log_records(app: SimpleNamespace) -> dict:
+    log = logging.getLogger(app.name)
+    start = time.perf_counter()
+    for i in range(RECORDS):
+        log.info("record %s", i)
+    calling = time.perf_counter() - start
+    logqueue.flush(app)
+    drained = time.perf_counter() - start
+    return {"calling thread": calling, "drained": drained}
+
+
+def run() -> dict:
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, queue in (("direct", False), ("queue", True)):
+            with TemporaryDirectory() as tmpdir:
+                app = configure(tmpdir, queue)
+                try:
+                    results[name] = log_records(app)
+                finally:
+                    logqueue.stop(app)
+                    logging.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    print(f"\nlogging {RECORDS:,} records")
+    for name, result in run().items():
+        for label, seconds in result.items():
+            print(
+                f"  {name:<7} {label:<15} {seconds * 1000:9.1f} ms"
+                f"  {RECORDS / seconds:12,.0f} records/s"
+            )
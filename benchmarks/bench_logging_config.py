@@ -0,0 +1,47 @@
+"""
+Compare configuring logging from the default ini file with `fileConfig`,
+with the compiled `dictConfig` dictionary, and the in-process fast path
+taken when that configuration is already applied.
+
+    poetry run python benchmarks/bench_logging_config.py
+"""
+import logging
+import logging.config
+from importlib.resources import files
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from common import measure
+from common import report
+from kapow import logconfig
+from kapow import resources
+
+
+def run() -> dict:
+    results = {}
+    with TemporaryDirectory() as tmpdir:
+        ini_file = Path(tmpdir, "bench.logging.ini")
+        ini_file.write_text(
+            files(resources)
+            .joinpath("logging.ini")
+            .read_text()
+            .format(appname="bench", logfile=Path(tmpdir, "bench.logs.txt"))
+        )
+        config = logconfig.compile_ini(ini_file)
+
+        results["fileConfig"] = measure(
+            lambda: logging.config.fileConfig(ini_file), number=200
+        )
+        results["compile_ini"] = measure(
+            lambda: logconfig.compile_ini(ini_file), number=200
+        )
+        results["dictConfig"] = measure(
+            lambda: logging.config.dictConfig(config), number=200
+        )
+        logconfig.mark_applied(config)
+        results["already applied"] = measure(lambda: logconfig.applied(config))
+        logging.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    report("logging setup", run())
@@ -0,0 +1,145 @@
+"""
+Startup cost of a kapow application: `import kapow`, `Application(...)`
+construction and each default handler.
+
+"cold" runs start from nothing: `import kapow` imports a fresh copy of the
+package that has no bytecode yet, and the pipeline creates its app
+directories, config and logging files. "warm" runs reuse the bytecode and
+the files created by an earlier run. "light" runs use a command declared
+with `requires()`, which skips every stage after the cli handler.
+
+The script exits with 1 when the warm `import kapow` is over its budget.
+
+    poetry run python benchmarks/bench_startup.py
+"""
+import logging
+import os
+import shutil
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from common import TempAppDirs
+from common import measure
+from common import report
+from common import summarize
+from kapow import Application
+from kapow.spec import requires
+
+ROOT = Path(__file__).parent.parent
+REPEAT = 5
+# The cumulative `python -X importtime` budget for a warm `import kapow`, in
+# milliseconds. Override with KAPOW_IMPORT_BUDGET_MS on slow machines.
+IMPORT_BUDGET_MS = float(os.environ.get("KAPOW_IMPORT_BUDGET_MS", 150))
+
+
+def copy_kapow(target: str) -> str:
+    """
+    Copy the kapow package, without its bytecode, to `target`.
+    """
+    shutil.copytree(
+        Path(ROOT, "kapow"),
+        Path(target, "kapow"),
+        ignore=shutil.ignore_patterns("__pycache__"),
+    )
+    return target
+
+
+def import_time(path: str) -> float:
+    """
+    Seconds `import kapow` takes in a fresh interpreter, from `-X importtime`.
+    """
+    env = dict(os.environ, PYTHONPATH=path)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import kapow"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    for line in result.stderr.splitlines():
+        _, _, rest = line.partition("import time:")
+        fields = rest.split("|")
+        if len(fields) == 3 and fields[2].strip() == "kapow":
+            return int(fields[1]) / 1_000_000
+    raise RuntimeError("kapow was not imported")
+
+
+def bench_import() -> dict:
+    cold = []
+    for _ in range(REPEAT):
+        with TemporaryDirectory() as tmpdir:
+            cold.append(import_time(copy_kapow(tmpdir)))
+    with TemporaryDirectory() as tmpdir:
+        import_time(copy_kapow(tmpdir))
+        warm = [import_time(tmpdir) for _ in range(REPEAT)]
+    return {"import kapow/cold": summarize(cold), "import kapow/warm": summarize(warm)}
+
+
+def command(ctx):
+    pass
+
+
+@requires()
+def light_command(ctx):
+    pass
+
+
+def make_app(root: str, command_func=command) -> Application:
+    app = Application("bench", "0.1.0", command_func=command_func)
+    app.initialize(cli_args=["run"], appdirs_class=TempAppDirs(root))
+    return app
+
+
+def stage_timings(roots, command_func=command) -> dict:
+    samples = defaultdict(list)
+    for root in roots:
+        result = make_app(root, command_func).main()
+        for stage, seconds in result.timings.items():
+            samples[stage].append(seconds)
+        samples["total"].append(sum(result.timings.values()))
+    return {stage: summarize(times) for stage, times in samples.items()}
+
+
+def bench_pipeline() -> dict:
+    results = {}
+    with TemporaryDirectory() as tmpdir:
+        cold_roots = [Path(tmpdir, f"cold-{i}") for i in range(REPEAT)]
+        for stage, result in stage_timings(cold_roots).items():
+            results[f"pipeline/cold/{stage}"] = result
+
+        warm_root = Path(tmpdir, "warm")
+        make_app(warm_root).main()
+        for stage, result in stage_timings([warm_root] * REPEAT).items():
+            results[f"pipeline/warm/{stage}"] = result
+
+        light_roots = [Path(tmpdir, f"light-{i}") for i in range(REPEAT)]
+        for stage, result in stage_timings(light_roots, light_command).items():
+            results[f"pipeline/light/{stage}"] = result
+        logging.shutdown()
+    return results
+
+
+def run() -> dict:
+    results = bench_import()
+    results["Application(...)"] = measure(
+        lambda: Application("bench", "0.1.0", command_func=command)
+    )
+    results.update(bench_pipeline())
+    return results
+
+
+def check_import_budget(results: dict) -> bool:
+    best_ms = results["import kapow/warm"]["best"] * 1000
+    if best_ms < IMPORT_BUDGET_MS:
+        return True
+    print(f"import kapow took {best_ms:.1f}ms, budget is {IMPORT_BUDGET_MS:.1f}ms")
+    return False
+
+
+if __name__ == "__main__":
+    results = run()
+    report("startup", results)
+    sys.exit(0 if check_import_budget(results) else 1)
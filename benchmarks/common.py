@@ -0,0 +1,79 @@
+import timeit
+from pathlib import Path
+from typing import Callable
+from typing import List
+
+
+def measure(func: Callable, number: int = 0, repeat: int = 5) -> dict:
+    """
+    Time `func`, returning the best and mean time per call in seconds.
+
+    :param func: zero argument callable to time.
+    :param number: calls per repeat, or 0 to pick a number automatically.
+    :param repeat: number of repeats.
+    :return: dict of results
+    """
+    timer = timeit.Timer(func)
+    if not number:
+        number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "best": min(runs),
+        "mean": sum(runs) / len(runs),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def report(title: str, results: dict):
+    """
+    Print a table of `measure` results.
+    """
+    print(f"\n{title}")
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        print(
+            f"  {name:<{width}}  {result['best'] * 1000:10.3f} ms best"
+            f"  {result['mean'] * 1000:10.3f} ms mean  ({result['number']} loops)"
+        )
+
+
+class TempAppDirs:
+    """
+    An `appdirs_class` that keeps every application directory under `root`.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def __call__(self, name):
+        self.name = name
+        return self
+
+    @property
+    def user_data_dir(self):
+        return Path(self.root, self.name)
+
+    @property
+    def user_log_dir(self):
+        return Path(self.root, self.name, "logs")
+
+    @property
+    def user_cache_dir(self):
+        return Path(self.root, "cache", self.name)
+
+    @property
+    def user_name(self):
+        return "benchuser"
+
+
+def summarize(samples: List[float]) -> dict:
+    """
+    Summarize a list of single-call times in `measure`'s format.
+    """
+    return {
+        "best": min(samples),
+        "mean": sum(samples) / len(samples),
+        "number": 1,
+        "repeat": len(samples),
+    }
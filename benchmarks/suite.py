@@ -0,0 +1,124 @@
+"""
+Run every benchmark and write the results to a JSON file, optionally
+comparing them with an earlier run.
+
+    poetry run python benchmarks/suite.py --output results.json
+    poetry run python benchmarks/suite.py --compare baseline.json --threshold 1.25
+
+The JSON file holds the environment the benchmarks ran in, and the best
+and mean seconds per call of every benchmark, keyed "<suite>/<benchmark>".
+With `--compare` the script exits with status 1 when any benchmark's best
+time is more than `threshold` times the baseline's.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from importlib import import_module
+from typing import Dict
+from common import report
+
+SUITES = [
+    "bench_startup",
+    "bench_cli",
+    "bench_config",
+    "bench_logging_config",
+    "bench_logging",
+    "bench_compile",
+]
+
+
+def normalize(results: dict) -> Dict[str, dict]:
+    """
+    Flatten a suite's results into {name: {"best": seconds, ...}}. Results
+    that are a plain number of seconds (or nested dicts of them) are
+    recorded as their best time.
+    """
+    flat = {}
+    for name, result in results.items():
+        if isinstance(result, dict) and "best" in result:
+            flat[name] = result
+        elif isinstance(result, dict):
+            for sub_name, sub_result in normalize(result).items():
+                flat[f"{name}/{sub_name}"] = sub_result
+        else:
+            flat[name] = {"best": result, "mean": result, "number": 1, "repeat": 1}
+    return flat
+
+
+def run(suites=SUITES) -> dict:
+    import kapow
+
+    results = {}
+    for suite in suites:
+        suite_results = normalize(import_module(suite).run())
+        report(suite, suite_results)
+        for name, result in suite_results.items():
+            results[f"{suite}/{name}"] = result
+    return {
+        "environment": {
+            "kapow": kapow.__version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Print the change of every benchmark against the baseline.
+
+    :return: the names of benchmarks slower than `threshold` times the baseline.
+    """
+    regressions = []
+    print(f"\ncompared with {baseline['environment'].get('timestamp', 'baseline')}")
+    for name, result in results["results"].items():
+        before = baseline["results"].get(name)
+        if not before or not before["best"]:
+            continue
+        ratio = result["best"] / before["best"]
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:<60} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="slowdown ratio reported as a regression (default 1.25)",
+    )
+    parser.add_argument(
+        "--suite", action="append", choices=SUITES, help="run only these suites"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.suite or SUITES)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,10 @@
 import logging
+from pathlib import Path
 import kapow.handlers.core
 import kapow.handlers.docopt
 from kapow import Application
 from kapow import handlers
+from kapow.schema import Field
 
 log = logging.getLogger("appy")
 
@@ -30,9 +32,12 @@ def error(ctx):
     raise Exception("This is all wrong!")
 
 
-def validate_configuration(config):
-    assert "app" in config
-    assert "debug" in config["app"]
+CONFIG_SCHEMA = {
+    "app": {
+        "debug": Field(bool, default=False),
+        "wrk_dir": Path,
+    },
+}
 
 
 def find_command(ctx):
@@ -47,14 +52,10 @@ app = Application(
     version="0.1.0",
     cli_handler=kapow.handlers.docopt.docopt_handler(CLI),
     env_handler=None,
-    pre_config_handler=kapow.handlers.core.pre_config_handler(
-        kapow.handlers.core.default_config_builder
-    ),
-    config_handler=kapow.handlers.core.config_handler,
-    post_config_handler=kapow.handlers.core.post_config_handler(validate_configuration),
+    config_handler=kapow.handlers.core.config_handler_factory(schema=CONFIG_SCHEMA),
     command_finder=kapow.handlers.core.command_finder(find_command),
 )
 
 if __name__ == "__main__":
     app.initialize()
-    app.main()
+    app.run()
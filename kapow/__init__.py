@@ -1,4 +1,5 @@
 import sys
+from pathlib import Path
 from types import SimpleNamespace
 from typing import Callable
 from typing import ClassVar
@@ -9,6 +10,7 @@ from . import confirm
 from . import handlers
 from .appdirs import AppDirs
 from .errors import LaunchError
+from .profiling import Profiler
 
 __version__ = "0.2.2"
 
@@ -53,18 +55,35 @@ class Application:
         command_func: Union[Callable, None] = None,
         error_handler: Union[Callable, None] = None,
         main_factory: Union[Callable, None] = None,
+        profile: Union[bool, Profiler] = False,
+        event_loop_policy: Union[str, object, None] = None,
+        warm: bool = False,
+        server: Union[bool, str, Path] = False,
+        snapshot: bool = False,
         **kwargs,
     ):
         self.name = name
         self.version = version
         self.context_class = context_class
         self.appdirs_class = appdirs_class
+        self.event_loop_policy = event_loop_policy
+        # a snapshot is restored through the warm results
+        self.warm = warm or snapshot
+        self.server = server
+        self.snapshot = snapshot
+        self._once_results = {}
+        self.profiler = None
+        if profile is True:
+            self.profiler = Profiler()
+        elif isinstance(profile, Profiler):
+            self.profiler = profile
         # these handlers are mandatory
         self.main_factory = kapow.handlers.core.main_factory
         self.error_handler = kapow.handlers.core.error_handler
 
         self._handlers = {}
         self._execution_order = []
+        self._compiled_main = None
 
         self._add_handler("cli_handler", cli_handler, kapow.handlers.core.cli_handler)
         self._add_handler("env_handler", env_handler, kapow.handlers.core.env_handler)
@@ -113,6 +132,11 @@ class Application:
 
     def _add_handler(self, name, handler, default=None):
 
+        if self._compiled_main:
+            raise LaunchError(
+                f"Cannot add `{name}`, the application pipeline has been compiled."
+            )
+
         # do not load the handler
         if handler is None:
             return
@@ -169,7 +193,7 @@ class Application:
 
     @property
     def cli_args(self):
-        if hasattr(self, "_cli_args") and self._cli_args:
+        if getattr(self, "_cli_args", None) is not None:
             return self._cli_args
         return sys.argv[1:]
 
@@ -190,10 +214,108 @@ class Application:
         if appdirs_class:
             self.appdirs_class = appdirs_class
 
+    def reset(self):
+        """
+        Clear the results of `once` handlers kept by a warm application, so
+        they run again on the next call to main.
+        """
+        self._once_results = {}
+
+    def compile(self) -> Callable:
+        """
+        Validate and freeze the application's pipeline.
+
+        The handlers are resolved once into a fixed sequence, and the returned
+        main function (also returned by `app.main` from then on) skips the
+        per-call handler lookups. Handlers cannot be added after compiling.
+
+        :return: main function
+        """
+        if self._compiled_main:
+            return self._compiled_main
+
+        if "command_finder" not in self._handlers:
+            raise LaunchError(
+                "Cannot compile an application without a command_finder or command_func."
+            )
+        for name in self._execution_order:
+            confirm.handler_func(self._handlers[name])
+        confirm.error_func(self.error_handler)
+
+        self._execution_order = tuple(self._execution_order)
+
+        if self.main_factory is kapow.handlers.core.main_factory:
+            self._compiled_main = kapow.handlers.core.compiled_main_factory(self)
+        else:
+            self._compiled_main = self.main_factory(self)
+        return self._compiled_main
+
+    def run_many(
+        self, argv_list: List[List[str]], workers: int = None, **kwargs
+    ) -> List["kapow.batch.InvocationResult"]:
+        """
+        Run the application once for each list of cli arguments, spreading the
+        runs over a pool of worker processes (see `kapow.batch`).
+
+        :param argv_list: list of cli argument lists
+        :param workers: number of worker processes
+        :return: list of InvocationResult
+        """
+        from kapow import batch
+
+        return batch.run_many(self, argv_list, workers, **kwargs)
+
+    def serve(self, socket_path: Union[str, Path, None] = None, **kwargs):
+        """
+        Run the application as a resident command server (see `kapow.server`).
+
+        :param socket_path: the unix socket to listen on.
+        :return: None
+        """
+        from kapow import server
+
+        server.serve(self, socket_path, **kwargs)
+
+    def run(self):
+        """
+        Run the application and exit with its exit code. This is the entry
+        point for scripts and console_scripts: `main = app.run`.
+        """
+        result = self.main()
+        sys.exit(getattr(result, "exit_code", 0))
+
     @property
     def main(self) -> Callable:
         """
+        The main function runs the pipeline and returns a `kapow.result.RunResult`.
+
+        With the `snapshot` option, main restores the setup stages from the
+        snapshot of an earlier launch (see `kapow.snapshot`).
+
+        When the application has the `server` option, main hands the invocation
+        to a running server, and only runs the pipeline itself when there is none.
 
         :return: main function
         """
-        return self.main_factory(self)
+        main = self._compiled_main or self.main_factory(self)
+        if self.snapshot:
+            from kapow import snapshot
+
+            main = snapshot.snapshot_main(self, main)
+        if self.server:
+            from kapow import server
+
+            return server.client_main(self, main)
+        return main
+
+    @property
+    def amain(self) -> Callable:
+        """
+        The asyncio entry point, for running the application from inside
+        an event loop: `await app.amain()`.
+
+        :return: main coroutine function
+        """
+        from kapow import aio
+
+        return aio.amain_factory(self)
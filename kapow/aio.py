@@ -0,0 +1,147 @@
+"""
+asyncio support for the kapow pipeline.
+
+Handlers, command functions and error handlers may be coroutine functions:
+
+    async def remote_config_handler(app, ctx):
+        ctx.secrets = await fetch_secrets()
+        return app, ctx
+
+`app.main()` runs the pipeline in a single event loop when any of them are
+async, and `await app.amain()` runs it from inside an existing loop.
+Handlers are grouped into waves with `kapow.scheduler.plan`, and the async
+handlers within a wave run concurrently.
+"""
+import asyncio
+import inspect
+from typing import Any
+from typing import Callable
+from typing import Union
+from kapow import confirm
+from kapow import warm
+from kapow.errors import LaunchError
+from kapow.profiling import measure
+from kapow.result import RunResult
+from kapow.result import timed
+from kapow.scheduler import plan
+
+
+def install_event_loop_policy(
+    policy: Union[str, asyncio.AbstractEventLoopPolicy, None]
+) -> bool:
+    """
+    Install an event loop policy before the pipeline's loop is created.
+
+    :param policy: "uvloop" to use uvloop if it is installed, or an
+        `asyncio.AbstractEventLoopPolicy` instance.
+    :return: True if a policy was installed.
+    """
+    if policy is None:
+        return False
+    if policy == "uvloop":
+        try:
+            import uvloop
+        except ImportError:
+            return False
+        policy = uvloop.EventLoopPolicy()
+    if not isinstance(policy, asyncio.AbstractEventLoopPolicy):
+        raise LaunchError(f"Invalid event loop policy: {policy}.")
+    asyncio.set_event_loop_policy(policy)
+    return True
+
+
+def run(app: "Application", coroutine: Any = None) -> Any:
+    """
+    Run `coroutine` (by default the application's `amain` pipeline) in a new
+    event loop, using the application's event loop policy.
+    """
+    install_event_loop_policy(getattr(app, "event_loop_policy", None))
+    if coroutine is None:
+        coroutine = app.amain()
+    return asyncio.run(coroutine)
+
+
+async def resolve(result: Any) -> Any:
+    """
+    Await `result` if it is awaitable.
+    """
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+def amain_factory(app: "Application") -> Callable:
+    """
+    The asyncio counterpart to `kapow.handlers.core.main_factory`.
+
+    :param app: Application
+    :return: coroutine function that runs the application.
+    """
+
+    async def _amain() -> RunResult:
+        nonlocal app
+        result = RunResult()
+        profiler = app.profiler
+        if profiler:
+            profiler.start()
+
+        async def run_handler(handler_key, context):
+            handler = warm.wrap(app, handler_key, app._handlers[handler_key])
+            with timed(result, handler_key), measure(profiler, handler_key):
+                return await resolve(handler(app, context))
+
+        async def handle_error(context, stage, ex):
+            await resolve(app.error_handler(app, context, ex))
+            return result.fail(stage, ex)
+
+        try:
+            context = app.context_class()
+            for wave in plan(app):
+                async_keys = [
+                    key for key in wave if confirm.is_async(app._handlers[key])
+                ]
+                if len(async_keys) < 2:
+                    for key in wave:
+                        try:
+                            app, context = await run_handler(key, context)
+                        except Exception as ex:
+                            return await handle_error(context, key, ex)
+                    continue
+
+                # sync handlers run first, then the async handlers run together
+                for key in wave:
+                    if key in async_keys:
+                        continue
+                    try:
+                        app, context = await run_handler(key, context)
+                    except Exception as ex:
+                        return await handle_error(context, key, ex)
+
+                results = await asyncio.gather(
+                    *[run_handler(key, context) for key in async_keys],
+                    return_exceptions=True,
+                )
+                for key, outcome in zip(async_keys, results):
+                    try:
+                        if isinstance(outcome, BaseException):
+                            raise outcome
+                        result_app, result_ctx = outcome
+                        if result_app is not app or result_ctx is not context:
+                            raise LaunchError(
+                                f"`{key}` runs concurrently with other handlers "
+                                "and must not replace the app or context objects."
+                            )
+                    except Exception as ex:
+                        return await handle_error(context, key, ex)
+
+            try:
+                with timed(result, "command"), measure(profiler, "command"):
+                    result.value = await resolve(app.command(context))
+            except Exception as ex:
+                await handle_error(context, "command", ex)
+            return result
+        finally:
+            if profiler:
+                profiler.stop()
+
+    return _amain
@@ -410,6 +410,64 @@ def user_log_dir(appname=None, appauthor=None, version=None, opinion=True):
     return path
 
 
+# environment variables that the resolved directories depend on
+_DIR_ENV_VARS = (
+    "HOME",
+    "USER",
+    "USERNAME",
+    "XDG_DATA_HOME",
+    "XDG_DATA_DIRS",
+    "XDG_CONFIG_HOME",
+    "XDG_CONFIG_DIRS",
+    "XDG_CACHE_HOME",
+    "XDG_STATE_HOME",
+    "APPDATA",
+    "LOCALAPPDATA",
+    "ALLUSERSPROFILE",
+)
+
+# {(property, appname, ...): (env fingerprint, value)}
+_resolved = {}
+
+
+def _env_fingerprint():
+    return tuple(environ.get(name) for name in _DIR_ENV_VARS)
+
+
+def _memoized(func):
+    """
+    Cache an AppDirs property for the whole process. The cached value is
+    re-computed if any of the environment variables it depends on change.
+    """
+    name = func.__name__
+
+    def _resolve(self):
+        key = (
+            name,
+            self.appname,
+            self.appauthor,
+            self.version,
+            self.roaming,
+            self.multipath,
+        )
+        fingerprint = _env_fingerprint()
+        cached = _resolved.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        value = func(self)
+        _resolved[key] = (fingerprint, value)
+        return value
+
+    _resolve.__name__ = name
+    _resolve.__doc__ = func.__doc__
+    return _resolve
+
+
+def clear_cache():
+    """Forget all memoized AppDirs values."""
+    _resolved.clear()
+
+
 class AppDirs(object):
     """Convenience wrapper for getting application dirs."""
 
@@ -423,14 +481,17 @@ class AppDirs(object):
         self.multipath = multipath
 
     @property
+    @_memoized
     def user_name(self):
         return user_name()
 
     @property
+    @_memoized
     def user_full_name(self):
         return user_full_name()
 
     @property
+    @_memoized
     def user_data_dir(self):
         return Path(
             user_data_dir(
@@ -439,6 +500,7 @@ class AppDirs(object):
         )
 
     @property
+    @_memoized
     def site_data_dir(self):
         return Path(
             site_data_dir(
@@ -450,6 +512,7 @@ class AppDirs(object):
         )
 
     @property
+    @_memoized
     def user_config_dir(self):
         return Path(
             user_config_dir(
@@ -458,6 +521,7 @@ class AppDirs(object):
         )
 
     @property
+    @_memoized
     def site_config_dir(self):
         return Path(
             site_config_dir(
@@ -469,14 +533,17 @@ class AppDirs(object):
         )
 
     @property
+    @_memoized
     def user_cache_dir(self):
         return Path(user_cache_dir(self.appname, self.appauthor, version=self.version))
 
     @property
+    @_memoized
     def user_state_dir(self):
         return Path(user_state_dir(self.appname, self.appauthor, version=self.version))
 
     @property
+    @_memoized
     def user_log_dir(self):
         return Path(user_log_dir(self.appname, self.appauthor, version=self.version))
 
@@ -0,0 +1,199 @@
+"""
+Run one application for many sets of cli arguments.
+
+    results = app.run_many([["run", "--name=a"], ["run", "--name=b"]], workers=4)
+    failed = [r for r in results if r.exit_code]
+
+The one-time stages (appdirs, config and logging by default, see
+`kapow.server.WARM_STAGES`) run once per worker process, and the
+invocations are spread over a pool of forked workers. Each invocation's
+exit code, command return value and error are collected in an
+`InvocationResult` instead of being reported through the application's
+error handler.
+
+Where `os.fork` is not available the invocations run one after another in
+the calling process.
+"""
+import io
+import os
+import pickle
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from typing import Any
+from typing import Iterable
+from typing import List
+from typing import Optional
+from kapow import confirm
+from kapow.result import RunResult
+from kapow.result import exit_code
+
+# the application run by the pool's workers, inherited through fork
+_worker_app = None
+
+
+@dataclass
+class InvocationResult:
+    """
+    The outcome of running the application with one set of cli arguments.
+    `value` is the command's return value. Values returned in a worker
+    process that cannot be pickled are left out (None).
+    """
+
+    argv: List[str]
+    exit_code: int
+    value: Any = None
+    error: Optional[str] = None
+    failed_stage: Optional[str] = None
+    traceback: Optional[str] = None
+    stdout: Optional[str] = None
+    stderr: Optional[str] = None
+
+
+def invoke(
+    app: "Application",
+    argv: List[str],
+    capture_output: bool = False,
+    report_errors: bool = False,
+) -> InvocationResult:
+    """
+    Run the application's pipeline once for `argv`, collecting the outcome.
+
+    :param app: Application
+    :param argv: cli arguments
+    :param capture_output: collect the invocation's stdout and stderr.
+    :param report_errors: also pass errors to the application's error handler.
+    :return: InvocationResult
+    """
+    error_handler = app.error_handler
+    if not report_errors:
+        if confirm.is_async(error_handler):
+
+            async def _ignore_error(app, ctx, error):
+                pass
+
+        else:
+
+            def _ignore_error(app, ctx, error):
+                pass
+
+        app.error_handler = _ignore_error
+
+    stdout = io.StringIO() if capture_output else sys.stdout
+    stderr = io.StringIO() if capture_output else sys.stderr
+    cli_args = app._cli_args
+    app.cli_args = list(argv)
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                run_result = app.main_factory(app)()
+            except SystemExit as ex:
+                run_result = RunResult(exit_code=exit_code(ex))
+            except Exception as ex:
+                run_result = RunResult().fail(None, ex)
+    finally:
+        app.error_handler = error_handler
+        app.cli_args = cli_args
+
+    result = InvocationResult(
+        argv=list(argv),
+        exit_code=run_result.exit_code,
+        value=run_result.value,
+        failed_stage=run_result.failed_stage,
+    )
+    error = run_result.error
+    if error is not None:
+        result.error = f"{type(error).__name__}: {error}"
+        result.traceback = "".join(
+            traceback.format_exception(type(error), error, error.__traceback__)
+        )
+    if capture_output:
+        result.stdout = stdout.getvalue()
+        result.stderr = stderr.getvalue()
+    return result
+
+
+def warm_up(app: "Application", stages: Iterable[str]):
+    """
+    Run the `once` stages ahead of the invocations. A stage that fails, and
+    the stages after it, are left cold: they run in every invocation, and
+    the error is collected in each invocation's result.
+    """
+    from kapow import server
+
+    try:
+        server.warm_up(app, stages)
+    except Exception:
+        pass
+
+
+def _warm_worker(stages: Iterable[str]):
+    warm_up(_worker_app, stages)
+
+
+def _invoke_worker(argv: List[str], capture_output: bool) -> InvocationResult:
+    result = invoke(_worker_app, argv, capture_output)
+    try:
+        pickle.dumps(result.value)
+    except Exception:
+        # the result is sent back to the calling process
+        result.value = None
+    return result
+
+
+def run_many(
+    app: "Application",
+    argv_list: Iterable[List[str]],
+    workers: int = None,
+    capture_output: bool = False,
+    stages: Iterable[str] = None,
+) -> List[InvocationResult]:
+    """
+    Run the application once for every set of cli arguments.
+
+    :param app: Application
+    :param argv_list: list of cli argument lists
+    :param workers: number of worker processes (default: the cpu count).
+        With 1 worker the invocations run in the calling process.
+    :param capture_output: collect each invocation's stdout and stderr.
+    :param stages: the `once` handlers to run once per worker.
+    :return: list of InvocationResult, in the order of `argv_list`
+    """
+    global _worker_app
+    from kapow import server
+
+    stages = tuple(server.WARM_STAGES if stages is None else stages)
+    argv_list = [list(argv) for argv in argv_list]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(argv_list) < 2 or not hasattr(os, "fork"):
+        warm, once_results = app.warm, app._once_results
+        try:
+            app._once_results = dict(once_results)
+            warm_up(app, stages)
+            return [invoke(app, argv, capture_output) for argv in argv_list]
+        finally:
+            app.warm, app._once_results = warm, once_results
+
+    import multiprocessing
+
+    _worker_app = app
+    try:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(argv_list)),
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_warm_worker,
+            initargs=(stages,),
+        ) as pool:
+            return list(
+                pool.map(
+                    _invoke_worker,
+                    argv_list,
+                    [capture_output] * len(argv_list),
+                )
+            )
+    finally:
+        _worker_app = None
@@ -0,0 +1,81 @@
+"""
+A small file backed cache used by the kapow handlers to skip repeated work
+(parsing config files, etc.) across launches.
+
+Cache entries are pickled to a file alongside a key. An entry is only
+returned when the stored key equals the expected key, so callers build the
+key from everything the cached value depends on (usually the fingerprint
+of one or more source files).
+"""
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+from typing import Tuple
+from typing import Union
+
+# bump this to invalidate every cache file written by older kapow versions
+CACHE_VERSION = 1
+
+MISSING = object()
+
+
+def fingerprint(path: Union[str, Path], content: bytes = None) -> Tuple:
+    """
+    Return the (mtime, size, hash) fingerprint of a file.
+
+    :param path: the file
+    :param content: the file's content, if the caller has already read it.
+    :return: tuple
+    """
+    stat = os.stat(path)
+    if content is None:
+        content = Path(path).read_bytes()
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    return stat.st_mtime_ns, stat.st_size, digest
+
+
+def load(cache_file: Union[str, Path], key: Any) -> Any:
+    """
+    Return the value stored in `cache_file` if it was stored with `key`,
+    otherwise return `MISSING`.
+
+    A missing, unreadable or corrupt cache file is treated as a miss.
+    """
+    try:
+        with open(cache_file, "rb") as fh:
+            version, stored_key, value = pickle.load(fh)
+    except Exception:
+        return MISSING
+    if version != CACHE_VERSION or stored_key != key:
+        return MISSING
+    return value
+
+
+def store(cache_file: Union[str, Path], key: Any, value: Any) -> bool:
+    """
+    Write `value` to `cache_file` under `key`.
+
+    The file is written to a temporary file and moved into place, so a
+    concurrent reader never sees a partial entry. Failing to write the cache
+    is not an error - the value is simply re-computed on the next launch.
+
+    :return: True if the cache was written.
+    """
+    cache_file = Path(cache_file)
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "wb") as fh:
+            pickle.dump(
+                (CACHE_VERSION, key, value), fh, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(tmp_file, cache_file)
+    except Exception:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+        return False
+    return True
@@ -12,4 +12,4 @@ app = Application(
     command_finder=dopt.docopt_command_finder(commands),
 )
 
-main = app.main
+main = app.run
@@ -0,0 +1,110 @@
+"""
+The client side of the kapow command server (see `kapow.server`).
+
+This module only uses the standard library so that a client shim starts
+as quickly as possible:
+
+    python -m kapow.client /path/to/myapp.sock run --name=buddy
+
+The client passes its argv, environment and working directory to the
+server, along with its stdin, stdout and stderr file descriptors, so the
+command's output goes straight to the client's terminal. It exits with the
+command's exit code.
+"""
+import json
+import os
+import socket
+import struct
+import sys
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+# request: length of the json payload, sent with the client's stdio descriptors
+HEADER = struct.Struct("!Q")
+# response: the command's exit code
+EXIT = struct.Struct("!i")
+
+
+def recv_exactly(conn: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise EOFError("connection closed")
+        data += chunk
+    return data
+
+
+def stdio_fds() -> List[int]:
+    """
+    The client's stdin, stdout and stderr descriptors. Closed descriptors
+    are replaced with /dev/null.
+    """
+    fds = []
+    for fd in (0, 1, 2):
+        try:
+            os.fstat(fd)
+        except OSError:
+            fd = os.open(os.devnull, os.O_RDWR)
+        fds.append(fd)
+    return fds
+
+
+def send_request(
+    conn: socket.socket, argv: List[str], env: Dict[str, str], cwd: str, fds: List[int]
+):
+    payload = json.dumps({"argv": argv, "env": env, "cwd": cwd}).encode("utf-8")
+    socket.send_fds(conn, [HEADER.pack(len(payload))], fds)
+    conn.sendall(payload)
+
+
+def receive_request(conn: socket.socket) -> Tuple[dict, List[int]]:
+    header, fds, _, _ = socket.recv_fds(conn, HEADER.size, 3)
+    if not header:
+        raise EOFError("connection closed")
+    header += recv_exactly(conn, HEADER.size - len(header))
+    (size,) = HEADER.unpack(header)
+    return json.loads(recv_exactly(conn, size)), fds
+
+
+def connect(socket_path: str, argv: List[str]) -> Optional[int]:
+    """
+    Run a command on the server listening at `socket_path`.
+
+    :param socket_path: the server's unix socket
+    :param argv: the command's cli arguments
+    :return: the command's exit code, or None if no server is listening.
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        conn.close()
+        return None
+
+    with conn:
+        try:
+            send_request(conn, list(argv), dict(os.environ), os.getcwd(), stdio_fds())
+            (code,) = EXIT.unpack(recv_exactly(conn, EXIT.size))
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            # the server refused the request, or its worker died before reporting
+            return 1
+    return code
+
+
+def main(argv: List[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        sys.stderr.write("usage: python -m kapow.client SOCKET [ARGS...]\n")
+        return 2
+    code = connect(argv[0], argv[1:])
+    if code is None:
+        sys.stderr.write(f"No kapow server is listening on {argv[0]}.\n")
+        return 1
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
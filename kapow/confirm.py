@@ -1,4 +1,6 @@
 import inspect
+import os
+import stat
 import sys
 from pathlib import Path
 from typing import Callable
@@ -37,6 +39,29 @@ def directory_exists(dirpath: Path):
     dirpath.mkdir(parents=True, exist_ok=True)
 
 
+def directories_exist(*dirpaths: Path):
+    """
+    Create any of the directories that do not exist.
+
+    Directories that are parents of other requested directories are created
+    along with them, so in the common case this costs a single `stat` per
+    leaf directory and no `mkdir` calls.
+
+    :param dirpaths:
+    """
+    paths = [Path(d) for d in dirpaths]
+    for dirpath in paths:
+        if any(dirpath in other.parents for other in paths):
+            continue
+        try:
+            mode = os.stat(dirpath).st_mode
+        except FileNotFoundError:
+            dirpath.mkdir(parents=True, exist_ok=True)
+            continue
+        if not stat.S_ISDIR(mode):
+            dirpath.parent.mkdir(parents=True, exist_ok=True)
+
+
 def _assert_callable(handler: Callable):
     if not callable(handler):
         raise LaunchError(f"Provided object is not callable: {handler}.")
@@ -54,6 +79,15 @@ def _assert_signature(handler: Callable, expect: int = 2):
         )
 
 
+def is_async(handler: Callable) -> bool:
+    """
+    True if the handler is a coroutine function, or an object with an async `__call__`.
+    """
+    return inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(
+        getattr(handler, "__call__", None)
+    )
+
+
 def handler_func(handler: Callable):
     _assert_signature(handler, expect=2)
 
@@ -1,3 +1,50 @@
-from rich.console import Console
+"""
+The shared rich console.
 
-console = Console()
+`rich` is only imported the first time the console is used, so
+importing kapow does not pay for it. Access it with either
+`from kapow.console import console` or `get_console()`.
+
+`is_terminal()` answers whether output is going to a terminal without
+importing rich.
+"""
+import os
+import sys
+
+_console = None
+
+
+def get_console():
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+def is_terminal(stream=None) -> bool:
+    """
+    True if `stream` (by default stdout) is an interactive terminal, using
+    the same rules as rich: FORCE_COLOR forces terminal output, otherwise the
+    stream must be a tty.
+
+    :param stream: file object
+    :return: bool
+    """
+    if stream is None and _console is not None:
+        return _console.is_terminal
+    if os.environ.get("FORCE_COLOR"):
+        return True
+    isatty = getattr(stream or sys.stdout, "isatty", None)
+    try:
+        return bool(isatty and isatty())
+    except ValueError:
+        # the stream is closed
+        return False
+
+
+def __getattr__(name):
+    if name == "console":
+        return get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
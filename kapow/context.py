@@ -0,0 +1,81 @@
+"""
+A context class with lazily computed attributes.
+
+    app = Application(..., context_class=LazyContext)
+
+Handlers register a function with `defer(ctx, name, func)` instead of
+setting a value. With a `LazyContext` the function runs the first time the
+attribute is read, and its result replaces it. With any other context class
+`defer` calls the function straight away, so handlers work with both.
+
+The default config and env handlers defer their work: a command that never
+reads `ctx.config` never reads or parses the config file. Errors raised by a
+deferred function (a missing or invalid config file) are raised where the
+attribute is first read, usually in the command.
+"""
+import threading
+from types import SimpleNamespace
+from typing import Any
+from typing import Callable
+
+_UNSET = object()
+
+
+class Lazy:
+    """
+    A deferred context value. It is computed once, even when it is shared
+    between contexts (the results of `once` handlers are) or threads.
+    """
+
+    __slots__ = ("func", "value", "lock")
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+        self.value = _UNSET
+        self.lock = threading.Lock()
+
+    def resolve(self) -> Any:
+        if self.value is _UNSET:
+            with self.lock:
+                if self.value is _UNSET:
+                    self.value = self.func()
+                    self.func = None
+        return self.value
+
+    def __repr__(self):
+        if self.value is _UNSET:
+            return "<lazy>"
+        return repr(self.value)
+
+
+class LazyContext(SimpleNamespace):
+    """
+    A SimpleNamespace that resolves `Lazy` attributes when they are read.
+    """
+
+    def __getattribute__(self, name: str) -> Any:
+        value = object.__getattribute__(self, name)
+        if type(value) is Lazy:
+            value = value.resolve()
+            object.__setattr__(self, name, value)
+        return value
+
+
+def defer(ctx: Any, name: str, func: Callable[[], Any]):
+    """
+    Set `ctx.<name>` to the result of `func`, computed on first access if the
+    context is a `LazyContext`.
+    """
+    if isinstance(ctx, LazyContext):
+        setattr(ctx, name, Lazy(func))
+    else:
+        setattr(ctx, name, func())
+
+
+def resolved(value: Any) -> Any:
+    """
+    The value of a `Lazy`, or the value itself.
+    """
+    if type(value) is Lazy:
+        return value.resolve()
+    return value
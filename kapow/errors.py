@@ -1,2 +1,15 @@
 class LaunchError(Exception):
     pass
+
+
+class ConfigError(LaunchError):
+    """
+    The config does not match the application's config schema.
+
+    :param errors: a message for every invalid or missing key.
+    """
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        details = "\n".join(f" - {error}" for error in self.errors)
+        super().__init__(f"Invalid config:\n{details}")
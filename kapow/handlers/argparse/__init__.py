@@ -1,29 +1,150 @@
+from argparse import REMAINDER
 from argparse import ArgumentParser
 from argparse import Namespace
+from importlib import import_module
 from types import SimpleNamespace
 from typing import Any
 from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
 from typing import Union
 from kapow import confirm
+from kapow.errors import LaunchError
+from kapow.spec import declare
 
 
-def argparse_handler(parser: ArgumentParser) -> Callable:
+def import_string(path: str) -> Any:
+    """
+    Import an object by its dotted path: "package.module:name" or "package.module.name".
+
+    :param path: dotted path
+    :return: the object
+    """
+    if ":" in path:
+        module_name, _, attr = path.partition(":")
+    else:
+        module_name, _, attr = path.rpartition(".")
+    try:
+        return getattr(import_module(module_name), attr)
+    except (ImportError, AttributeError, ValueError) as ex:
+        raise LaunchError(f"Unable to import `{path}`: {ex}")
+
+
+def argparse_handler(parser: Union[ArgumentParser, Callable]) -> Callable:
     """
     Factory function that returns a kapow handler function to parse
     an application's cli arguments.
 
-    :param parser: an argparser.ArgumentParser object.
+    :param parser: an argparser.ArgumentParser object, or a function that
+        returns one. A function is only called when the handler first runs.
     :return: handler function
 
     """
 
+    @declare(writes=["cli_args"])
     def _argparse_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
+        nonlocal parser
+        if not isinstance(parser, ArgumentParser):
+            parser = parser()
         ctx.cli_args = parser.parse_args(app.cli_args)
         return app, ctx
 
     return _argparse_handler
 
 
+def lazy_argparse_handler(
+    root_parser: Callable,
+    subcommands: Dict[str, Union[str, Tuple[str, str]]],
+    title: str = "subcommands",
+) -> Callable:
+    """
+    Factory function that returns a kapow handler function which only builds
+    the subparser for the subcommand being run.
+
+    Each subcommand is given as the dotted path of a function that configures
+    its subparser, optionally paired with the subcommand's help text:
+
+        def add_run_parser(parser):
+            parser.add_argument("--name", default="buddy")
+            parser.set_defaults(command="myapp.commands.run:run")
+
+        cli_handler = lazy_argparse_handler(
+            create_root_parser,
+            {
+                "run": ("Say hello.", "myapp.commands.run:add_run_parser"),
+                "stop": "myapp.commands.stop:add_stop_parser",
+            },
+        )
+
+    The cli arguments are parsed with the root parser's options to find the
+    subcommand, so option values are never taken for a subcommand name, and
+    only that subcommand's module is imported. When no subcommand is given (`--help`,
+    no arguments or an unknown command) every subcommand is added without its
+    arguments, so help and error messages still list them all.
+
+    :param root_parser: function that returns a new root ArgumentParser.
+    :param subcommands: {name: builder path or (help, builder path)}
+    :param title: title of the subcommands group.
+    :return: handler function
+
+    """
+    confirm.expr(
+        callable(root_parser) and not isinstance(root_parser, ArgumentParser),
+        "lazy_argparse_handler expects a function that returns the root ArgumentParser.",
+    )
+    specs = {}
+    for name, spec in subcommands.items():
+        help_text, builder = spec if isinstance(spec, tuple) else (None, spec)
+        specs[name] = (help_text, builder)
+
+    parsers = {}
+    selector = None
+
+    def build_parser(name: Union[str, None]) -> ArgumentParser:
+        if name in parsers:
+            return parsers[name]
+        parser = root_parser()
+        subparsers = parser.add_subparsers(title=title)
+        for sub_name, (help_text, builder) in specs.items():
+            if name is not None and sub_name != name:
+                continue
+            sub_parser = subparsers.add_parser(sub_name, help=help_text)
+            if name is not None:
+                import_string(builder)(sub_parser)
+        parsers[name] = parser
+        return parser
+
+    def select_subcommand(cli_args: List[str]) -> Union[str, None]:
+        # a root parser whose subcommands take any arguments finds the
+        # subcommand the same way the full parser will
+        nonlocal selector
+        if selector is None:
+            selector = root_parser()
+            subparsers = selector.add_subparsers(
+                title=title,
+                dest="kapow_subcommand",
+                metavar="{" + ",".join(specs) + "}",
+            )
+            for sub_name, (help_text, _) in specs.items():
+                sub_parser = subparsers.add_parser(
+                    sub_name, help=help_text, add_help=False
+                )
+                sub_parser.add_argument("kapow_arguments", nargs=REMAINDER)
+        namespace, _ = selector.parse_known_args(cli_args)
+        return namespace.kapow_subcommand
+
+    @declare(writes=["cli_args"])
+    def _lazy_argparse_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
+        cli_args: List[str] = list(app.cli_args)
+        name = select_subcommand(cli_args)
+        ctx.cli_args = build_parser(name).parse_args(cli_args)
+        return app, ctx
+
+    return _lazy_argparse_handler
+
+
+@declare(reads=["cli_args"], writes=["app.command"])
 def argparse_command_finder(app: "Application", ctx: Union[SimpleNamespace, Any]):
     """
     For argparse cli parsing, the convention is to assign the command as part of
@@ -32,7 +153,8 @@ def argparse_command_finder(app: "Application", ctx: Union[SimpleNamespace, Any]
         command_parser.set_defaults(command=command_parser)
 
     So, "finding" the command in this case is just a case of passing the defined
-    "command" variable.
+    "command" variable. The command can also be the dotted path of the function
+    ("myapp.commands:run"), which is only imported when it is run.
 
     :param app: Application object
     :param ctx: context object
@@ -40,5 +162,8 @@ def argparse_command_finder(app: "Application", ctx: Union[SimpleNamespace, Any]
 
     """
     confirm.ctx_var(ctx, "cli_args", Namespace)
-    app.command = ctx.cli_args.command
+    command = ctx.cli_args.command
+    if isinstance(command, str):
+        command = import_string(command)
+    app.command = command
     return app, ctx
@@ -1,45 +1,194 @@
-import logging
-import logging.config
-from importlib.resources import read_text
+"""
+The default kapow handlers.
+
+Third party and heavier standard library modules (tomlkit, rich,
+logging) are imported inside the handlers that use them, so that
+`import kapow` stays cheap and disabled handlers cost nothing.
+"""
 from os import environ
 from pathlib import Path
+from time import perf_counter
 from types import SimpleNamespace
 from typing import Any
 from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
 from typing import Union
-import tomlkit
-from tomlkit import comment
-from tomlkit import document
-from tomlkit import table
 from kapow import confirm
-from kapow import resources
+from kapow import warm
 from kapow.appdirs import AppDirs
-from kapow.console import console
-
-
+from kapow.context import defer
+from kapow.errors import ConfigError
+from kapow.errors import LaunchError
+from kapow.profiling import measure
+from kapow.result import RunResult
+from kapow.result import timed
+from kapow.scheduler import command_first
+from kapow.scheduler import needed_stages
+from kapow.spec import declare
+from kapow.spec import fingerprinted
+from kapow.spec import once
+from kapow.spec import per_invocation
+from kapow.spec import reads_env
+
+
+@declare(writes=["cli_args"])
 def cli_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
     ctx.cli_args = app.cli_args
     return app, ctx
 
 
+@once
+@reads_env()
+@declare(writes=["env_vars"])
 def env_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
     env_name = f"{app.name.upper()}_"
-    ctx.env_vars = {}
-    for key, value in environ.items():
-        if key.startswith(env_name):
-            ctx.env_vars[key] = value
+
+    def read_env_vars():
+        env_vars = {}
+        for key, value in environ.items():
+            if key.startswith(env_name):
+                env_vars[key] = value
+        return env_vars
+
+    defer(ctx, "env_vars", read_env_vars)
     return app, ctx
 
 
+def parse_env_value(value: str) -> Any:
+    """
+    Convert a raw environment variable string into a bool, int or float
+    where it looks like one, otherwise return the string.
+    """
+    lowered = value.lower()
+    if lowered in ("true", "yes", "on"):
+        return True
+    if lowered in ("false", "no", "off"):
+        return False
+    for value_type in (int, float):
+        try:
+            return value_type(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _convert_env_value(value: str, value_type: Callable) -> Any:
+    """
+    Convert a raw environment variable string to `value_type`, or raise
+    ValueError or TypeError.
+    """
+    if value_type is bool:
+        parsed = parse_env_value(value)
+        if parsed not in (True, False, 1, 0):
+            raise ValueError(value)
+        return bool(parsed)
+    return value_type(value)
+
+
+def _set_nested(tree: dict, path: List[str], value: Any):
+    for name in path[:-1]:
+        branch = tree.get(name)
+        if not isinstance(branch, dict):
+            branch = tree[name] = {}
+        tree = branch
+    tree[path[-1]] = value
+
+
+def env_handler_factory(
+    schema: Union[Dict[str, Callable], None] = None,
+    prefix: Union[str, None] = None,
+    separator: str = "__",
+) -> Callable:
+    """
+    Factory function that returns a kapow handler function that reads the
+    application's environment variables into a nested, typed view.
+
+    Variables are named `{PREFIX}{PATH}`, with the separator splitting the path
+    into nested tables: `APP_DB__POOL_SIZE=10` becomes `ctx.env["db"]["pool_size"] == 10`.
+    The raw values are still available in `ctx.env_vars`.
+
+    Without a schema, every variable with the prefix is read and its value
+    converted with `parse_env_value`. With a schema - {"db.pool_size": int} - only
+    the declared variables are looked up and converted with the given type.
+
+    The typed view is kept by the handler and reused while the raw values
+    are unchanged.
+
+    :param schema: optional {dotted path: type} of the variables to read.
+    :param prefix: variable name prefix, defaults to `{APPNAME}_`.
+    :param separator: separates the nested names in a variable name.
+    :return: handler function
+
+    """
+    last = {}
+
+    @once
+    @reads_env(prefix)
+    @declare(writes=["env_vars", "env"])
+    def _env_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
+        env_prefix = prefix if prefix is not None else f"{app.name.upper()}_"
+
+        if schema:
+            names = {
+                path: f"{env_prefix}{path.upper().replace('.', separator)}"
+                for path in schema
+            }
+            env_vars = {
+                name: environ[name] for name in names.values() if name in environ
+            }
+        else:
+            env_vars = {
+                key: value
+                for key, value in environ.items()
+                if key.startswith(env_prefix)
+            }
+
+        if last.get("env_vars") != env_vars:
+            env = {}
+            if schema:
+                errors = []
+                for path, name in names.items():
+                    if name not in env_vars:
+                        continue
+                    try:
+                        value = _convert_env_value(env_vars[name], schema[path])
+                    except (ValueError, TypeError):
+                        type_name = getattr(schema[path], "__name__", schema[path])
+                        errors.append(
+                            f"{name}: expected {type_name}, got {env_vars[name]!r}"
+                        )
+                        continue
+                    _set_nested(env, path.split("."), value)
+                if errors:
+                    raise ConfigError(errors)
+            else:
+                for name, value in env_vars.items():
+                    path = name[len(env_prefix) :].lower().split(separator)
+                    _set_nested(env, path, parse_env_value(value))
+            last["env_vars"] = env_vars
+            last["env"] = env
+
+        ctx.env_vars = dict(env_vars)
+        ctx.env = last["env"]
+        return app, ctx
+
+    return fingerprinted(_env_handler, schema, prefix, separator)
+
+
+@once
+@declare(writes=["dirs", "files", "current_user"])
 def appdir_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
     appdirs = app.appdirs_class(app.name)
     ctx.dirs = app.context_class()
     ctx.dirs.app_home = appdirs.user_data_dir
     ctx.dirs.log_dir = appdirs.user_log_dir
+    # only the opt-in caches use the cache dir, custom appdirs classes may not have it
+    ctx.dirs.cache_dir = getattr(appdirs, "user_cache_dir", None)
     ctx.current_user = appdirs.user_name.lower()
 
-    confirm.directory_exists(ctx.dirs.app_home)
-    confirm.directory_exists(ctx.dirs.log_dir)
+    confirm.directories_exist(ctx.dirs.app_home, ctx.dirs.log_dir)
 
     ctx.files = app.context_class()
 
@@ -47,6 +196,11 @@ def appdir_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
 
 
 def default_cfg_writer(ctx):
+    import tomlkit
+    from tomlkit import comment
+    from tomlkit import document
+    from tomlkit import table
+
     doc = document()
     doc.add(comment("This is an example toml configuration file."))
     doc.add(comment("Overwrite content to meet your apps requirements."))
@@ -58,29 +212,324 @@ def default_cfg_writer(ctx):
 
 
 def default_cfg_validator(config):
+    """
+    The default config validator accepts any config. Pass a `schema` to
+    `config_handler_factory` to validate the config (see `kapow.schema`).
+    """
     pass
 
 
+def tomlkit_parser(content: str) -> Any:
+    """
+    Parse toml with tomlkit. The result is a style and comment preserving
+    document that can be modified and written back.
+    """
+    import tomlkit
+
+    return tomlkit.loads(content)
+
+
+def tomllib_parser(content: str) -> dict:
+    """
+    Parse toml with the standard library's read-only `tomllib` parser (or
+    the `tomli` package on python < 3.11). The result is a plain dict, and
+    parsing is considerably faster than tomlkit.
+    """
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise LaunchError(
+                "The tomllib config parser requires python 3.11+ or the `tomli` package."
+            )
+    return tomllib.loads(content)
+
+
+CONFIG_PARSERS = {
+    "tomlkit": tomlkit_parser,
+    "tomllib": tomllib_parser,
+}
+
+
+def config_parser(parser: Union[str, Callable]) -> Callable:
+    """
+    Return the config parser function for a name in `CONFIG_PARSERS`, or
+    confirm that the parser is a function.
+    """
+    if isinstance(parser, str):
+        if parser not in CONFIG_PARSERS:
+            raise LaunchError(
+                f"Unknown config parser `{parser}`. Expecting one of: {', '.join(CONFIG_PARSERS)}."
+            )
+        parser = CONFIG_PARSERS[parser]
+    confirm.expr(callable(parser), f"Config parser is not callable: {parser}.")
+    return parser
+
+
+def plain_config(value: Any) -> Any:
+    """
+    Convert a parsed tomlkit document into plain python dicts, lists and values.
+
+    :param value: tomlkit document or item
+    :return: plain python value
+    """
+    if hasattr(value, "unwrap"):
+        return value.unwrap()
+    if isinstance(value, dict):
+        return {str(k): plain_config(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [plain_config(v) for v in value]
+    for value_type in (bool, int, float, str):
+        if isinstance(value, value_type):
+            return value_type(value)
+    return value
+
+
+def cached_config_loader(
+    app: "Application",
+    ctx: Union[SimpleNamespace, Any],
+    parser: Callable = tomlkit_parser,
+    schema: "Schema" = None,
+):
+    """
+    Load the config file through a pickled cache in the user's cache directory.
+
+    The cache is keyed on the config file's mtime, size and content hash, so any
+    change to the file triggers a fresh parse. The cached config is a plain dict
+    rather than a tomlkit document. With a schema, the validated settings are
+    cached instead, keyed on the schema too, so an unchanged config is not
+    validated again.
+
+    :param app: Application
+    :param ctx: Context
+    :param parser: the toml parser used on a cache miss.
+    :param schema: a compiled `kapow.schema.Schema`.
+    :return: the parsed config, or Settings with a schema.
+    """
+    from kapow import cache
+
+    confirm.ctx_var(ctx, "dirs.cache_dir", Path)
+    content = ctx.files.config.read_bytes()
+    key = (
+        f"{parser.__module__}.{parser.__qualname__}",
+        cache.fingerprint(ctx.files.config, content),
+        schema.key if schema else None,
+    )
+    cache_file = Path(ctx.dirs.cache_dir, f"{app.name}.config.cache")
+
+    config = cache.load(cache_file, key)
+    if config is cache.MISSING:
+        config = plain_config(parser(content.decode("utf-8")))
+        if schema:
+            config = schema(config)
+        cache.store(cache_file, key, config)
+    return config
+
+
 def config_handler_factory(
-    config_writer=default_cfg_writer, config_validator=default_cfg_validator
+    config_writer=default_cfg_writer,
+    config_validator=default_cfg_validator,
+    cache: bool = False,
+    parser: Union[str, Callable] = "tomlkit",
+    schema: Union["Schema", dict, None] = None,
 ):
-    def _config_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
+    """
+    Factory function that returns a kapow handler function to read the
+    application's toml config file.
+
+    With a schema, `ctx.config` is a read-only `kapow.schema.Settings` object
+    with the config's values checked, coerced and defaulted, rather than the
+    parsed document.
+
+    :param config_writer: function that writes the default config, called
+        when the config file does not exist.
+    :param config_validator: function that validates the parsed config.
+    :param cache: cache the parsed config in the user's cache directory, so
+        unchanged config files are not re-parsed on every launch.
+    :param parser: "tomlkit" (the default) for an editable document, "tomllib"
+        for a faster read-only parse into plain dicts, or a function that
+        takes the file content and returns the parsed config.
+    :param schema: a `kapow.schema.Schema`, or the dict to compile one from.
+        The config validator is called with the resulting settings.
+    :return: handler function
+
+    """
+    parser = config_parser(parser)
+    if schema is not None:
+        from kapow.schema import compile_schema
 
+        schema = compile_schema(schema)
+
+    @once
+    @declare(reads=["dirs"], writes=["files.config", "config"])
+    def _config_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
         confirm.ctx_var(ctx, "files", app.context_class)
         ctx.files.config = Path(ctx.dirs.app_home, f"{app.name}.config.ini")
 
-        if not ctx.files.config.exists():
-            config_writer(ctx)
+        def load_config():
+            if not ctx.files.config.exists():
+                config_writer(ctx)
 
-        ctx.config = tomlkit.loads(ctx.files.config.read_text())
+            if cache:
+                config = cached_config_loader(app, ctx, parser, schema)
+            else:
+                config = parser(ctx.files.config.read_text())
+                if schema:
+                    config = schema(config)
 
-        config_validator(ctx.config)
+            config_validator(config)
+            return config
+
+        defer(ctx, "config", load_config)
 
         return app, ctx
 
-    return _config_handler
+    return fingerprinted(
+        _config_handler,
+        config_writer,
+        config_validator,
+        cache,
+        parser,
+        schema.key if schema else None,
+    )
+
 
+def layered_config_handler_factory(
+    precedence: Tuple[str, ...] = ("site", "user", "project", "env", "cli"),
+    cli: Union[Dict[str, str], None] = None,
+    project_file: str = ".{name}.config.ini",
+    config_writer=default_cfg_writer,
+    schema: Union["Schema", dict, None] = None,
+    parser: Union[str, Callable] = "tomlkit",
+    cache: bool = True,
+    env_prefix: Union[str, None] = None,
+    env_separator: str = "__",
+):
+    """
+    Factory function that returns a kapow handler function that merges the
+    site, user and project config files, the environment variables and the
+    cli arguments into `ctx.config` (see `kapow.layers`).
+
+    The handler is a `once` handler, unless the cli arguments or the project
+    file are layers: the config then depends on each invocation's arguments
+    or working directory. The cached files and merge keep the reruns cheap.
+
+    :param precedence: the layers to merge, lowest precedence first.
+    :param cli: {cli argument: dotted config key} of the cli layer.
+    :param project_file: the project config file name, relative to the
+        current directory. `{name}` is replaced by the application name.
+    :param config_writer: function that writes the default user config when
+        it does not exist, or None.
+    :param schema: a `kapow.schema.Schema`, or the dict to compile one from,
+        that the merged config is validated with.
+    :param parser: the toml parser, see `config_handler_factory`.
+    :param cache: cache the parsed files and the merged config in the user's
+        cache directory.
+    :param env_prefix: environment variable prefix, defaults to `{APPNAME}_`.
+    :param env_separator: separates the nested names in a variable name.
+    :return: handler function
 
+    """
+    from kapow import layers
+
+    for layer in precedence:
+        confirm.expr(
+            layer in layers.LAYERS,
+            f"Unknown config layer `{layer}`. Expecting one of: {', '.join(layers.LAYERS)}.",
+        )
+    parser = config_parser(parser)
+    if schema is not None:
+        from kapow.schema import compile_schema
+
+        schema = compile_schema(schema)
+
+    reads = ["dirs"]
+    if "env" in precedence:
+        reads.extend(["env_vars", "env"])
+    if "cli" in precedence:
+        reads.append("cli_args")
+
+    @declare(
+        reads=reads,
+        writes=[
+            "files.config",
+            "files.site_config",
+            "files.project_config",
+            "config",
+        ],
+    )
+    def _layered_config_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
+        confirm.ctx_var(ctx, "files", app.context_class)
+        ctx.files.config = Path(ctx.dirs.app_home, f"{app.name}.config.ini")
+        site_config_dir = getattr(app.appdirs_class(app.name), "site_config_dir", None)
+        ctx.files.site_config = (
+            Path(site_config_dir, f"{app.name}.config.ini") if site_config_dir else None
+        )
+        ctx.files.project_config = Path(project_file.format(name=app.name)).absolute()
+
+        paths = {
+            "site": ctx.files.site_config,
+            "user": ctx.files.config,
+            "project": ctx.files.project_config,
+        }
+        files = {
+            layer: paths[layer]
+            for layer in precedence
+            if layer in paths and paths[layer] is not None
+        }
+        cache_file = (
+            Path(ctx.dirs.cache_dir, f"{app.name}.layers.cache")
+            if cache and ctx.dirs.cache_dir
+            else None
+        )
+
+        def load_config():
+            if config_writer and "user" in files and not ctx.files.config.exists():
+                config_writer(ctx)
+
+            overlays = {}
+            if "env" in precedence:
+                env = getattr(ctx, "env", None)
+                if env is None:
+                    prefix = (
+                        env_prefix if env_prefix is not None else f"{app.name.upper()}_"
+                    )
+                    # without an env handler, read the environment directly
+                    env_vars = getattr(ctx, "env_vars", None)
+                    if env_vars is None:
+                        env_vars = environ
+                    env = layers.env_layer(env_vars, prefix, env_separator)
+                overlays["env"] = env
+            if "cli" in precedence:
+                cli_args = getattr(ctx, "cli_args", None)
+                overlays["cli"] = layers.cli_layer(cli_args, cli or {})
+            return layers.load(files, overlays, precedence, parser, schema, cache_file)
+
+        defer(ctx, "config", load_config)
+        return app, ctx
+
+    fingerprinted(
+        _layered_config_handler,
+        precedence,
+        cli,
+        project_file,
+        config_writer,
+        schema.key if schema else None,
+        parser,
+        cache,
+        env_prefix,
+        env_separator,
+    )
+    if "env" in precedence:
+        reads_env(env_prefix)(_layered_config_handler)
+    if "cli" in precedence or "project" in precedence:
+        return per_invocation(_layered_config_handler)
+    return once(_layered_config_handler)
+
+
+@declare(reads=[], writes=[])
 def context_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
     """
     The purpose of the context handler is to coerce the context object into
@@ -97,14 +546,70 @@ def context_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
 
 
 def default_logging_config_builder(app, ctx):
+    from importlib.resources import read_text
+    from kapow import resources
+
     log_cfg_txt = read_text(resources, "logging.ini")
     ctx.files.logging_config.write_text(
         log_cfg_txt.format(logfile=ctx.files.log_file, appname=app.name)
     )
 
 
-def logging_config_factory(logging_config_builder=default_logging_config_builder):
+def cached_logging_config(
+    app: "Application", ctx: Union[SimpleNamespace, Any]
+) -> Union[Dict, None]:
+    """
+    Return the application's logging ini file compiled into a `dictConfig`
+    dictionary (see `kapow.logconfig`), through a pickled cache in the
+    user's cache directory keyed on the ini file's mtime, size and content hash.
+
+    :param app: Application
+    :param ctx: Context
+    :return: dictConfig dictionary, or None if the file needs `fileConfig`.
+    """
+    from kapow import cache
+    from kapow import logconfig
+
+    confirm.ctx_var(ctx, "dirs.cache_dir", Path)
+    key = cache.fingerprint(ctx.files.logging_config)
+    cache_file = Path(ctx.dirs.cache_dir, f"{app.name}.logging.cache")
+
+    config = cache.load(cache_file, key)
+    if config is cache.MISSING:
+        config = logconfig.compile_ini(ctx.files.logging_config)
+        cache.store(cache_file, key, config)
+    return config
+
+
+def logging_config_factory(
+    logging_config_builder=default_logging_config_builder,
+    queue: bool = False,
+    cache: bool = False,
+):
+    """
+    Factory function that returns a kapow handler function to configure
+    logging from the application's `{name}.logging.ini` file.
+
+    :param logging_config_builder: function that writes the default logging
+        config, called when the file does not exist.
+    :param queue: hand log records to background threads (see `kapow.logqueue`)
+        so log calls do not block on file and console output.
+    :param cache: compile the ini file into a `dictConfig` dictionary once and
+        cache it in the user's cache directory, instead of running
+        `logging.config.fileConfig` on every launch. Repeated runs in the same
+        process skip reconfiguring logging while the config is unchanged.
+    :return: handler function
+
+    """
+
+    @once
+    @declare(
+        reads=["dirs"], writes=["files.logging_config", "files.log_file", "app.log"]
+    )
     def logging_config_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
+        import logging
+        import logging.config
+
         # TODO: we need an option for pointing to an alternative logging config file
         confirm.ctx_var(ctx, "files", app.context_class)
         ctx.files.logging_config = Path(ctx.dirs.app_home, f"{app.name}.logging.ini")
@@ -116,9 +621,35 @@ def logging_config_factory(logging_config_builder=default_logging_config_builder
         if not ctx.files.log_file.exists():
             ctx.files.log_file.write_text("")
 
-        logging.config.fileConfig(ctx.files.logging_config)
         app.log = logging.getLogger(app.name)
 
+        config = cached_logging_config(app, ctx) if cache else None
+        if config is not None:
+            from kapow import logconfig
+
+            applied_key = (config, queue)
+            if logconfig.applied(applied_key):
+                return app, ctx
+
+        if getattr(app, "log_listeners", None):
+            from kapow import logqueue
+
+            # the listeners own the handlers that are about to be closed
+            logqueue.stop(app)
+
+        if config is not None:
+            logging.config.dictConfig(config)
+        else:
+            logging.config.fileConfig(ctx.files.logging_config)
+
+        if queue:
+            from kapow import logqueue
+
+            logqueue.start(app, [None, app.name])
+
+        if config is not None:
+            logconfig.mark_applied(applied_key)
+
         return app, ctx
 
     return logging_config_handler
@@ -134,6 +665,7 @@ def command_finder(command_func: Callable) -> Callable:
 
     """
 
+    @declare(writes=["app.command"])
     def _command_finder(app: "Application", ctx: Union[SimpleNamespace, Any]):
         confirm.command_func(command_func)
         app.command = command_func
@@ -142,6 +674,42 @@ def command_finder(command_func: Callable) -> Callable:
     return _command_finder
 
 
+def error_handler_factory(
+    backend: Union[str, Callable] = "auto",
+    traceback_limit: int = 3,
+    traceback_window: float = 60.0,
+) -> Callable:
+    """
+    Factory function that returns an error handler which reports errors with
+    one of the `kapow.reporting` backends.
+
+    :param backend: "auto" (rich on a terminal, plain text otherwise),
+        "rich", "plain", "json" or a reporter function.
+    :param traceback_limit: how many times the traceback of identical errors
+        is reported within `traceback_window` seconds.
+    :param traceback_window: seconds
+    :return: error handler function
+    """
+    from kapow import reporting
+
+    reporter = reporting.get_reporter(backend)
+    limiter = reporting.TracebackLimiter(traceback_limit, traceback_window)
+
+    def _error_handler(app: "Application", ctx: Union[SimpleNamespace, Any], error):
+        if getattr(app, "log_listeners", None):
+            from kapow import logqueue
+
+            logqueue.flush(app)
+
+        show_traceback, count = limiter.allow(error)
+        reporter(app, error, show_traceback, count)
+
+    return _error_handler
+
+
+_default_error_handler = None
+
+
 def error_handler(app: "Application", ctx: Union[SimpleNamespace, Any], error):
     """
     This is a special case handler that is called as the
@@ -149,20 +717,19 @@ def error_handler(app: "Application", ctx: Union[SimpleNamespace, Any], error):
 
     In addition to the application and context arguments, it also takes an error argument.
 
+    Errors are reported with a rich panel on a terminal and as plain text
+    otherwise (see `error_handler_factory` for the other options).
+
     :param app: Application object
     :param ctx:  Context object
     :param error: Exception object
     :return: None
 
     """
-    import traceback
-    from rich import box
-    from rich.panel import Panel
-
-    console.print(
-        f"\n  [green]{app.name}[/green] failed with error: [red]{error}[/red]\n"
-    )
-    console.print(Panel(traceback.format_exc().strip(), box.SQUARE, highlight=True))
+    global _default_error_handler
+    if _default_error_handler is None:
+        _default_error_handler = error_handler_factory()
+    _default_error_handler(app, ctx, error)
 
 
 def main_factory(app: "Application") -> Callable:
@@ -177,24 +744,125 @@ def main_factory(app: "Application") -> Callable:
 
     In practice user's should not be overriding the execute handler.
 
+    The main function returns a `kapow.result.RunResult`.
+
+    The command is resolved as early as the handler declarations allow (see
+    `kapow.scheduler.command_first`), and a command declared with
+    `kapow.spec.requires` skips the stages it does not need.
+
     :param app: Application
-    :return:
+    :return: main function
     """
 
-    def _main():
+    def _main() -> RunResult:
         nonlocal app
-        context = app.context_class()
-        for handler_key in app._execution_order:
+        if confirm.is_async(app.error_handler) or any(
+            confirm.is_async(handler) for handler in app._handlers.values()
+        ):
+            from kapow import aio
+
+            return aio.run(app)
+
+        result = RunResult()
+        profiler = app.profiler
+        if profiler:
+            profiler.start()
+        try:
+            context = app.context_class()
+            order = command_first(app)
+            needed = None
+            for handler_key in order:
+                if needed is not None and handler_key not in needed:
+                    continue
+                try:
+                    handler = warm.wrap(app, handler_key, app._handlers[handler_key])
+                    with timed(result, handler_key), measure(profiler, handler_key):
+                        app, context = handler(app, context)
+                    if handler_key == "command_finder":
+                        needed = needed_stages(app, order, app.command)
+                except Exception as ex:
+                    app.error_handler(app, context, ex)
+                    return result.fail(handler_key, ex)
+
             try:
-                handler = app._handlers[handler_key]
-                app, context = handler(app, context)
+                with timed(result, "command"), measure(profiler, "command"):
+                    if confirm.is_async(app.command):
+                        from kapow import aio
+
+                        result.value = aio.run(app, app.command(context))
+                    else:
+                        result.value = app.command(context)
             except Exception as ex:
                 app.error_handler(app, context, ex)
-                return
+                result.fail("command", ex)
+            return result
+        finally:
+            if profiler:
+                profiler.stop()
+
+    return _main
+
+
+def compiled_main_factory(app: "Application") -> Callable:
+    """
+    Build the main function of a compiled application (see `Application.compile`).
 
+    The handlers are resolved into a tuple when the factory is called, so
+    running main does no lookups or per-handler setup. Profiled and async
+    applications use the regular `main_factory`.
+
+    :param app: Application
+    :return: main function
+    """
+    if app.profiler or confirm.is_async(app.error_handler):
+        return main_factory(app)
+
+    order = command_first(app)
+    handlers = tuple((key, warm.wrap(app, key, app._handlers[key])) for key in order)
+    if any(confirm.is_async(handler) for _, handler in handlers):
+        return main_factory(app)
+
+    context_class = app.context_class
+    # the stages needed by each command, worked out on its first run
+    needed_by_command = {}
+
+    def _compiled_main() -> RunResult:
+        _app = app
+        result = RunResult()
+        timings = result.timings
+        context = context_class()
+        needed = None
+        for key, handler in handlers:
+            if needed is not None and key not in needed:
+                continue
+            start = perf_counter()
+            try:
+                _app, context = handler(_app, context)
+                if key == "command_finder":
+                    command = _app.command
+                    if command not in needed_by_command:
+                        needed_by_command[command] = needed_stages(_app, order, command)
+                    needed = needed_by_command[command]
+            except Exception as ex:
+                _app.error_handler(_app, context, ex)
+                return result.fail(key, ex)
+            finally:
+                timings[key] = perf_counter() - start
+
+        command = _app.command
+        start = perf_counter()
         try:
-            app.command(context)
+            if confirm.is_async(command):
+                from kapow import aio
+
+                result.value = aio.run(_app, command(context))
+            else:
+                result.value = command(context)
         except Exception as ex:
-            app.error_handler(app, context, ex)
+            _app.error_handler(_app, context, ex)
+            result.fail("command", ex)
+        finally:
+            timings["command"] = perf_counter() - start
+        return result
 
-    return _main
+    return _compiled_main
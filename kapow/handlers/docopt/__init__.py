@@ -1,2 +1,3 @@
+from .handlers import CommandRegistry
 from .handlers import docopt_command_finder
 from .handlers import docopt_handler
@@ -1,33 +1,263 @@
+import re
 from inspect import getmembers
 from inspect import isfunction
 from inspect import ismodule
+from pathlib import Path
 from types import ModuleType
 from types import SimpleNamespace
 from typing import Any
 from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
-from docopt import docopt as docopt_
 from kapow import confirm
+from kapow.errors import LaunchError
+from kapow.spec import declare
 
+# docopt usage strings already compiled in this process
+_compiled_docs = {}
 
-def docopt_handler(docs: str) -> Callable:
+
+def compile_docs(docs: str) -> Optional[Tuple]:
+    """
+    Parse a docopt usage string into its (usage, options, pattern) grammar,
+    which can be matched against any number of argument lists.
+
+    This relies on docopt-ng's internal parsing functions, as they are in
+    docopt-ng 0.7 and 0.9. If they are not available in the installed docopt
+    version None is returned, and the handler falls back to calling `docopt`
+    directly.
+
+    :param docs: the docopt command line definition.
+    :return: tuple or None
+    """
+    try:
+        from docopt import Option
+        from docopt import OptionsShortcut
+        from docopt import formal_usage
+        from docopt import parse_pattern
+    except ImportError:
+        return None
+
+    try:
+        # docopt-ng 0.9
+        from docopt import lint_docstring
+        from docopt import parse_docstring_sections
+        from docopt import parse_options
+    except ImportError:
+        parse_docstring_sections = None
+
+    if parse_docstring_sections is not None:
+        sections = parse_docstring_sections(docs)
+        lint_docstring(sections)
+        usage = sections.usage_header + sections.usage_body
+        options = [
+            *parse_options(sections.before_usage),
+            *parse_options(sections.after_usage),
+        ]
+        pattern = parse_pattern(formal_usage(sections.usage_body), options)
+    else:
+        try:
+            # docopt-ng 0.7
+            from docopt import DocoptExit
+            from docopt import DocoptLanguageError
+            from docopt import parse_defaults
+            from docopt import parse_section
+        except ImportError:
+            return None
+
+        usage_sections = parse_section("usage:", docs)
+        if len(usage_sections) == 0:
+            raise DocoptLanguageError(
+                '"usage:" section (case-insensitive) not found. Perhaps missing indentation?'
+            )
+        if len(usage_sections) > 1:
+            raise DocoptLanguageError('More than one "usage:" (case-insensitive).')
+        usage = usage_sections[0]
+        if re.search(r"\n\s*?options:", usage, re.IGNORECASE):
+            raise DocoptExit(
+                "Warning: options (case-insensitive) was found in usage."
+                "Use a blank line between each section.."
+            )
+        options = parse_defaults(docs)
+        pattern = parse_pattern(formal_usage(usage), options)
+
+    pattern_options = set(pattern.flat(Option))
+    for options_shortcut in pattern.flat(OptionsShortcut):
+        options_shortcut.children = [
+            opt for opt in options if opt not in pattern_options
+        ]
+    pattern.fix()
+    return usage, options, pattern
+
+
+def match_docs(docs: str, compiled: Tuple, argv: List[str], version: Any = None):
+    """
+    Match `argv` against a compiled docopt grammar. This is the equivalent
+    of `docopt(docs, argv, version=version)`.
+    """
+    from docopt import DocoptExit
+    from docopt import ParsedOptions
+    from docopt import Tokens
+    from docopt import extras
+    from docopt import parse_argv
+
+    usage, options, pattern = compiled
+    DocoptExit.usage = usage
+    parsed_arg_vector = parse_argv(Tokens(argv), list(options), False)
+    extras(True, version, parsed_arg_vector, docs)
+    matched, left, collected = pattern.match(parsed_arg_vector)
+    if matched and left == []:
+        return ParsedOptions((a.name, a.value) for a in (pattern.flat() + collected))
+    if left:
+        raise DocoptExit(f"Warning: found unmatched (duplicate?) arguments {left}")
+    raise DocoptExit(collected=collected, left=left)
+
+
+def cached_compile_docs(docs: str, cache_file: Union[Path, None] = None):
+    """
+    Compile a docopt usage string once per process and, if a cache file is
+    given, once per docs and docopt version.
+    """
+    if docs in _compiled_docs:
+        return _compiled_docs[docs]
+
+    import hashlib
+    from kapow import cache
+
+    compiled = cache.MISSING
+    if cache_file:
+        import docopt
+
+        key = (
+            hashlib.sha256(docs.encode("utf-8")).hexdigest(),
+            getattr(docopt, "__version__", None),
+        )
+        compiled = cache.load(cache_file, key)
+
+    if compiled is cache.MISSING:
+        compiled = compile_docs(docs)
+        if cache_file and compiled is not None:
+            cache.store(cache_file, key, compiled)
+
+    _compiled_docs[docs] = compiled
+    return compiled
+
+
+def docopt_handler(docs: str, cache: bool = False) -> Callable:
     """
     Factory function that returns a kapow handler function to parse
     an applications cli arguments.
 
+    The usage string's grammar is compiled the first time the handler runs
+    and reused by later runs in the same process, so only the argument
+    matching happens per launch.
+
     :param docs: the docopt command line definition.
+    :param cache: also store the compiled grammar in the user's cache directory
+        so new processes can skip compiling it.
     :return: handler function
 
     """
 
+    @declare(writes=["cli_args"])
     def _docopt_handler(app: "Application", ctx: Union[SimpleNamespace, Any]):
-        ctx.cli_args = docopt_(docs, app.cli_args, version=app.version)
+        cache_file = None
+        if cache:
+            appdirs = app.appdirs_class(app.name)
+            cache_file = Path(appdirs.user_cache_dir, f"{app.name}.docopt.cache")
+
+        compiled = cached_compile_docs(docs, cache_file)
+        if compiled is None:
+            from docopt import docopt as docopt_
+
+            ctx.cli_args = docopt_(docs, app.cli_args, version=app.version)
+        else:
+            ctx.cli_args = match_docs(docs, compiled, app.cli_args, app.version)
         return app, ctx
 
     return _docopt_handler
 
 
-def docopt_command_finder(cmd_obj: Union[ModuleType, Callable, SimpleNamespace]):
+def command_names(func_name: str) -> List[str]:
+    """
+    The docopt command names a function name can match: the name itself and
+    the name with underscores replaced by `.` or `-`.
+
+    :param func_name: name of a function
+    :return: list of names
+    """
+    names = [func_name, func_name.replace("_", "."), func_name.replace("_", "-")]
+    return list(dict.fromkeys(names))
+
+
+class CommandRegistry:
+    """
+    An explicit registry of command functions, used in place of a commands
+    module so that `docopt_command_finder` does not have to introspect the module.
+
+        commands = CommandRegistry()
+
+        @commands.register
+        def run(ctx):
+            ...
+
+        @commands.register("db-init", "db.init")
+        def initialize_database(ctx):
+            ...
+
+        app = Application(..., command_finder=docopt_command_finder(commands))
+
+    """
+
+    def __init__(self):
+        self.index: Dict[str, Tuple[str, Callable]] = {}
+
+    def register(self, *names: Union[str, Callable]) -> Callable:
+        """
+        Decorator that registers a command function under the given docopt
+        command names, or under its own name (and its `.` and `-` variants).
+        """
+
+        def _register(func: Callable) -> Callable:
+            confirm.command_func(func)
+            for name in names or command_names(func.__name__):
+                if name in self.index:
+                    raise LaunchError(
+                        f"Command `{name}` is already registered to `{self.index[name][1].__name__}`."
+                    )
+                self.index[name] = (func.__name__, func)
+            return func
+
+        if len(names) == 1 and callable(names[0]):
+            func, names = names[0], ()
+            return _register(func)
+
+        return _register
+
+
+def command_index(cmd_obj: Union[ModuleType, SimpleNamespace]) -> dict:
+    """
+    Build a {docopt command name: (function name, function)} index of
+    the functions in a module or namespace object.
+
+    :param cmd_obj: a module or namespace object.
+    :return: dict
+    """
+    index = {}
+    for func_name, func_obj in getmembers(cmd_obj):
+        if not isfunction(func_obj):
+            continue
+        for name in command_names(func_name):
+            index.setdefault(name, (func_name, func_obj))
+    return index
+
+
+def docopt_command_finder(
+    cmd_obj: Union[ModuleType, Callable, SimpleNamespace, CommandRegistry]
+):
     """
     Factory function that returns a kapow handler function that scans an object
     (either a module or an object) for a command whose name matches a key in the
@@ -37,39 +267,41 @@ def docopt_command_finder(cmd_obj: Union[ModuleType, Callable, SimpleNamespace])
 
     If a function is supplied, it will be used as the command without any lookup.
 
-    :param cmd_obj: a module, namespace object or a function.
+    The object is only scanned once, when the handler first runs, and each
+    launch then looks up the cli arguments that are True in the resulting index.
+    A `CommandRegistry` skips the scan altogether.
+
+    :param cmd_obj: a module, namespace object, command registry or a function.
     :return: handler function
 
     """
+    index = None
+    if isinstance(cmd_obj, CommandRegistry):
+        index = cmd_obj.index
 
-    def match_func_name_to_cli_cmd(func_name: str, cli_args: dict) -> bool:
-        """
-        Search for a key in cli_args. Return True if found.
-
-        :param func_name: name of a function
-        :param cli_args: docopt cli arg dict
-        :return: True or False
-        """
-        possible_names = [func_name]
-        possible_names.append(func_name.replace("_", "."))
-        possible_names.append(func_name.replace("_", "-"))
-        for name in possible_names:
-            if name in cli_args and cli_args[name] is True:
-                return True
-        return False
-
+    @declare(reads=["cli_args"], writes=["app.command"])
     def _docopt_command_finder(app, ctx):
+        nonlocal index
         confirm.ctx_var(ctx, "cli_args", dict)
 
-        if isfunction(cmd_obj) or callable(cmd_obj):
+        if index is None and (isfunction(cmd_obj) or callable(cmd_obj)):
             app.command = cmd_obj
 
-        elif ismodule(cmd_obj) or isinstance(cmd_obj, SimpleNamespace):
-            functions = [f for f in getmembers(cmd_obj) if isfunction(f[1])]
-            for func_name, func_obj in functions:
-                if match_func_name_to_cli_cmd(func_name, ctx.cli_args):
-                    app.command = func_obj
-                    break
+        elif (
+            index is not None
+            or ismodule(cmd_obj)
+            or isinstance(cmd_obj, SimpleNamespace)
+        ):
+            if index is None:
+                index = command_index(cmd_obj)
+            # if several commands match, the first function by name wins
+            matches = [
+                index[key]
+                for key, value in ctx.cli_args.items()
+                if value is True and key in index
+            ]
+            if matches:
+                app.command = min(matches, key=lambda match: match[0])[1]
 
         return app, ctx
 
@@ -0,0 +1,198 @@
+"""
+Layered configuration, merged from config files, environment variables and
+cli arguments.
+
+    app = Application(
+        ...,
+        config_handler=kapow.handlers.core.layered_config_handler_factory(
+            cli={"--debug": "app.debug"},
+        ),
+    )
+
+The layers, from the lowest to the highest default precedence, are:
+
+ - site: `{name}.config.ini` in the site config directory (`AppDirs.site_config_dir`),
+ - user: the application's regular config file, `{app_home}/{name}.config.ini`,
+ - project: `.{name}.config.ini` in the current directory,
+ - env: the application's environment variables, nested on `__`
+   (`{NAME}_APP__DEBUG=1` sets `app.debug`), or `ctx.env` when the
+   `env_handler_factory` handler provides it,
+ - cli: cli arguments mapped to config keys. Arguments that are None or
+   False were not given and are left out.
+
+Tables are merged key by key, other values replace those of lower layers.
+
+The config files are read concurrently. Each file's parsed content is
+cached with the file's fingerprint, so only changed files are parsed again,
+and the merged config is cached with the fingerprints of every layer, so an
+unchanged set of layers is neither merged nor validated again.
+"""
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from kapow import cache
+
+FILE_LAYERS = ("site", "user", "project")
+LAYERS = FILE_LAYERS + ("env", "cli")
+
+
+def merge(base: dict, overlay: dict) -> dict:
+    """
+    Return a new dict of `base` with `overlay` merged into it, table by table.
+    """
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def env_layer(env_vars: Dict[str, str], prefix: str, separator: str = "__") -> dict:
+    """
+    Nest and convert the environment variables that start with `prefix`.
+    """
+    from kapow.handlers.core import _set_nested
+    from kapow.handlers.core import parse_env_value
+
+    layer = {}
+    for name in sorted(env_vars):
+        if name.startswith(prefix):
+            path = name[len(prefix) :].lower().split(separator)
+            _set_nested(layer, path, parse_env_value(env_vars[name]))
+    return layer
+
+
+def cli_layer(cli_args: Any, mapping: Dict[str, str]) -> dict:
+    """
+    Pick the cli arguments in `mapping` ({argument: dotted config key}) out of
+    the parsed cli arguments - a docopt dict or an argparse namespace.
+    """
+    if isinstance(cli_args, dict):
+        values = cli_args
+    else:
+        values = getattr(cli_args, "__dict__", {})
+
+    from kapow.handlers.core import _set_nested
+
+    layer = {}
+    for argument, key in mapping.items():
+        value = values.get(argument)
+        if value is None or value is False:
+            continue
+        _set_nested(layer, key.split("."), value)
+    return layer
+
+
+def read_file(
+    path: Path, parser: Callable, cached: Optional[Tuple] = None
+) -> Optional[Tuple]:
+    """
+    Read and parse a config file, unless it is unchanged since `cached`.
+
+    :param path: the config file.
+    :param parser: the toml parser.
+    :param cached: an earlier (fingerprint, config) of the file.
+    :return: (fingerprint, config), or None if the file does not exist.
+    """
+    from kapow.handlers.core import plain_config
+
+    try:
+        content = path.read_bytes()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    fingerprint = cache.fingerprint(path, content)
+    if cached is not None and cached[0] == fingerprint:
+        return cached
+    return fingerprint, plain_config(parser(content.decode("utf-8")))
+
+
+def read_files(
+    files: Dict[str, Path], parser: Callable, cached: Dict[str, Tuple]
+) -> Dict[str, Tuple]:
+    """
+    Read the config files, concurrently when there are several.
+
+    :return: {layer: (fingerprint, config)} of the files that exist.
+    """
+    layers = list(files)
+
+    def read(layer):
+        return read_file(files[layer], parser, cached.get(layer))
+
+    if len(layers) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(layers)) as pool:
+            results = list(pool.map(read, layers))
+    else:
+        results = [read(layer) for layer in layers]
+    return {
+        layer: result for layer, result in zip(layers, results) if result is not None
+    }
+
+
+def load(
+    files: Dict[str, Path],
+    overlays: Dict[str, dict],
+    precedence: Iterable[str],
+    parser: Callable,
+    schema: "Schema" = None,
+    cache_file: Union[Path, None] = None,
+) -> Any:
+    """
+    Merge the layers in order of precedence.
+
+    :param files: {layer: path} of the file layers.
+    :param overlays: {layer: config} of the env and cli layers.
+    :param precedence: the layer names, lowest precedence first.
+    :param parser: the toml parser.
+    :param schema: a compiled `kapow.schema.Schema` to validate the merged config.
+    :param cache_file: where the parsed and merged layers are cached, or None.
+    :return: the merged config, or Settings with a schema.
+    """
+    precedence = tuple(precedence)
+    key = (
+        f"{parser.__module__}.{parser.__qualname__}",
+        schema.key if schema else None,
+        precedence,
+    )
+    cached_files, cached_merge = {}, None
+    if cache_file is not None:
+        entry = cache.load(cache_file, key)
+        if entry is not cache.MISSING:
+            cached_files, cached_merge = entry
+
+    read = read_files(files, parser, cached_files)
+    sources = tuple(
+        (layer, read[layer][0] if layer in read else None)
+        if layer in FILE_LAYERS
+        else (layer, overlays.get(layer, {}))
+        for layer in precedence
+    )
+
+    if cached_merge is not None and cached_merge[0] == sources:
+        config = cached_merge[1]
+    else:
+        config = {}
+        for layer in precedence:
+            if layer in FILE_LAYERS:
+                layer_config = read[layer][1] if layer in read else {}
+            else:
+                layer_config = overlays.get(layer, {})
+            config = merge(config, layer_config)
+        if schema:
+            config = schema(config)
+        cached_merge = None
+
+    changed = cached_merge is None or read.keys() != cached_files.keys()
+    changed = changed or any(read[layer] is not cached_files[layer] for layer in read)
+    if cache_file is not None and changed:
+        cache.store(cache_file, key, (read, (sources, config)))
+    return config
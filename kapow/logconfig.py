@@ -0,0 +1,208 @@
+"""
+Compile `logging.config.fileConfig` INI files into `dictConfig` dictionaries.
+
+`fileConfig` re-reads the INI file, `eval`s every handler's arguments and
+builds the formatters, handlers and loggers from scratch on every call.
+`compile_ini` translates the file once into the equivalent dictionary,
+which can be cached and handed to `logging.config.dictConfig` from then on:
+
+    config = logconfig.compile_ini("myapp.logging.ini")
+    logging.config.dictConfig(config)
+
+Handler arguments are translated from literals and dotted names
+(`sys.stdout` becomes `ext://sys.stdout`) without `eval`, and bound to the
+handler class's keyword arguments. Files using anything else in their
+handler arguments, or options `dictConfig` has no equivalent for, are not
+compiled and `compile_ini` returns None.
+"""
+import ast
+import configparser
+import inspect
+import logging
+import logging.config
+import logging.handlers
+import types
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Union
+
+# (key, root handlers) of the logging configuration last applied in this process
+_applied = None
+
+
+class NotCompilable(Exception):
+    """
+    Raised for INI settings that have no `dictConfig` equivalent.
+    """
+
+
+def _dotted_name(node: ast.AST) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f"{_dotted_name(node.value)}.{node.attr}"
+    raise NotCompilable(ast.dump(node))
+
+
+def _translate_value(node: ast.AST) -> Any:
+    """
+    Translate one handler argument. Names are resolved the way `fileConfig`
+    does, in the namespace of the `logging` module.
+    """
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        pass
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return [_translate_value(item) for item in node.elts]
+    dotted = _dotted_name(node)
+    first, _, rest = dotted.partition(".")
+    if first not in vars(logging):
+        raise NotCompilable(dotted)
+    obj = vars(logging)[first]
+    if isinstance(obj, types.ModuleType):
+        return f"ext://{obj.__name__}{'.' if rest else ''}{rest}"
+    return f"ext://logging.{dotted}"
+
+
+def _translate_args(source: str, keywords: bool = False) -> Any:
+    tree = ast.parse(source, mode="eval").body
+    if keywords:
+        if not isinstance(tree, ast.Dict) or None in tree.keys:
+            raise NotCompilable(source)
+        return {
+            ast.literal_eval(key): _translate_value(value)
+            for key, value in zip(tree.keys, tree.values)
+        }
+    if not isinstance(tree, (ast.Tuple, ast.List)):
+        raise NotCompilable(source)
+    return [_translate_value(item) for item in tree.elts]
+
+
+def _handler_class(name: str) -> type:
+    try:
+        return eval(name, vars(logging))
+    except (AttributeError, NameError):
+        return logging.config._resolve(name)
+
+
+def _compile_handler(section: configparser.SectionProxy) -> Dict:
+    klass = _handler_class(section["class"])
+    args = _translate_args(section.get("args", "()"))
+    kwargs = _translate_args(section.get("kwargs", "{}"), keywords=True)
+    try:
+        bound = inspect.signature(klass).bind(*args, **kwargs)
+    except TypeError as ex:
+        raise NotCompilable(str(ex))
+    if any(
+        param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD)
+        for param in bound.signature.parameters.values()
+        if param.name in bound.arguments
+    ):
+        raise NotCompilable(section.name)
+
+    handler = {"class": f"{klass.__module__}.{klass.__qualname__}"}
+    handler.update(bound.arguments)
+    level = section.get("level")
+    if level:
+        handler["level"] = level
+    formatter = section.get("formatter")
+    if formatter:
+        handler["formatter"] = formatter
+    if section.get("target") and issubclass(klass, logging.handlers.MemoryHandler):
+        handler["target"] = section["target"]
+    return handler
+
+
+def compile_ini(
+    fname: Union[str, Path], disable_existing_loggers: bool = True
+) -> Optional[Dict]:
+    """
+    Translate a `fileConfig` INI file into a `dictConfig` dictionary.
+
+    :param fname: the INI file
+    :param disable_existing_loggers: as for `logging.config.fileConfig`
+    :return: the dictConfig dictionary, or None if the file can only be
+        applied with `fileConfig`.
+    """
+    parser = configparser.ConfigParser()
+    with open(fname, encoding="utf-8") as fh:
+        parser.read_file(fh)
+
+    def keys(section):
+        names = parser[section]["keys"]
+        return [name.strip() for name in names.split(",") if name.strip()]
+
+    config = {
+        "version": 1,
+        "disable_existing_loggers": disable_existing_loggers,
+        "formatters": {},
+        "handlers": {},
+        "loggers": {},
+    }
+    try:
+        for name in keys("formatters") if parser.has_section("formatters") else []:
+            section = f"formatter_{name}"
+            formatter = {
+                "format": parser.get(section, "format", raw=True, fallback=None),
+                "datefmt": parser.get(section, "datefmt", raw=True, fallback=None),
+                "style": parser.get(section, "style", raw=True, fallback="%"),
+            }
+            klass = parser.get(section, "class", fallback=None)
+            if klass:
+                formatter["class"] = klass
+            config["formatters"][name] = formatter
+
+        for name in keys("handlers"):
+            config["handlers"][name] = _compile_handler(parser[f"handler_{name}"])
+
+        for name in keys("loggers"):
+            section = parser[f"logger_{name}"]
+            logger = {
+                "handlers": [
+                    h.strip()
+                    for h in section.get("handlers", "").split(",")
+                    if h.strip()
+                ]
+            }
+            if "level" in section:
+                logger["level"] = section["level"]
+            if name == "root":
+                config["root"] = logger
+            else:
+                logger["propagate"] = bool(section.getint("propagate", fallback=1))
+                config["loggers"][section["qualname"]] = logger
+    except (NotCompilable, SyntaxError, ImportError, KeyError, ValueError):
+        return None
+    return config
+
+
+def applied(key: Any) -> bool:
+    """
+    True if the logging configuration recorded under `key` with `mark_applied`
+    is still the one in effect (the root logger still has the same handlers).
+    """
+    return (
+        _applied is not None
+        and _applied[0] == key
+        and logging.root.handlers == _applied[1]
+    )
+
+
+def mark_applied(key: Any):
+    """
+    Record that the current logging configuration was applied from `key`.
+    """
+    global _applied
+    _applied = (key, list(logging.root.handlers))
+
+
+def forget():
+    """
+    Forget the applied configuration, so `applied` is False until the next
+    `mark_applied`.
+    """
+    global _applied
+    _applied = None
@@ -0,0 +1,77 @@
+"""
+Non-blocking logging.
+
+`start(app, loggers)` moves the handlers of the given loggers onto a
+background `QueueListener` thread, and gives each logger a `QueueHandler`
+in their place. Log calls then only put the record on a queue, and the
+file writes, rotation checks and console output happen on the listener's
+thread.
+
+The listeners are stopped (draining any queued records) at interpreter
+exit, or with `stop(app)`. `flush(app)` drains the queues without
+stopping the listeners for good.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import Iterable
+from typing import Union
+
+
+def start(app: "Application", loggers: Iterable[Union[str, None]]):
+    """
+    Route the records of the named loggers (None is the root logger)
+    through queues to background listeners.
+
+    :param app: Application - the listeners are kept on `app.log_listeners`.
+    :param loggers: logger names
+    """
+    stop(app)
+    listeners = []
+    for name in loggers:
+        logger = logging.getLogger(name)
+        handlers = [
+            h
+            for h in logger.handlers
+            if not isinstance(h, logging.handlers.QueueHandler)
+        ]
+        if not handlers:
+            continue
+        records = queue.SimpleQueue()
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        listener = logging.handlers.QueueListener(
+            records, *handlers, respect_handler_level=True
+        )
+        listener.start()
+        listeners.append(listener)
+
+    app.log_listeners = listeners
+    if listeners and not getattr(app, "_log_queue_atexit", False):
+        atexit.register(stop, app)
+        app._log_queue_atexit = True
+
+
+def flush(app: "Application"):
+    """
+    Wait until every queued record has been handled.
+    """
+    for listener in getattr(app, "log_listeners", []):
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
+        listener.start()
+
+
+def stop(app: "Application"):
+    """
+    Drain the queues and stop the listener threads.
+    """
+    listeners = getattr(app, "log_listeners", [])
+    app.log_listeners = []
+    for listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List
+from typing import Union
+
+
+class StageTiming:
+    """
+    The measurements recorded for a single pipeline stage.
+
+    `wall` and `cpu` are in seconds. `memory` is the net number of bytes
+    allocated (and still held) by the stage, `peak` the highest allocation
+    reached while it ran. Both memory values are None when memory tracing
+    is turned off.
+    """
+
+    def __init__(self, name, start, wall, cpu, memory=None, peak=None, thread=None):
+        self.name = name
+        self.start = start
+        self.wall = wall
+        self.cpu = cpu
+        self.memory = memory
+        self.peak = peak
+        self.thread = thread
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "start": self.start,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "memory": self.memory,
+            "peak": self.peak,
+        }
+
+    def __repr__(self):
+        return f"<StageTiming {self.name} wall={self.wall:.6f}s cpu={self.cpu:.6f}s>"
+
+
+class Profiler:
+    """
+    Records the wall time, cpu time and allocated memory of each stage
+    of the kapow pipeline.
+
+    A profiler is attached to the Application with `Application(..., profile=True)`
+    and is reset at the start of each run. After a run the results are available
+    from `app.profiler.timings`, and can be exported with `to_json` or
+    `to_chrome_trace` (loadable in chrome://tracing or https://ui.perfetto.dev).
+
+    :param memory: trace memory allocations with `tracemalloc`.
+    """
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.timings: List[StageTiming] = []
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+    def start(self):
+        self.timings = []
+        self._origin = time.perf_counter()
+        if not self.memory:
+            return
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        if self._started_tracing:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def measure(self, name: str):
+        tracing = False
+        if self.memory:
+            import tracemalloc
+
+            tracing = tracemalloc.is_tracing()
+        if tracing:
+            mem_start, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            memory = peak = None
+            if tracing:
+                mem_end, mem_peak = tracemalloc.get_traced_memory()
+                memory = mem_end - mem_start
+                peak = mem_peak - mem_start
+            self.timings.append(
+                StageTiming(
+                    name,
+                    wall_start - self._origin,
+                    wall,
+                    cpu,
+                    memory=memory,
+                    peak=peak,
+                    thread=threading.get_ident(),
+                )
+            )
+
+    @property
+    def total(self) -> float:
+        return sum(t.wall for t in self.timings)
+
+    def as_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "stages": [t.as_dict() for t in self.timings],
+        }
+
+    def to_json(self, path: Union[str, Path, None] = None) -> str:
+        """
+        Export the timings as a json document.
+
+        :param path: optional file to write the json to.
+        :return: json string
+        """
+        import json
+
+        content = json.dumps(self.as_dict(), indent=2)
+        if path:
+            Path(path).write_text(content)
+        return content
+
+    def to_chrome_trace(self, path: Union[str, Path, None] = None) -> str:
+        """
+        Export the timings in the chrome trace event format.
+
+        :param path: optional file to write the trace to.
+        :return: json string
+        """
+        import json
+
+        pid = os.getpid()
+        events = []
+        for timing in self.timings:
+            events.append(
+                {
+                    "name": timing.name,
+                    "cat": "kapow",
+                    "ph": "X",
+                    "ts": timing.start * 1_000_000,
+                    "dur": timing.wall * 1_000_000,
+                    "pid": pid,
+                    "tid": timing.thread or 0,
+                    "args": {
+                        "cpu": timing.cpu,
+                        "memory": timing.memory,
+                        "peak": timing.peak,
+                    },
+                }
+            )
+        content = json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+        if path:
+            Path(path).write_text(content)
+        return content
+
+
+def measure(profiler: Union[Profiler, None], name: str):
+    """
+    Return a context manager that records `name` on the profiler,
+    or does nothing if profiling is turned off.
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.measure(name)
@@ -0,0 +1,147 @@
+"""
+Error reporting backends for the default error handler.
+
+    rich   - a rich panel with a highlighted traceback, for interactive terminals.
+    plain  - the error and traceback as plain text, without importing rich.
+    json   - one JSON object per error, for log collectors and CI.
+
+"auto" picks rich when stdout is a terminal (see `kapow.console.is_terminal`)
+and plain otherwise.
+
+Applications that fail the same way over and over in one process (batch
+runs, a warm server) only get the full traceback for the first few
+identical errors in a time window. The rest are reported without it.
+"""
+import sys
+import time
+import traceback
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Tuple
+from typing import Union
+from kapow.errors import LaunchError
+
+
+class TracebackLimiter:
+    """
+    Decides whether an error's traceback should be reported, allowing `limit`
+    tracebacks for identical errors (same type, message and raising code)
+    per `window` seconds.
+    """
+
+    # expired errors are forgotten once this many distinct errors are tracked
+    max_entries = 1024
+
+    def __init__(self, limit: int = 3, window: float = 60.0):
+        self.limit = limit
+        self.window = window
+        self._seen: Dict[Hashable, List] = {}
+
+    @staticmethod
+    def key(error: BaseException) -> Hashable:
+        frames = traceback.extract_tb(error.__traceback__)
+        return (
+            type(error).__qualname__,
+            str(error),
+            tuple((frame.filename, frame.lineno) for frame in frames),
+        )
+
+    def allow(self, error: BaseException) -> Tuple[bool, int]:
+        """
+        Record an occurrence of `error`.
+
+        :return: (report the traceback, occurrences of the error in the current window)
+        """
+        now = time.monotonic()
+        key = self.key(error)
+        seen = self._seen.get(key)
+        if seen is None or now - seen[0] > self.window:
+            if len(self._seen) >= self.max_entries:
+                self._seen = {
+                    k: v for k, v in self._seen.items() if now - v[0] <= self.window
+                }
+            seen = self._seen[key] = [now, 0]
+        seen[1] += 1
+        return seen[1] <= self.limit, seen[1]
+
+
+def format_traceback(error: BaseException) -> str:
+    return "".join(
+        traceback.format_exception(type(error), error, error.__traceback__)
+    ).strip()
+
+
+def repeated_note(count: int) -> str:
+    return f"traceback suppressed, this error has occurred {count} times"
+
+
+def plain_reporter(app: "Application", error: BaseException, show: bool, count: int):
+    out = sys.stdout
+    out.write(f"\n  {app.name} failed with error: {error}\n\n")
+    if show:
+        out.write(f"{format_traceback(error)}\n")
+    else:
+        out.write(f"  ({repeated_note(count)})\n")
+    out.flush()
+
+
+def json_reporter(app: "Application", error: BaseException, show: bool, count: int):
+    import json
+
+    record = {
+        "app": app.name,
+        "error": str(error),
+        "type": f"{type(error).__module__}.{type(error).__qualname__}",
+        "traceback": format_traceback(error) if show else None,
+        "count": count,
+    }
+    sys.stdout.write(f"{json.dumps(record)}\n")
+    sys.stdout.flush()
+
+
+def rich_reporter(app: "Application", error: BaseException, show: bool, count: int):
+    from rich import box
+    from rich.panel import Panel
+    from kapow.console import console
+
+    console.print(
+        f"\n  [green]{app.name}[/green] failed with error: [red]{error}[/red]\n"
+    )
+    if show:
+        console.print(Panel(format_traceback(error), box.SQUARE, highlight=True))
+    else:
+        console.print(f"  [dim]({repeated_note(count)})[/dim]")
+
+
+REPORTERS = {
+    "plain": plain_reporter,
+    "json": json_reporter,
+    "rich": rich_reporter,
+}
+
+
+def auto_reporter(app: "Application", error: BaseException, show: bool, count: int):
+    from kapow.console import is_terminal
+
+    reporter = rich_reporter if is_terminal() else plain_reporter
+    reporter(app, error, show, count)
+
+
+def get_reporter(backend: Union[str, Callable]) -> Callable:
+    """
+    :param backend: "auto", "rich", "plain", "json" or a reporter function
+        `(app, error, show_traceback, count)`.
+    :return: reporter function
+    """
+    if callable(backend):
+        return backend
+    if backend == "auto":
+        return auto_reporter
+    if backend not in REPORTERS:
+        raise LaunchError(
+            f"Unknown error reporting backend `{backend}`. "
+            f"Expected one of: auto, {', '.join(REPORTERS)}."
+        )
+    return REPORTERS[backend]
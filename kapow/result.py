@@ -0,0 +1,72 @@
+"""
+The outcome of running an application's pipeline.
+
+`app.main()` returns a `RunResult`, so an application can be run in-process
+and checked without scraping its output:
+
+    result = app.main()
+    if not result.ok:
+        print(f"{result.failed_stage} failed: {result.error}")
+
+`app.run()` runs main and exits the process with the result's exit code.
+"""
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+from time import perf_counter
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+
+@dataclass
+class RunResult:
+    """
+    :param exit_code: 0 on success, 1 when a stage or the command failed.
+    :param value: the command's return value.
+    :param error: the exception passed to the error handler.
+    :param failed_stage: the handler name (or "command") that raised the error.
+    :param timings: {stage: seconds} for every stage that ran.
+    """
+
+    exit_code: int = 0
+    value: Any = None
+    error: Optional[BaseException] = None
+    failed_stage: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+    def fail(self, stage: str, error: BaseException) -> "RunResult":
+        self.exit_code = 1
+        self.error = error
+        self.failed_stage = stage
+        return self
+
+
+@contextmanager
+def timed(result: RunResult, stage: str):
+    """
+    Record the time spent in the block as the stage's timing.
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        result.timings[stage] = perf_counter() - start
+
+
+def exit_code(ex: SystemExit) -> int:
+    """
+    The process exit code for a SystemExit, printing its message like the
+    interpreter does.
+    """
+    if ex.code is None:
+        return 0
+    if isinstance(ex.code, int):
+        return ex.code
+    sys.stderr.write(f"{ex.code}\n")
+    return 1
@@ -0,0 +1,257 @@
+"""
+A dependency aware pipeline scheduler.
+
+The default `main_factory` runs `app._execution_order` strictly one
+handler after another. `parallel_main_factory` instead builds a dependency
+graph from the handlers' `kapow.spec.declare` declarations and runs
+handlers that do not depend on each other concurrently on a thread pool.
+
+    app = Application(
+        ...,
+        main_factory=kapow.scheduler.parallel_main_factory(max_workers=4),
+    )
+
+A handler depends on every earlier handler that writes something it reads
+or writes, or that reads something it writes. Undeclared handlers act as
+barriers: they wait for everything before them, and everything after them
+waits for them. Handlers that run concurrently must modify the context in
+place rather than return a new context object.
+
+The same declarations let the default main functions resolve the command
+early: `command_first` moves the `command_finder` to just after the
+`cli_handler`, or after the last handler it depends on, and `needed_stages`
+works out which of the remaining stages a command declared with
+`kapow.spec.requires` needs.
+"""
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from kapow import confirm
+from kapow import warm
+from kapow.errors import LaunchError
+from kapow.profiling import measure
+from kapow.result import RunResult
+from kapow.result import timed
+from kapow.spec import declared
+from kapow.spec import requirements
+
+
+def _overlaps(names: Iterable[str], others: Iterable[str]) -> bool:
+    """
+    True if any name equals, or is a parent path of, any of the other names.
+    """
+    for name in names:
+        for other in others:
+            if (
+                name == other
+                or other.startswith(f"{name}.")
+                or name.startswith(f"{other}.")
+            ):
+                return True
+    return False
+
+
+def depends_on(handler: Callable, earlier: Callable) -> bool:
+    """
+    True if `handler` must run after the `earlier` handler.
+    """
+    spec = declared(handler)
+    earlier_spec = declared(earlier)
+    if spec is None or earlier_spec is None:
+        return True
+    reads, writes = spec
+    earlier_reads, earlier_writes = earlier_spec
+    return (
+        _overlaps(earlier_writes, reads)
+        or _overlaps(earlier_writes, writes)
+        or _overlaps(earlier_reads, writes)
+    )
+
+
+def _needs(handler: Callable, earlier: Callable) -> bool:
+    """
+    True if `handler` reads something that the `earlier` handler writes.
+    """
+    spec = declared(handler)
+    earlier_spec = declared(earlier)
+    if spec is None or earlier_spec is None:
+        return True
+    return _overlaps(earlier_spec[1], spec[0])
+
+
+def command_first(app: "Application") -> List[str]:
+    """
+    The application's execution order with the `command_finder` moved forward
+    to just after the `cli_handler`, or after the last earlier handler that it
+    depends on or that depends on it. Undeclared handlers keep it in place.
+
+    :param app: Application
+    :return: list of handler names.
+    """
+    order = list(app._execution_order)
+    if "command_finder" not in order:
+        return order
+    index = order.index("command_finder")
+    finder = app._handlers["command_finder"]
+    position = order.index("cli_handler") + 1 if "cli_handler" in order[:index] else 0
+    for earlier_index, key in enumerate(order[:index]):
+        earlier = app._handlers[key]
+        if depends_on(finder, earlier) or depends_on(earlier, finder):
+            position = max(position, earlier_index + 1)
+    order.insert(position, order.pop(index))
+    return order
+
+
+def needed_stages(
+    app: "Application", order: List[str], command: Callable
+) -> Optional[Set[str]]:
+    """
+    The stages that a command declared with `kapow.spec.requires` needs: the
+    stages it names, the `before_` and `after_` handlers attached to them, the
+    `cli_handler` and `command_finder`, and every earlier stage they read from.
+
+    :param app: Application
+    :param order: the execution order
+    :param command: the command function
+    :return: set of handler names, or None if the command needs every stage.
+    """
+    stages = requirements(command)
+    if stages is None:
+        return None
+
+    needed = {"cli_handler", "command_finder"}
+    for stage in stages:
+        if stage not in app._handlers and f"{stage}_handler" in app._handlers:
+            stage = f"{stage}_handler"
+        if stage not in app._handlers:
+            raise LaunchError(
+                f"`{getattr(command, '__name__', command)}` requires `{stage}`, "
+                "which is not in the application's pipeline."
+            )
+        needed.add(stage)
+
+    for index in reversed(range(len(order))):
+        key = order[index]
+        attached_to = (
+            key.split("_", 1)[1] if key.startswith(("before_", "after_")) else None
+        )
+        if key not in needed and attached_to not in needed:
+            continue
+        needed.add(key)
+        handler = app._handlers[key]
+        for earlier_key in order[:index]:
+            if _needs(handler, app._handlers[earlier_key]):
+                needed.add(earlier_key)
+    return needed
+
+
+def plan(app: "Application") -> List[List[str]]:
+    """
+    Group the application's handlers into waves. The handlers within a wave
+    do not depend on each other; every handler in a wave only depends on
+    handlers in earlier waves.
+
+    :param app: Application
+    :return: list of waves, each a list of handler names in execution order.
+    """
+    levels = {}
+    order = app._execution_order
+    for index, key in enumerate(order):
+        handler = app._handlers[key]
+        level = 0
+        for earlier_key in order[:index]:
+            if depends_on(handler, app._handlers[earlier_key]):
+                level = max(level, levels[earlier_key] + 1)
+        levels[key] = level
+
+    waves = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+    for key in order:
+        waves[levels[key]].append(key)
+    return waves
+
+
+def parallel_main_factory(max_workers: int = None) -> Callable:
+    """
+    Factory function that returns a `main_factory` which runs independent
+    handlers concurrently. Applications with async handlers run on the
+    asyncio pipeline (`kapow.aio`), which runs them concurrently too, and
+    async commands run in an event loop.
+
+    :param max_workers: size of the thread pool.
+    :return: main_factory function
+    """
+
+    def _parallel_main_factory(app: "Application") -> Callable:
+        from concurrent.futures import ThreadPoolExecutor
+
+        def _main() -> RunResult:
+            nonlocal app
+            if confirm.is_async(app.error_handler) or any(
+                confirm.is_async(handler) for handler in app._handlers.values()
+            ):
+                # the asyncio pipeline runs the waves concurrently as well
+                from kapow import aio
+
+                return aio.run(app)
+
+            waves = plan(app)
+            result = RunResult()
+            profiler = app.profiler
+            if profiler:
+                profiler.start()
+
+            def run_handler(handler_key, context):
+                handler = warm.wrap(app, handler_key, app._handlers[handler_key])
+                with timed(result, handler_key), measure(profiler, handler_key):
+                    return handler(app, context)
+
+            try:
+                context = app.context_class()
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    for wave in waves:
+                        if len(wave) == 1:
+                            try:
+                                app, context = run_handler(wave[0], context)
+                            except Exception as ex:
+                                app.error_handler(app, context, ex)
+                                return result.fail(wave[0], ex)
+                            continue
+
+                        futures = [
+                            pool.submit(run_handler, key, context) for key in wave
+                        ]
+                        for key, future in zip(wave, futures):
+                            try:
+                                result_app, result_ctx = future.result()
+                                if result_app is not app or result_ctx is not context:
+                                    raise LaunchError(
+                                        f"`{key}` runs concurrently with other handlers "
+                                        "and must not replace the app or context objects."
+                                    )
+                            except Exception as ex:
+                                for other in futures:
+                                    other.cancel()
+                                app.error_handler(app, context, ex)
+                                return result.fail(key, ex)
+
+                try:
+                    with timed(result, "command"), measure(profiler, "command"):
+                        if confirm.is_async(app.command):
+                            from kapow import aio
+
+                            result.value = aio.run(app, app.command(context))
+                        else:
+                            result.value = app.command(context)
+                except Exception as ex:
+                    app.error_handler(app, context, ex)
+                    result.fail("command", ex)
+                return result
+            finally:
+                if profiler:
+                    profiler.stop()
+
+        return _main
+
+    return _parallel_main_factory
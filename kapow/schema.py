@@ -0,0 +1,340 @@
+"""
+Declarative config schemas.
+
+    schema = Schema({
+        "app": {
+            "debug": Field(bool, default=False),
+            "wrk_dir": Path,
+            "retries": Field(int, default=3),
+            "tags": Field([str], default=()),
+        },
+    })
+    settings = schema(config)
+    settings.app.wrk_dir
+
+A schema maps keys to a type (a required key), a `Field` (a type with a
+default) or a nested dict (a table). It is compiled once into a converter
+that checks and coerces a parsed config (a dict or tomlkit document) into
+a read-only `Settings` object. Every problem is collected and raised
+together as a `kapow.errors.ConfigError`.
+
+Values are coerced where it is safe: "yes"/"no" strings to bools, numeric
+strings to numbers, strings to paths. `[type]` is a list of values of that
+type, stored as a tuple. Any other type is called with the value, unless
+the value already is an instance of it. Keys that are not in the schema
+are kept as they are, unless the schema is created with `allow_extra=False`.
+"""
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Tuple
+from typing import Union
+from kapow.errors import ConfigError
+from kapow.errors import LaunchError
+
+REQUIRED = object()
+
+_BOOLS = {
+    "true": True,
+    "yes": True,
+    "on": True,
+    "1": True,
+    "false": False,
+    "no": False,
+    "off": False,
+    "0": False,
+}
+
+
+class Settings(Mapping):
+    """
+    A read-only config table. Values are read as attributes or items:
+    `settings.app.debug` or `settings["app"]["debug"]`.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Dict[str, Any]):
+        object.__setattr__(self, "_values", values)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("Settings are read-only.")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("Settings are read-only.")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self):
+        return f"Settings({self._values!r})"
+
+    def __reduce__(self):
+        return Settings, (self._values,)
+
+    def to_dict(self) -> dict:
+        """
+        The settings as plain, mutable dicts and lists.
+        """
+        return {key: _thaw(value) for key, value in self._values.items()}
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return Settings({str(key): _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Settings):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class Field:
+    """
+    A config key.
+
+    :param value_type: the key's type, `[type]` for a list.
+    :param default: the value used when the key is missing. Keys without a
+        default are required.
+    """
+
+    __slots__ = ("value_type", "default")
+
+    def __init__(self, value_type: Any, default: Any = REQUIRED):
+        self.value_type = value_type
+        self.default = default
+
+    @property
+    def required(self) -> bool:
+        return self.default is REQUIRED
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in _BOOLS:
+        return _BOOLS[value.lower()]
+    raise ValueError
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ValueError
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, (int, float, str)):
+        return float(value)
+    raise ValueError
+
+
+def _to_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    raise ValueError
+
+
+def _to_path(value: Any) -> Path:
+    if isinstance(value, (str, Path)):
+        return Path(value).expanduser()
+    raise ValueError
+
+
+_CONVERTERS = {
+    bool: _to_bool,
+    int: _to_int,
+    float: _to_float,
+    str: _to_str,
+    Path: _to_path,
+}
+
+
+def _type_name(value_type: Any) -> str:
+    if isinstance(value_type, list):
+        return f"list of {_type_name(value_type[0])}"
+    return getattr(value_type, "__name__", repr(value_type))
+
+
+def _compile_type(value_type: Any) -> Callable[[Any], Any]:
+    """
+    A function that converts a value to `value_type`, or raises ValueError or TypeError.
+    """
+    if isinstance(value_type, list):
+        if len(value_type) != 1:
+            raise LaunchError(f"List types take one item type: {value_type!r}.")
+        convert_item = _compile_type(value_type[0])
+
+        def convert_list(value):
+            if not isinstance(value, (list, tuple)):
+                raise ValueError
+            return tuple(convert_item(item) for item in value)
+
+        return convert_list
+
+    if value_type in _CONVERTERS:
+        return _CONVERTERS[value_type]
+
+    if not callable(value_type):
+        raise LaunchError(f"Expecting a type in the config schema: {value_type!r}.")
+
+    def convert(value):
+        if isinstance(value_type, type) and isinstance(value, value_type):
+            return value
+        return value_type(value)
+
+    return convert
+
+
+def _compile_table(
+    spec: Dict[str, Any], path: str, allow_extra: bool
+) -> Callable[[Any, List[str]], Settings]:
+    """
+    A function that converts a table of the config into `Settings`, adding
+    a message to `errors` for every problem.
+    """
+    tables = []
+    fields = []
+    for key, value in spec.items():
+        name = f"{path}{key}"
+        if isinstance(value, dict):
+            tables.append((key, _compile_table(value, f"{name}.", allow_extra)))
+            continue
+        if not isinstance(value, Field):
+            value = Field(value)
+        convert = _compile_type(value.value_type)
+        default = value.default
+        if default is not REQUIRED and default is not None:
+            try:
+                default = _freeze(convert(default))
+            except (ValueError, TypeError):
+                raise LaunchError(
+                    f"The default of `{name}` is not a {_type_name(value.value_type)}: {default!r}."
+                )
+        fields.append((key, name, convert, default, value.value_type))
+    known = frozenset(spec)
+    table_name = path[:-1] or "config"
+
+    def convert_table(table: Any, errors: List[str]) -> Settings:
+        if not isinstance(table, dict):
+            errors.append(f"{table_name}: expected a table, got {table!r}")
+            return Settings({})
+        values = {}
+        for key, name, convert, default, value_type in fields:
+            if key not in table:
+                if default is REQUIRED:
+                    errors.append(f"{name}: missing required key")
+                else:
+                    values[key] = default
+                continue
+            value = table[key]
+            try:
+                values[key] = convert(value)
+            except (ValueError, TypeError):
+                errors.append(
+                    f"{name}: expected {_type_name(value_type)}, got {value!r}"
+                )
+        for key, convert in tables:
+            values[key] = convert(table.get(key, {}), errors)
+        for key in table:
+            if key in known:
+                continue
+            if allow_extra:
+                values[key] = _freeze(table[key])
+            else:
+                errors.append(f"{path}{key}: unknown key")
+        return Settings(values)
+
+    return convert_table
+
+
+def _describe(spec: Dict[str, Any]) -> Tuple:
+    """
+    A picklable description of a schema, used to key cached settings.
+    """
+    items = []
+    for key, value in spec.items():
+        if isinstance(value, dict):
+            items.append((key, _describe(value)))
+            continue
+        if not isinstance(value, Field):
+            value = Field(value)
+        items.append(
+            (
+                key,
+                _type_name(value.value_type),
+                getattr(value.value_type, "__module__", None),
+                "required" if value.required else repr(value.default),
+            )
+        )
+    return tuple(items)
+
+
+class Schema:
+    """
+    A config schema, compiled into a converter when it is created.
+
+    :param spec: {key: type, Field or nested dict}
+    :param allow_extra: keep keys that are not in the schema, otherwise they
+        are errors.
+    """
+
+    def __init__(self, spec: Dict[str, Any], allow_extra: bool = True):
+        self.spec = spec
+        self.allow_extra = allow_extra
+        self.key = (_describe(spec), allow_extra)
+        self._convert = _compile_table(spec, "", allow_extra)
+
+    def __call__(self, config: Any) -> Settings:
+        """
+        Check and convert a parsed config.
+
+        :param config: a dict or tomlkit document.
+        :return: Settings
+        """
+        if hasattr(config, "unwrap"):
+            config = config.unwrap()
+        errors = []
+        settings = self._convert(config, errors)
+        if errors:
+            raise ConfigError(errors)
+        return settings
+
+
+def compile_schema(schema: Union[Schema, Dict[str, Any]]) -> Schema:
+    """
+    Return the schema, compiling it first if it is a dict.
+    """
+    if isinstance(schema, Schema):
+        return schema
+    return Schema(schema)
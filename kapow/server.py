@@ -0,0 +1,222 @@
+"""
+A resident command server that keeps an application warm.
+
+    app = Application(..., server=True)
+
+    app.serve()     # in a long running process
+    app.main()      # hands the invocation to the server when one is running
+
+The server runs the one-time stages (`appdir_handler`, `config_handler`
+and `logging_config_handler` by default) once, then listens on a unix
+socket. Each request carries the client's argv, environment, working
+directory and stdio file descriptors. The server forks a worker with the
+warm state, which runs the rest of the pipeline and the command with the
+client's stdio, and reports the exit code back to the client.
+
+`kapow.client` is a standard library only client shim for shell wrappers:
+
+    exec python -m kapow.client ~/.cache/myapp/myapp.sock "$@"
+
+Only the server's user can connect: the socket is created with mode 0600,
+and where the platform reports the peer's credentials (`SO_PEERCRED`)
+connections from other users are closed without running anything.
+
+Server mode needs `os.fork` and unix domain sockets.
+"""
+import os
+import socket
+import struct
+import sys
+import traceback
+from pathlib import Path
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+from typing import Union
+from kapow import batch
+from kapow import confirm
+from kapow import warm
+from kapow.client import EXIT
+from kapow.client import connect
+from kapow.client import receive_request
+from kapow.errors import LaunchError
+from kapow.result import RunResult
+from kapow.spec import ONCE
+from kapow.spec import lifecycle
+
+WARM_STAGES = ("appdir_handler", "config_handler", "logging_config_handler")
+
+
+def socket_path(app: "Application") -> Path:
+    """
+    The server's socket: the application's `server` option if it is a path,
+    otherwise `{name}.sock` in the user's cache directory.
+    """
+    if app.server and app.server is not True:
+        return Path(app.server)
+    return Path(app.appdirs_class(app.name).user_cache_dir, f"{app.name}.sock")
+
+
+def peer_uid(conn: socket.socket) -> Optional[int]:
+    """
+    The uid of the process at the other end of a unix socket connection, or
+    None if the platform does not report it.
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = struct.Struct("3i")
+    _, uid, _ = creds.unpack(
+        conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, creds.size)
+    )
+    return uid
+
+
+def warm_up(app: "Application", stages: Iterable[str] = WARM_STAGES):
+    """
+    Run the application's `once` handlers among `stages`, in pipeline order,
+    and keep their results for the server's workers.
+    """
+    app.warm = True
+    stages = set(stages)
+    context = app.context_class()
+    for key in app._execution_order:
+        handler = app._handlers[key]
+        if key not in stages or lifecycle(handler) != ONCE:
+            continue
+        if confirm.is_async(handler):
+            raise LaunchError(f"The server cannot warm up async handler `{key}`.")
+        before = dict(vars(context))
+        app, context = handler(app, context)
+        app._once_results[key] = warm.changes(
+            before, context, warm.written_names(handler)
+        )
+
+
+def _run_request(app: "Application", conn: socket.socket, request: dict, fds):
+    """
+    Run one request in a forked worker. Does not return.
+    """
+    code = 1
+    try:
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = [app.name, *request["argv"]]
+
+        # the listener threads did not survive the fork
+        for listener in getattr(app, "log_listeners", []):
+            listener.start()
+
+        code = batch.invoke(app, request["argv"], report_errors=True).exit_code
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            if getattr(app, "log_listeners", None):
+                from kapow import logqueue
+
+                logqueue.stop(app)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            conn.sendall(EXIT.pack(code))
+        finally:
+            os._exit(code)
+
+
+def _reap():
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def serve(
+    app: "Application",
+    path: Union[str, Path, None] = None,
+    stages: Iterable[str] = WARM_STAGES,
+    max_requests: int = None,
+):
+    """
+    Warm up the application and serve requests until interrupted.
+
+    :param app: Application
+    :param path: the unix socket to listen on (default `socket_path(app)`).
+    :param stages: the `once` handlers to run ahead of the requests.
+    :param max_requests: stop after this many requests.
+    """
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        raise LaunchError("Server mode requires os.fork and unix domain sockets.")
+
+    path = Path(path or socket_path(app))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()
+
+    warm_up(app, stages)
+    if getattr(app, "log_listeners", None):
+        from kapow import logqueue
+
+        logqueue.flush(app)
+
+    served = 0
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        # requests run commands as the server's user, so only it may connect
+        os.chmod(path, 0o600)
+        server.listen()
+        server.settimeout(1.0)
+        try:
+            while max_requests is None or served < max_requests:
+                _reap()
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+
+                with conn:
+                    uid = peer_uid(conn)
+                    if uid is not None and uid != os.getuid():
+                        continue
+                    conn.settimeout(None)
+                    try:
+                        request, fds = receive_request(conn)
+                    except (OSError, EOFError, ValueError):
+                        continue
+
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                    pid = os.fork()
+                    if pid == 0:
+                        server.close()
+                        _run_request(app, conn, request, fds)
+                    for fd in fds:
+                        os.close(fd)
+                served += 1
+        finally:
+            path.unlink(missing_ok=True)
+            while True:
+                try:
+                    os.wait()
+                except ChildProcessError:
+                    break
+
+
+def client_main(app: "Application", main: Callable) -> Callable:
+    """
+    Wrap the application's main function to hand the invocation to a running
+    server, running `main` in this process when no server is listening.
+    """
+
+    def _client_main():
+        code = connect(socket_path(app), app.cli_args)
+        if code is None:
+            return main()
+        return RunResult(exit_code=code)
+
+    return _client_main
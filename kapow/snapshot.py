@@ -0,0 +1,227 @@
+"""
+Persist the results of the setup stages between launches.
+
+    app = Application(..., snapshot=True)
+
+After the first successful run, the context attributes set by the
+`env_handler`, `appdir_handler` and `config_handler` stages (`env_vars`,
+`dirs`, `files`, `current_user` and `config`) are written to
+`{name}.snapshot` in the user's cache directory. Later launches restore
+them and skip those stages, as long as the snapshot's fingerprint still
+matches:
+
+ - the application's name and version, and the kapow and python versions,
+ - the stage handlers, and the settings their factories built them with
+   (`kapow.spec.fingerprinted`),
+ - the current directory,
+ - the application's environment variables (`{NAME}_*`), those with the
+   prefixes the stage handlers read (`kapow.spec.reads_env`), and the
+   variables the application directories depend on (HOME, XDG_*, ...),
+ - the mtime and size of the files the stages recorded in `ctx.files`,
+   the existence of the directories in `ctx.dirs`, and the absence of the
+   recorded files that did not exist.
+
+A snapshot that fails to load or no longer matches is ignored and the full
+pipeline runs. A snapshot is discarded if a stage fails after restoring it,
+so the next launch starts from scratch.
+
+Restored results are replayed like those of a warm application, so a
+snapshot application is also warm (see `kapow.warm`). Logging is always
+configured by its handler, since it is process state.
+"""
+import os
+import sys
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Tuple
+from kapow import cache
+from kapow import spec
+from kapow.appdirs import _DIR_ENV_VARS
+from kapow.context import resolved
+from kapow.result import RunResult
+from kapow.spec import ONCE
+from kapow.spec import declared
+from kapow.spec import lifecycle
+
+SNAPSHOT_STAGES = ("env_handler", "appdir_handler", "config_handler")
+
+ABSENT = "absent"
+
+
+def snapshot_file(app: "Application") -> Path:
+    return Path(app.appdirs_class(app.name).user_cache_dir, f"{app.name}.snapshot")
+
+
+def stages(app: "Application") -> Tuple[str, ...]:
+    """
+    The application's snapshot stages: the `once` handlers among `SNAPSHOT_STAGES`.
+    """
+    return tuple(
+        key
+        for key in SNAPSHOT_STAGES
+        if key in app._handlers and lifecycle(app._handlers[key]) == ONCE
+    )
+
+
+def fingerprint(app: "Application") -> Tuple:
+    """
+    Everything except the files that the snapshot depends on.
+    """
+    from kapow import __version__
+
+    keys = stages(app)
+    prefixes = {f"{app.name.upper()}_"}
+    for key in keys:
+        prefix = spec.env_prefix(app._handlers[key], app.name)
+        if prefix is not None:
+            prefixes.add(prefix)
+    prefixes = tuple(prefixes)
+    env = tuple(
+        sorted(
+            (name, value)
+            for name, value in os.environ.items()
+            if name.startswith(prefixes) or name in _DIR_ENV_VARS
+        )
+    )
+    handlers = tuple((key, spec.fingerprint(app._handlers[key])) for key in keys)
+    return (
+        __version__,
+        sys.version,
+        app.name,
+        app.version,
+        os.getcwd(),
+        handlers,
+        env,
+    )
+
+
+def _file_stats(app: "Application", results: Dict[str, dict]) -> Dict[str, Tuple]:
+    """
+    {path: (mtime, size)} of the files, {path: None} of the directories and
+    {path: ABSENT} of the files that do not exist, in the stage results.
+    Files that other handlers declare they write (like the log file) are
+    left out.
+    """
+    keys = stages(app)
+    written_elsewhere = {
+        name
+        for key, handler in app._handlers.items()
+        if key not in keys
+        for name in (declared(handler) or ((), ()))[1]
+    }
+    stats = {}
+    for values in results.values():
+        for name in ("files", "dirs"):
+            namespace = values.get(name)
+            items = vars(namespace).items() if namespace is not None else ()
+            for attr, path in items:
+                if not isinstance(path, Path) or f"{name}.{attr}" in written_elsewhere:
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # a missing file the stages looked for, like a site
+                    # config, must still be missing to reuse the results
+                    if name == "files":
+                        stats[str(path)] = ABSENT
+                    continue
+                stats[str(path)] = (
+                    None if name == "dirs" else (stat.st_mtime_ns, stat.st_size)
+                )
+    return stats
+
+
+def _unchanged(stats: Dict[str, Tuple]) -> bool:
+    for path, expected in stats.items():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            if expected == ABSENT:
+                continue
+            return False
+        if expected == ABSENT:
+            return False
+        if expected is not None and expected != (stat.st_mtime_ns, stat.st_size):
+            return False
+    return True
+
+
+def restore(app: "Application") -> bool:
+    """
+    Load the application's snapshot into its warm results.
+
+    :return: True if the snapshot was restored.
+    """
+    keys = stages(app)
+    if not keys:
+        return False
+    snapshot = cache.load(snapshot_file(app), fingerprint(app))
+    if snapshot is cache.MISSING:
+        return False
+    try:
+        results, stats = snapshot
+        if set(results) != set(keys) or not _unchanged(stats):
+            return False
+    except Exception:
+        return False
+    app._once_results.update(results)
+    return True
+
+
+def save(app: "Application") -> bool:
+    """
+    Write the warm results of the application's snapshot stages to its snapshot.
+
+    :return: True if the snapshot was written.
+    """
+    keys = stages(app)
+    if not keys or not all(key in app._once_results for key in keys):
+        return False
+    # deferred values are computed now, so the snapshot holds plain values
+    try:
+        results = {
+            key: {
+                name: resolved(value) for name, value in app._once_results[key].items()
+            }
+            for key in keys
+        }
+    except Exception:
+        # a deferred value that fails, like an invalid config, is not saved;
+        # the error was already reported by the command that read it
+        return False
+    return cache.store(
+        snapshot_file(app), fingerprint(app), (results, _file_stats(app, results))
+    )
+
+
+def discard(app: "Application"):
+    try:
+        snapshot_file(app).unlink()
+    except OSError:
+        pass
+
+
+def snapshot_main(app: "Application", main: Callable) -> Callable:
+    """
+    Wrap the application's main function to restore the setup stages from
+    the snapshot, and to write the snapshot after a successful full run.
+    """
+
+    def _snapshot_main() -> RunResult:
+        if all(key in app._once_results for key in stages(app)):
+            # already warm in this process
+            return main()
+
+        restored = restore(app)
+        result = main()
+        if not isinstance(result, RunResult):
+            return result
+        if restored:
+            if result.failed_stage not in (None, "command"):
+                discard(app)
+        elif result.failed_stage is None or result.failed_stage == "command":
+            save(app)
+        return result
+
+    return _snapshot_main
@@ -0,0 +1,179 @@
+"""
+Declarations that handlers can attach to themselves to tell kapow
+how they interact with the pipeline.
+
+    @declare(reads=["dirs"], writes=["config", "files.config"])
+    def my_config_handler(app, ctx):
+        ...
+
+Names are dotted paths into the context object (`files.config`). Names
+starting with `app.` refer to attributes on the Application object.
+Handlers without a declaration are assumed to read and write everything.
+
+Handlers can also be marked `once` - in a warm application
+(`Application(..., warm=True)`) they run on the first call to main and their
+results are reused by later calls - or `per_invocation` (the default).
+
+Commands can declare the pipeline stages they need with `requires`. Stages
+that a command does not need (and that the needed stages do not depend on)
+are skipped when it runs on the default or compiled main function. The
+parallel (`kapow.scheduler`) and asyncio (`kapow.aio`) pipelines, which the
+default main also hands applications with async handlers to, run every
+stage:
+
+    @requires()
+    def version(ctx):
+        ...
+
+    @requires("config_handler")
+    def show_config(ctx):
+        ...
+"""
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+ONCE = "once"
+PER_INVOCATION = "per_invocation"
+
+
+def declare(reads: Iterable[str] = (), writes: Iterable[str] = ()) -> Callable:
+    """
+    Decorator that records what a handler reads from and writes to the context.
+
+    :param reads: context names the handler reads.
+    :param writes: context names the handler writes.
+    :return: decorator
+    """
+
+    def _declare(handler: Callable) -> Callable:
+        handler.kapow_reads = tuple(reads)
+        handler.kapow_writes = tuple(writes)
+        return handler
+
+    return _declare
+
+
+def declared(handler: Callable) -> Optional[Tuple[Tuple[str], Tuple[str]]]:
+    """
+    Return the (reads, writes) declaration of a handler or None if it has none.
+    """
+    writes = getattr(handler, "kapow_writes", None)
+    if writes is None:
+        return None
+    return getattr(handler, "kapow_reads", ()), writes
+
+
+def _describe(value: Any) -> Any:
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+    if isinstance(value, (list, tuple)):
+        return tuple(_describe(item) for item in value)
+    if isinstance(value, dict):
+        return tuple((key, _describe(item)) for key, item in value.items())
+    return value
+
+
+def fingerprinted(handler: Callable, *settings: Any) -> Callable:
+    """
+    Record the settings a factory built a handler with. Stored handler results
+    (see `kapow.snapshot`) are only reused by a handler with the same settings.
+    Functions are recorded by name.
+
+    :param handler: handler function
+    :param settings: the factory's arguments.
+    :return: the handler
+    """
+    handler.kapow_fingerprint = tuple(_describe(value) for value in settings)
+    return handler
+
+
+def fingerprint(handler: Callable) -> Any:
+    """
+    Return the handler's name and the settings it was built with.
+    """
+    return (
+        getattr(handler, "__qualname__", repr(handler)),
+        getattr(handler, "kapow_fingerprint", None),
+    )
+
+
+def reads_env(prefix: Optional[str] = None) -> Callable:
+    """
+    Decorator that records the prefix of the environment variables a handler
+    reads. Stored handler results (see `kapow.snapshot`) are only reused while
+    those variables are unchanged.
+
+    :param prefix: variable name prefix, None for `{APPNAME}_`.
+    :return: decorator
+    """
+
+    def _reads_env(handler: Callable) -> Callable:
+        handler.kapow_env_prefix = prefix
+        return handler
+
+    return _reads_env
+
+
+def env_prefix(handler: Callable, app_name: str) -> Optional[str]:
+    """
+    Return the prefix of the environment variables a handler reads, or None
+    if it has not recorded one.
+    """
+    if not hasattr(handler, "kapow_env_prefix"):
+        return None
+    prefix = handler.kapow_env_prefix
+    return prefix if prefix is not None else f"{app_name.upper()}_"
+
+
+def once(handler: Callable) -> Callable:
+    """
+    Decorator that marks a handler as a one-time setup handler.
+    """
+    handler.kapow_lifecycle = ONCE
+    return handler
+
+
+def per_invocation(handler: Callable) -> Callable:
+    """
+    Decorator that marks a handler to run on every call to main.
+    """
+    handler.kapow_lifecycle = PER_INVOCATION
+    return handler
+
+
+def lifecycle(handler: Callable) -> str:
+    """
+    Return the handler's lifecycle: `ONCE` or `PER_INVOCATION`.
+    """
+    return getattr(handler, "kapow_lifecycle", PER_INVOCATION)
+
+
+def requires(*stages: str) -> Callable:
+    """
+    Decorator that records the pipeline stages a command needs. Stages are
+    handler names (`config_handler`), the `_handler` suffix may be left out.
+    The cli handler always runs. Commands without the decorator need every stage.
+
+    Stages are only skipped by the default and compiled main functions of
+    applications without async handlers. The parallel and asyncio pipelines
+    ignore the requirements and run every stage.
+
+    :param stages: handler names.
+    :return: decorator
+    """
+
+    def _requires(command: Callable) -> Callable:
+        command.kapow_requires = tuple(stages)
+        return command
+
+    return _requires
+
+
+def requirements(command: Callable) -> Optional[Tuple[str]]:
+    """
+    Return the stages a command requires or None if it has no requirements.
+    """
+    return getattr(command, "kapow_requires", None)
@@ -0,0 +1,105 @@
+"""
+Reuse of one-time handler results across calls to main.
+
+When an application is created with `warm=True`, handlers marked with
+`kapow.spec.once` run on the first call to main. The context attributes
+they set are stored on the application, and later calls copy those
+attributes onto the new context instead of running the handler again.
+`app.reset()` clears the stored results.
+
+Only the attributes a handler declares it writes (`kapow.spec.declare`) are
+stored, so the results of handlers that run at the same time (see
+`kapow.scheduler`) do not leak into each other. Undeclared handlers never run
+concurrently, and everything they add or replace is stored.
+"""
+from functools import wraps
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Set
+from kapow import confirm
+from kapow.spec import ONCE
+from kapow.spec import declared
+from kapow.spec import lifecycle
+
+_MISSING = object()
+
+
+def _state(context: Any) -> dict:
+    return getattr(context, "__dict__", None)
+
+
+def written_names(handler: Callable) -> Optional[Set[str]]:
+    """
+    The context attributes a handler declares it writes, or None if it has
+    no declaration. `files.config` is the `files` attribute.
+    """
+    spec = declared(handler)
+    if spec is None:
+        return None
+    return {name.split(".")[0] for name in spec[1] if not name.startswith("app.")}
+
+
+def changes(before: dict, context: Any, names: Optional[Set[str]] = None) -> dict:
+    """
+    Return the context attributes that were added or replaced since `before`.
+
+    :param names: only look at these attributes.
+    """
+    return {
+        name: value
+        for name, value in _state(context).items()
+        if before.get(name, _MISSING) is not value and (names is None or name in names)
+    }
+
+
+def replay(app: "Application", key: str, context: Any) -> bool:
+    """
+    Apply the stored results of handler `key` to the context.
+
+    :return: True if there were stored results.
+    """
+    results = app._once_results.get(key)
+    if results is None:
+        return False
+    for name, value in results.items():
+        setattr(context, name, value)
+    return True
+
+
+def wrap(app: "Application", key: str, handler: Callable) -> Callable:
+    """
+    Return the handler to run for `key`: either the handler itself, or - for
+    `once` handlers of a warm application - a wrapper that reuses its results.
+    """
+    if not app.warm or lifecycle(handler) != ONCE:
+        return handler
+    names = written_names(handler)
+
+    if confirm.is_async(handler):
+
+        @wraps(handler)
+        async def _async_once(app, context):
+            if replay(app, key, context):
+                return app, context
+            before = _state(context)
+            before = dict(before) if before is not None else None
+            app, context = await handler(app, context)
+            if before is not None and _state(context) is not None:
+                app._once_results[key] = changes(before, context, names)
+            return app, context
+
+        return _async_once
+
+    @wraps(handler)
+    def _once(app, context):
+        if replay(app, key, context):
+            return app, context
+        before = _state(context)
+        before = dict(before) if before is not None else None
+        app, context = handler(app, context)
+        if before is not None and _state(context) is not None:
+            app._once_results[key] = changes(before, context, names)
+        return app, context
+
+    return _once
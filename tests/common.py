@@ -1,3 +1,8 @@
+from pathlib import Path
+from kapow import Application
+from kapow.handlers import docopt
+
+
 class Handler:
     def __init__(self, name, messages, func=None, raise_err=False):
         self.messages = messages
@@ -46,3 +51,71 @@ Options:
   -h --help      Show this help message.
   -v --version   Show app version.
 """
+
+
+class TempAppDirs:
+    def __init__(self, tmpdir):
+        self._dir = tmpdir
+
+    def __call__(self, name):
+        self.name = name
+        return self
+
+    @property
+    def user_data_dir(self):
+        return Path(self._dir, self.name)
+
+    @property
+    def user_log_dir(self):
+        return Path(self._dir, self.name, "logs")
+
+    @property
+    def user_cache_dir(self):
+        return Path(self._dir, "cache", self.name)
+
+    @property
+    def site_config_dir(self):
+        return Path(self._dir, "site", self.name)
+
+    @property
+    def user_name(self):
+        return "testuser"
+
+
+def handler_app(messages, **handlers):
+    """
+    A "test" application whose cli, env and command finder stages are
+    `Handler`s that record into `messages`, and whose other default stages
+    are turned off. `handlers` replace or add to these.
+    """
+    defaults = dict(
+        cli_handler=Handler("CLI", messages),
+        env_handler=Handler("ENV", messages),
+        appdir_handler=None,
+        config_handler=None,
+        context_handler=None,
+        logging_config_handler=None,
+        error_handler=Handler("ERR", messages).error_handler(),
+    )
+    if "command_func" not in handlers:
+        defaults["command_finder"] = Handler("CMD", messages).command()
+    defaults.update(handlers)
+    return Application("test", "0.1.0", **defaults)
+
+
+def docopt_app(tmpdir=None, cli_args=("run",), appdirs_class=None, **handlers):
+    """
+    A "testapp" application that parses CLI_DOCS, runs with `cli_args` and
+    keeps its directories in `tmpdir`, or those of `appdirs_class`. Logging
+    is off unless a logging handler is given.
+    """
+    defaults = dict(
+        cli_handler=docopt.docopt_handler(CLI_DOCS),
+        logging_config_handler=None,
+    )
+    defaults.update(handlers)
+    if appdirs_class is None and tmpdir is not None:
+        appdirs_class = TempAppDirs(tmpdir)
+    app = Application(name="testapp", version="0.0.1", **defaults)
+    app.initialize(cli_args=list(cli_args), appdirs_class=appdirs_class)
+    return app
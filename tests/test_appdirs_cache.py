@@ -0,0 +1,35 @@
+from pathlib import Path
+import pytest
+from kapow import appdirs
+from kapow.appdirs import AppDirs
+
+
+@pytest.mark.skipif(
+    appdirs.system in ("win32", "darwin"), reason="uses the XDG directory layout"
+)
+def test_appdirs_memoized(monkeypatch):
+    appdirs.clear_cache()
+    monkeypatch.setenv("XDG_DATA_HOME", "/tmp/data-one")
+
+    calls = []
+    user_data_dir = appdirs.user_data_dir
+
+    def counting_user_data_dir(*args, **kwargs):
+        calls.append(args)
+        return user_data_dir(*args, **kwargs)
+
+    monkeypatch.setattr(appdirs, "user_data_dir", counting_user_data_dir)
+
+    assert AppDirs("myapp").user_data_dir == Path("/tmp/data-one/myapp")
+    assert AppDirs("myapp").user_data_dir == Path("/tmp/data-one/myapp")
+    assert len(calls) == 1
+
+    # a different app resolves its own path
+    assert AppDirs("otherapp").user_data_dir == Path("/tmp/data-one/otherapp")
+    assert len(calls) == 2
+
+    # changing a relevant environment variable invalidates the cache
+    monkeypatch.setenv("XDG_DATA_HOME", "/tmp/data-two")
+    assert AppDirs("myapp").user_data_dir == Path("/tmp/data-two/myapp")
+    assert len(calls) == 3
+    appdirs.clear_cache()
@@ -0,0 +1,108 @@
+import asyncio
+from common import Handler
+from common import handler_app
+from kapow.spec import declare
+
+
+def test_async_handlers_and_command():
+    messages = []
+
+    async def env_handler(app, ctx):
+        await asyncio.sleep(0)
+        messages.append("ASYNC ENV")
+        ctx.value = 42
+        return app, ctx
+
+    async def command(ctx):
+        await asyncio.sleep(0)
+        messages.append(f"ASYNC CMD {ctx.value}")
+
+    app = handler_app(messages, env_handler=env_handler, command_func=command)
+    app.main()
+
+    assert messages == ["CLI", "ASYNC ENV", "ASYNC CMD 42"]
+
+
+def test_async_command_with_sync_handlers():
+    messages = []
+
+    async def command(ctx):
+        messages.append("ASYNC CMD")
+
+    app = handler_app(messages, env_handler=None, command_func=command)
+    app.main()
+
+    assert messages == ["CLI", "ASYNC CMD"]
+
+
+def test_async_error_handler():
+    messages = []
+
+    async def error_handler(app, ctx, error):
+        messages.append(f"ASYNC ERR {error}")
+
+    app = handler_app(
+        messages,
+        cli_handler=Handler("CLI", messages, raise_err=True),
+        env_handler=None,
+        command_finder=Handler("CMD", messages).command(),
+        error_handler=error_handler,
+    )
+    app.main()
+
+    assert messages == ["CLI", "ASYNC ERR CLI raised an error"]
+
+
+def test_amain_runs_independent_async_handlers_concurrently():
+    messages = []
+    both_started = asyncio.Event()
+    started = []
+
+    def make_handler(name):
+        @declare(writes=[name])
+        async def handler(app, ctx):
+            started.append(name)
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=5)
+            setattr(ctx, name, True)
+            return app, ctx
+
+        return handler
+
+    async def command(ctx):
+        messages.append(f"CMD {ctx.a} {ctx.b}")
+
+    app = handler_app(
+        messages,
+        cli_handler=None,
+        env_handler=make_handler("a"),
+        appdir_handler=make_handler("b"),
+        command_func=command,
+    )
+
+    asyncio.run(app.amain())
+
+    assert messages == ["CMD True True"]
+
+
+def test_amain_async_handler_error():
+    messages = []
+
+    @declare(writes=["a"])
+    async def failing_handler(app, ctx):
+        raise Exception("async failure")
+
+    @declare(writes=["b"])
+    async def other_handler(app, ctx):
+        return app, ctx
+
+    app = handler_app(
+        messages,
+        env_handler=failing_handler,
+        appdir_handler=other_handler,
+        command_finder=Handler("CMD", messages).command(),
+    )
+    app.main()
+
+    assert messages == ["CLI", "ERR async failure"]
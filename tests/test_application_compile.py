@@ -0,0 +1,53 @@
+import pytest
+from common import Handler
+from common import handler_app
+from kapow import LaunchError
+
+
+def test_compiled_main_runs_pipeline():
+    messages = []
+    app = handler_app(messages)
+    main = app.compile()
+
+    assert app.main is main
+    assert app.compile() is main
+
+    main()
+    main()
+    assert messages == ["CLI", "ENV", "CMD HANDLER", "CMD CALLED"] * 2
+
+
+def test_compiled_main_handles_errors():
+    messages = []
+    app = handler_app(messages, env_handler=Handler("ENV", messages, raise_err=True))
+    app.compile()()
+    assert messages == ["CLI", "ENV", "ERR ENV raised an error"]
+
+    messages.clear()
+    app = handler_app(
+        messages, command_finder=Handler("CMD", messages, raise_err=True).command()
+    )
+    app.compile()()
+    assert messages == [
+        "CLI",
+        "ENV",
+        "CMD HANDLER",
+        "CMD CALLED",
+        "ERR CMD raised an error",
+    ]
+
+
+def test_compiled_application_is_frozen():
+    messages = []
+    app = handler_app(messages)
+    app.compile()
+    with pytest.raises(LaunchError) as ex:
+        app._add_handler("after_cli_handler", Handler("AFTER", messages))
+    assert "has been compiled" in str(ex.value)
+
+
+def test_compile_requires_command():
+    app = handler_app([], command_finder=None)
+    with pytest.raises(LaunchError) as ex:
+        app.compile()
+    assert "without a command_finder" in str(ex.value)
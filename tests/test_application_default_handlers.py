@@ -5,27 +5,7 @@ from kapow import Application
 from kapow.errors import LaunchError
 from kapow.handlers import docopt
 from tests.common import CLI_DOCS
-
-
-class TempAppDirs:
-    def __init__(self, tmpdir):
-        self._dir = tmpdir
-
-    def __call__(self, name):
-        self.name = name
-        return self
-
-    @property
-    def user_data_dir(self):
-        return Path(self._dir, self.name)
-
-    @property
-    def user_log_dir(self):
-        return Path(self._dir, self.name, "logs")
-
-    @property
-    def user_name(self):
-        return "testuser"
+from tests.common import TempAppDirs
 
 
 def test_kapow_default_handlers_app_file_creation(capsys):
@@ -0,0 +1,101 @@
+import json
+from common import Handler
+from kapow import Application
+from kapow.profiling import Profiler
+
+
+def test_application_profiler_records_each_stage():
+    messages = []
+    app = Application(
+        "test",
+        "0.1.0",
+        cli_handler=Handler("CLI", messages),
+        env_handler=Handler("ENV", messages),
+        appdir_handler=Handler("APPDIR", messages),
+        config_handler=Handler("CONFIG", messages),
+        context_handler=Handler("CONTEXT", messages),
+        logging_config_handler=Handler("LOGGING", messages),
+        command_finder=Handler("CMD", messages).command(),
+        error_handler=Handler("ERR", messages).error_handler(),
+        profile=True,
+    )
+    app.main()
+
+    names = [t.name for t in app.profiler.timings]
+    assert names == [
+        "cli_handler",
+        "env_handler",
+        "appdir_handler",
+        "config_handler",
+        "context_handler",
+        "logging_config_handler",
+        "command_finder",
+        "command",
+    ]
+    for timing in app.profiler.timings:
+        assert timing.wall >= 0
+        assert timing.cpu >= 0
+        assert timing.memory is not None
+
+    # timings are reset between runs
+    app.main()
+    assert len(app.profiler.timings) == 8
+
+
+def test_application_profiler_records_failed_stage():
+    messages = []
+    app = Application(
+        "test",
+        "0.1.0",
+        cli_handler=Handler("CLI", messages),
+        env_handler=Handler("ENV", messages, raise_err=True),
+        appdir_handler=Handler("APPDIR", messages),
+        config_handler=None,
+        context_handler=None,
+        logging_config_handler=None,
+        command_finder=Handler("CMD", messages).command(),
+        error_handler=Handler("ERR", messages).error_handler(),
+        profile=Profiler(memory=False),
+    )
+    app.main()
+
+    assert [t.name for t in app.profiler.timings] == ["cli_handler", "env_handler"]
+    assert app.profiler.timings[0].memory is None
+
+
+def test_application_profiler_exports(tmp_path):
+    messages = []
+    app = Application(
+        "test",
+        "0.1.0",
+        cli_handler=Handler("CLI", messages),
+        env_handler=None,
+        appdir_handler=None,
+        config_handler=None,
+        context_handler=None,
+        logging_config_handler=None,
+        command_finder=Handler("CMD", messages).command(),
+        profile=True,
+    )
+    app.main()
+
+    report = json.loads(app.profiler.to_json(tmp_path / "timings.json"))
+    assert [s["name"] for s in report["stages"]] == [
+        "cli_handler",
+        "command_finder",
+        "command",
+    ]
+    assert (tmp_path / "timings.json").exists()
+
+    trace = json.loads(app.profiler.to_chrome_trace())
+    assert [e["name"] for e in trace["traceEvents"]] == [
+        "cli_handler",
+        "command_finder",
+        "command",
+    ]
+    assert all(e["ph"] == "X" for e in trace["traceEvents"])
+
+
+def test_application_profiling_off_by_default():
+    app = Application("test", "0.1.0", command_finder=Handler("CMD", []).command())
+    assert app.profiler is None
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from common import Handler
+from common import handler_app
+from kapow.scheduler import parallel_main_factory
+
+
+def make_app(messages, command=None, **kwargs):
+    def command_func(ctx):
+        messages.append("COMMAND")
+        return "done"
+
+    return handler_app(messages, command_func=command or command_func, **kwargs)
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_main_returns_result(compiled):
+    messages = []
+    app = make_app(messages)
+    main = app.compile() if compiled else app.main
+    result = main()
+    assert result.ok
+    assert result.exit_code == 0
+    assert result.value == "done"
+    assert result.error is None
+    assert result.failed_stage is None
+    assert list(result.timings) == [
+        "cli_handler",
+        "env_handler",
+        "command_finder",
+        "command",
+    ]
+    assert all(seconds >= 0 for seconds in result.timings.values())
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_main_result_failed_stage(compiled):
+    messages = []
+    app = make_app(messages, env_handler=Handler("ENV", messages, raise_err=True))
+    main = app.compile() if compiled else app.main
+    result = main()
+    assert not result.ok
+    assert result.exit_code == 1
+    assert result.failed_stage == "env_handler"
+    assert str(result.error) == "ENV raised an error"
+    assert "command" not in result.timings
+    # the error handler still reports the error
+    assert messages[-1] == "ERR ENV raised an error"
+
+
+def test_main_result_failed_command():
+    def command(ctx):
+        raise ValueError("bad command")
+
+    messages = []
+    result = make_app(messages, command=command).main()
+    assert result.exit_code == 1
+    assert result.failed_stage == "command"
+    assert isinstance(result.error, ValueError)
+
+
+def test_async_main_returns_result():
+    async def command(ctx):
+        await asyncio.sleep(0)
+        return "async done"
+
+    result = make_app([], command=command).main()
+    assert result.ok
+    assert result.value == "async done"
+
+
+def test_parallel_main_returns_result():
+    messages = []
+    result = make_app(messages, main_factory=parallel_main_factory()).main()
+    assert result.ok
+    assert result.value == "done"
+
+
+def test_run_exits_with_exit_code():
+    app = make_app([], env_handler=Handler("ENV", [], raise_err=True))
+    with pytest.raises(SystemExit) as ex:
+        app.run()
+    assert ex.value.code == 1
+
+    with pytest.raises(SystemExit) as ex:
+        make_app([]).run()
+    assert ex.value.code == 0
@@ -0,0 +1,174 @@
+import shutil
+from pathlib import Path
+import pytest
+from kapow import snapshot
+from kapow.spec import declare
+from kapow.spec import once
+from tests.common import docopt_app
+
+calls = []
+
+
+@once
+@declare(reads=["dirs"], writes=["files.config", "config"])
+def counting_config_handler(app, ctx):
+    calls.append("config")
+    ctx.files.config = Path(ctx.dirs.app_home, "testapp.toml")
+    if not ctx.files.config.exists():
+        ctx.files.config.write_text("value = 1\n")
+    ctx.config = {"value": int(ctx.files.config.read_text().split("=")[1])}
+    return app, ctx
+
+
+def command(ctx):
+    return ctx.config["value"]
+
+
+def make_app(tmpdir, **kwargs):
+    handlers = dict(config_handler=counting_config_handler, command_func=command)
+    handlers.update(kwargs)
+    return docopt_app(tmpdir, snapshot=True, **handlers)
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+def test_snapshot_restores_setup_stages(tmp_path):
+    app = make_app(tmp_path)
+    assert app.main().value == 1
+    assert calls == ["config"]
+    assert snapshot.snapshot_file(app).exists()
+
+    # a new launch restores the stages from the snapshot
+    result = make_app(tmp_path).main()
+    assert result.ok
+    assert result.value == 1
+    assert calls == ["config"]
+
+
+def test_snapshot_invalidated_by_config_change(tmp_path):
+    app = make_app(tmp_path)
+    app.main()
+    Path(tmp_path, "testapp", "testapp.toml").write_text("value = 22\n")
+
+    assert make_app(tmp_path).main().value == 22
+    assert calls == ["config", "config"]
+    assert make_app(tmp_path).main().value == 22
+    assert calls == ["config", "config"]
+
+
+def test_snapshot_invalidated_by_environment(tmp_path, monkeypatch):
+    make_app(tmp_path).main()
+    monkeypatch.setenv("TESTAPP_SETTING", "on")
+    app = make_app(tmp_path)
+    app.main()
+    assert calls == ["config", "config"]
+    assert app._once_results["env_handler"]["env_vars"] == {"TESTAPP_SETTING": "on"}
+
+
+def test_snapshot_invalidated_by_missing_directories(tmp_path):
+    make_app(tmp_path).main()
+    shutil.rmtree(Path(tmp_path, "testapp"))
+
+    assert make_app(tmp_path).main().value == 1
+    assert calls == ["config", "config"]
+    assert Path(tmp_path, "testapp", "testapp.toml").exists()
+
+
+def test_snapshot_ignores_corrupt_file(tmp_path):
+    app = make_app(tmp_path)
+    app.main()
+    snapshot.snapshot_file(app).write_bytes(b"not a snapshot")
+
+    assert make_app(tmp_path).main().value == 1
+    assert calls == ["config", "config"]
+
+
+def test_snapshot_with_default_handlers(tmp_path):
+    def config_command(ctx):
+        return ctx.config["app"]["debug"], ctx.current_user
+
+    def default_app():
+        return make_app(
+            tmp_path,
+            config_handler=True,
+            logging_config_handler=True,
+            command_func=config_command,
+        )
+
+    assert default_app().main().value == (True, "testuser")
+
+    app = default_app()
+    assert snapshot.restore(app)
+    assert app.main().value == (True, "testuser")
+
+
+def test_snapshot_invalidated_by_handler_settings(tmp_path):
+    import tomlkit
+    import kapow.handlers.core
+    from kapow.schema import Settings
+
+    def settings_app(**kwargs):
+        return make_app(
+            tmp_path,
+            config_handler=kapow.handlers.core.config_handler_factory(**kwargs),
+            command_func=lambda ctx: ctx.config,
+        )
+
+    assert isinstance(settings_app().main().value, tomlkit.TOMLDocument)
+    assert type(settings_app(parser="tomllib").main().value) is dict
+
+    schema = {"app": {"debug": bool}}
+    assert isinstance(settings_app(schema=schema).main().value, Settings)
+    app = settings_app(schema=schema)
+    assert snapshot.restore(app)
+    assert isinstance(app.main().value, Settings)
+
+
+def test_snapshot_invalidated_by_cwd_and_new_files(tmp_path, monkeypatch):
+    import kapow.handlers.core
+
+    def layered_app():
+        return make_app(
+            tmp_path,
+            config_handler=kapow.handlers.core.layered_config_handler_factory(
+                precedence=("site", "user", "project"), config_writer=None
+            ),
+            command_func=lambda ctx: ctx.config.get("name"),
+        )
+
+    for name in ("p1", "p2"):
+        Path(tmp_path, name).mkdir()
+        Path(tmp_path, name, ".testapp.config.ini").write_text(f'name = "{name}"\n')
+
+    monkeypatch.chdir(Path(tmp_path, "p1"))
+    assert layered_app().main().value == "p1"
+    monkeypatch.chdir(Path(tmp_path, "p2"))
+    assert layered_app().main().value == "p2"
+
+    # a site config created after the snapshot was taken
+    Path(tmp_path, "p2", ".testapp.config.ini").unlink()
+    assert layered_app().main().value is None
+    Path(tmp_path, "site", "testapp").mkdir(parents=True)
+    Path(tmp_path, "site", "testapp", "testapp.config.ini").write_text(
+        'name = "site"\n'
+    )
+    assert layered_app().main().value == "site"
+
+
+def test_snapshot_invalidated_by_handler_env_prefix(tmp_path, monkeypatch):
+    import kapow.handlers.core
+
+    def env_app():
+        return make_app(
+            tmp_path,
+            env_handler=kapow.handlers.core.env_handler_factory(prefix="MYP_"),
+            command_func=lambda ctx: ctx.env,
+        )
+
+    monkeypatch.setenv("MYP_A", "1")
+    assert env_app().main().value == {"a": 1}
+    monkeypatch.setenv("MYP_A", "2")
+    assert env_app().main().value == {"a": 2}
@@ -0,0 +1,168 @@
+from common import Handler
+from common import handler_app
+from kapow import Application
+from kapow.handlers import docopt
+from kapow.spec import once
+from tests.common import CLI_DOCS
+from tests.common import TempAppDirs
+
+
+def make_app(messages, **kwargs):
+    def set_value(app, ctx, messages):
+        ctx.value = len(messages)
+
+    kwargs.setdefault("env_handler", once(Handler("ENV", messages, func=set_value)))
+    return handler_app(messages, **kwargs)
+
+
+def test_warm_application_runs_once_handlers_once():
+    messages = []
+    values = []
+    app = make_app(messages, warm=True)
+
+    def capture(app, ctx, messages):
+        values.append(ctx.value)
+
+    app._add_handler("after_env_handler", Handler("AFTER", messages, func=capture))
+
+    app.main()
+    app.main()
+    app.compile()()
+
+    assert messages == [
+        "CLI",
+        "ENV",
+        "AFTER",
+        "CMD HANDLER",
+        "CMD CALLED",
+        "CLI",
+        "AFTER",
+        "CMD HANDLER",
+        "CMD CALLED",
+        "CLI",
+        "AFTER",
+        "CMD HANDLER",
+        "CMD CALLED",
+    ]
+    # the once handler's context values are reused
+    assert values == [2, 2, 2]
+
+    app.reset()
+    app.main()
+    assert messages[13:] == ["CLI", "ENV", "AFTER", "CMD HANDLER", "CMD CALLED"]
+
+
+def test_cold_application_runs_every_handler():
+    messages = []
+    app = make_app(messages)
+    app.main()
+    app.main()
+    assert messages.count("ENV") == 2
+
+
+def test_warm_application_failed_once_handler_runs_again():
+    messages = []
+    app = make_app(
+        messages, warm=True, env_handler=once(Handler("ENV", messages, raise_err=True))
+    )
+    app.main()
+    app.main()
+    assert messages == [
+        "CLI",
+        "ENV",
+        "ERR ENV raised an error",
+        "CLI",
+        "ENV",
+        "ERR ENV raised an error",
+    ]
+
+
+def test_warm_application_default_handlers(tmp_path, monkeypatch):
+    contexts = []
+
+    def command(ctx):
+        contexts.append(ctx)
+
+    app = Application(
+        name="testapp",
+        version="0.0.1",
+        cli_handler=docopt.docopt_handler(CLI_DOCS),
+        command_func=command,
+        warm=True,
+    )
+    app.initialize(cli_args=["run"], appdirs_class=TempAppDirs(tmp_path))
+    app.main()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("setup handlers should not run again")
+
+    monkeypatch.setattr("logging.config.fileConfig", fail)
+    monkeypatch.setattr("tomlkit.loads", fail)
+
+    app.cli_args = ["run", "--debug"]
+    app.main()
+
+    first, second = contexts
+    assert first is not second
+    assert second.cli_args["--debug"] is True
+    assert second.config is first.config
+    assert second.dirs is first.dirs
+    assert second.files.logging_config.exists()
+
+
+def test_once_results_hold_only_declared_writes():
+    from kapow.spec import declare
+
+    @once
+    @declare(writes=["value"])
+    def value_handler(app, ctx):
+        ctx.value = 1
+        # stands in for a handler running at the same time
+        ctx.cli_args = ["first"]
+        return app, ctx
+
+    messages = []
+    app = make_app(messages, env_handler=value_handler, warm=True)
+    app.main()
+    assert app._once_results["env_handler"] == {"value": 1}
+
+
+def test_warm_parallel_application_replays_current_cli_args():
+    import threading
+    from kapow.scheduler import parallel_main_factory
+    from kapow.spec import declare
+
+    started = threading.Event()
+
+    @declare(writes=["cli_args"])
+    def cli_handler(app, ctx):
+        started.wait(1)
+        ctx.cli_args = list(app.cli_args)
+        return app, ctx
+
+    @once
+    @declare(writes=["env_vars"])
+    def env_handler(app, ctx):
+        started.set()
+        # the cli handler writes while this handler is running
+        threading.Event().wait(0.05)
+        ctx.env_vars = {}
+        return app, ctx
+
+    app = Application(
+        "test",
+        "0.1.0",
+        cli_handler=cli_handler,
+        env_handler=env_handler,
+        appdir_handler=None,
+        config_handler=None,
+        context_handler=None,
+        logging_config_handler=None,
+        command_func=lambda ctx: ctx.cli_args,
+        main_factory=parallel_main_factory(max_workers=2),
+        warm=True,
+    )
+    app.cli_args = ["first"]
+    assert app.main().value == ["first"]
+    app.cli_args = ["second"]
+    assert app.main().value == ["second"]
@@ -0,0 +1,138 @@
+import argparse
+from types import SimpleNamespace
+import pytest
+from kapow import Application
+from kapow import LaunchError
+from kapow.handlers import argparse as ap
+
+built = []
+
+
+def create_root_parser():
+    parser = argparse.ArgumentParser(prog="prog")
+    parser.set_defaults(command=show_help)
+    return parser
+
+
+def show_help(ctx):
+    pass
+
+
+def run(ctx):
+    ctx.result = f"run {ctx.cli_args.name}"
+
+
+def stop(ctx):
+    ctx.result = "stop"
+
+
+def add_run_parser(parser):
+    built.append("run")
+    parser.add_argument("--name", default="buddy")
+    parser.set_defaults(command=f"{__name__}:run")
+
+
+def add_stop_parser(parser):
+    built.append("stop")
+    parser.set_defaults(command=stop)
+
+
+SUBCOMMANDS = {
+    "run": ("Say hello.", f"{__name__}:add_run_parser"),
+    "stop": f"{__name__}.add_stop_parser",
+}
+
+
+def run_app(argv):
+    results = []
+
+    def capture(app, ctx):
+        results.append(ctx)
+        return app, ctx
+
+    app = Application(
+        "prog",
+        "0.1.0",
+        cli_handler=ap.lazy_argparse_handler(create_root_parser, SUBCOMMANDS),
+        env_handler=None,
+        appdir_handler=None,
+        config_handler=None,
+        context_handler=None,
+        logging_config_handler=None,
+        command_finder=ap.argparse_command_finder,
+        after_command_finder=capture,
+    )
+    app.initialize(cli_args=argv)
+    app.main()
+    ctx = results[0]
+    app.command(ctx)
+    return ctx
+
+
+def test_lazy_argparse_builds_only_the_selected_subcommand():
+    built.clear()
+    ctx = run_app(["run", "--name", "bob"])
+    assert ctx.result == "run bob"
+    assert built == ["run"]
+
+    ctx = run_app(["stop"])
+    assert ctx.result == "stop"
+    assert built == ["run", "stop"]
+
+
+def test_lazy_argparse_skips_root_option_values():
+    def create_parser_with_profile():
+        parser = create_root_parser()
+        parser.add_argument("--profile")
+        return parser
+
+    built.clear()
+    handler = ap.lazy_argparse_handler(create_parser_with_profile, SUBCOMMANDS)
+    app = SimpleNamespace(cli_args=["--profile", "stop", "run", "--name", "bob"])
+    app, ctx = handler(app, SimpleNamespace())
+    assert ctx.cli_args.profile == "stop"
+    assert ctx.cli_args.name == "bob"
+    assert ctx.cli_args.command == f"{__name__}:run"
+    assert built == ["run"]
+
+
+def test_lazy_argparse_without_subcommand():
+    built.clear()
+    handler = ap.lazy_argparse_handler(create_root_parser, SUBCOMMANDS)
+    app, ctx = handler(SimpleNamespace(cli_args=[]), SimpleNamespace())
+    assert ctx.cli_args.command is show_help
+    assert built == []
+
+
+def test_lazy_argparse_help_lists_all_subcommands(capsys):
+    built.clear()
+    handler = ap.lazy_argparse_handler(create_root_parser, SUBCOMMANDS)
+    app = SimpleNamespace(cli_args=["--help"])
+    with pytest.raises(SystemExit):
+        handler(app, SimpleNamespace())
+    output = capsys.readouterr().out
+    assert "run" in output and "Say hello." in output and "stop" in output
+    assert built == []
+
+
+def test_argparse_handler_accepts_parser_factory():
+    calls = []
+
+    def create_parser():
+        calls.append(1)
+        parser = create_root_parser()
+        parser.add_argument("--debug", action="store_true")
+        return parser
+
+    handler = ap.argparse_handler(create_parser)
+    assert calls == []
+    for _ in range(2):
+        app, ctx = handler(SimpleNamespace(cli_args=["--debug"]), SimpleNamespace())
+        assert ctx.cli_args.debug is True
+    assert calls == [1]
+
+
+def test_import_string_error():
+    with pytest.raises(LaunchError) as ex:
+        ap.import_string("kapow.bogus:thing")
+    assert "Unable to import `kapow.bogus:thing`" in str(ex.value)
@@ -0,0 +1,99 @@
+import os
+import pytest
+from kapow.spec import once
+from tests.common import docopt_app
+
+
+def make_app(config_error=None):
+    calls = []
+
+    @once
+    def config_handler(app, ctx):
+        calls.append(1)
+        if config_error:
+            raise config_error
+        ctx.config = {}
+        return app, ctx
+
+    def command(ctx):
+        print(f"calls={len(calls)} debug={ctx.cli_args['--debug']}")
+        if ctx.cli_args["--debug"]:
+            raise Exception("debug failure")
+
+    app = docopt_app(
+        appdir_handler=None, config_handler=config_handler, command_func=command
+    )
+    return app, calls
+
+
+ARGV_LIST = [["run"], ["run", "--debug"], ["--version"], ["run"]]
+
+
+def check_results(results):
+    assert [r.argv for r in results] == ARGV_LIST
+    assert [r.exit_code for r in results] == [0, 1, 0, 0]
+    assert results[0].stdout == "calls=1 debug=False\n"
+    assert results[0].error is None
+    assert results[1].stdout == "calls=1 debug=True\n"
+    assert results[1].error == "Exception: debug failure"
+    assert "debug failure" in results[1].traceback
+    assert results[2].stdout.strip() == "0.0.1"
+    assert results[3].stdout == "calls=1 debug=False\n"
+
+
+def test_run_many_in_process(capsys):
+    app, calls = make_app()
+    results = app.run_many(ARGV_LIST, workers=1, capture_output=True)
+    check_results(results)
+    assert len(calls) == 1
+    # errors are collected rather than reported
+    assert capsys.readouterr().out == ""
+    # the application is left as it was
+    assert app.warm is False
+    assert app._once_results == {}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="worker pool requires os.fork")
+def test_run_many_worker_pool():
+    app, calls = make_app()
+    results = app.run_many(ARGV_LIST, workers=2, capture_output=True)
+    check_results(results)
+    # the workers warmed up in their own processes
+    assert calls == []
+
+
+WORKERS = [
+    1,
+    pytest.param(
+        2,
+        marks=pytest.mark.skipif(
+            not hasattr(os, "fork"), reason="worker pool requires os.fork"
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize("workers", WORKERS)
+def test_run_many_collects_warm_up_errors(workers):
+    app, _ = make_app(config_error=ValueError("bad config"))
+    results = app.run_many([["run"], ["run"], ["--version"]], workers=workers)
+    assert [r.exit_code for r in results] == [1, 1, 0]
+    assert [r.failed_stage for r in results] == ["config_handler"] * 2 + [None]
+    assert results[0].error == "ValueError: bad config"
+
+
+@pytest.mark.parametrize("workers", WORKERS)
+def test_run_many_returns_command_values(workers):
+    def command(ctx):
+        if ctx.cli_args["--debug"]:
+            return lambda: "not picklable"
+        return {"debug": False}
+
+    app = docopt_app(appdir_handler=None, config_handler=None, command_func=command)
+    results = app.run_many([["run"], ["run", "--debug"]], workers=workers)
+    assert [r.exit_code for r in results] == [0, 0]
+    assert results[0].value == {"debug": False}
+    if workers == 1:
+        assert results[1].value() == "not picklable"
+    else:
+        assert results[1].value is None
@@ -0,0 +1,134 @@
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from kapow import LaunchError
+from kapow.handlers import docopt
+from kapow.scheduler import command_first
+from kapow.spec import declare
+from kapow.spec import requires
+from tests.common import docopt_app
+
+
+@requires()
+def run(ctx):
+    return ctx.cli_args["--debug"]
+
+
+@requires("config")
+def run_with_config(ctx):
+    return ctx.config["app"]["debug"]
+
+
+def run_everything(ctx):
+    return ctx.current_user
+
+
+def make_app(tmpdir, command, **kwargs):
+    return docopt_app(
+        tmpdir,
+        command_finder=docopt.docopt_command_finder(SimpleNamespace(run=command)),
+        logging_config_handler=True,
+        **kwargs,
+    )
+
+
+def test_command_is_found_after_cli_handler(tmp_path):
+    app = make_app(tmp_path, run)
+    assert command_first(app) == [
+        "cli_handler",
+        "command_finder",
+        "env_handler",
+        "appdir_handler",
+        "config_handler",
+        "context_handler",
+        "logging_config_handler",
+    ]
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_command_without_requirements_skips_every_stage(tmp_path, compiled):
+    app = make_app(tmp_path, run)
+    main = app.compile() if compiled else app.main
+    result = main()
+    assert result.ok
+    assert result.value is False
+    assert list(result.timings) == ["cli_handler", "command_finder", "command"]
+    assert not Path(tmp_path, "testapp").exists()
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_command_runs_required_stages_and_their_dependencies(tmp_path, compiled):
+    app = make_app(tmp_path, run_with_config)
+    main = app.compile() if compiled else app.main
+    result = main()
+    assert result.ok
+    assert result.value is True
+    assert list(result.timings) == [
+        "cli_handler",
+        "command_finder",
+        "appdir_handler",
+        "config_handler",
+        "command",
+    ]
+    assert not Path(tmp_path, "testapp", "log").exists()
+
+
+def test_undecorated_command_runs_every_stage(tmp_path):
+    result = make_app(tmp_path, run_everything).main()
+    assert result.value == "testuser"
+    assert len(result.timings) == 8
+
+
+def test_attached_handlers_run_with_their_stage(tmp_path):
+    calls = []
+
+    @declare(reads=["config"])
+    def after_config(app, ctx):
+        calls.append("after_config_handler")
+        return app, ctx
+
+    @declare(reads=["app.log"])
+    def after_logging(app, ctx):
+        calls.append("after_logging_config_handler")
+        return app, ctx
+
+    app = make_app(
+        tmp_path,
+        run_with_config,
+        after_config_handler=after_config,
+        after_logging_config_handler=after_logging,
+    )
+    assert app.main().value is True
+    assert calls == ["after_config_handler"]
+
+
+def test_undeclared_handlers_keep_the_command_finder_in_place(tmp_path):
+    calls = []
+
+    def before_appdir(app, ctx):
+        calls.append("before_appdir_handler")
+        return app, ctx
+
+    app = make_app(tmp_path, run, before_appdir_handler=before_appdir)
+    result = app.main()
+    assert list(result.timings) == [
+        "cli_handler",
+        "env_handler",
+        "before_appdir_handler",
+        "command_finder",
+        "command",
+    ]
+
+
+def test_unknown_required_stage(tmp_path):
+    @requires("database")
+    def run_with_database(ctx):
+        pass
+
+    app = make_app(
+        tmp_path, run_with_database, error_handler=lambda app, ctx, error: None
+    )
+    result = app.main()
+    assert result.failed_stage == "command_finder"
+    assert isinstance(result.error, LaunchError)
+    assert "`database`" in str(result.error)
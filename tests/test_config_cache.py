@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+import kapow.handlers.core
+from kapow import cache
+from tests.common import docopt_app
+
+
+def make_app(tmpdir, configs, appdirs_class=None, **kwargs):
+    def command_function(ctx):
+        configs.append(ctx.config)
+
+    return docopt_app(
+        tmpdir,
+        appdirs_class=appdirs_class,
+        config_handler=kapow.handlers.core.config_handler_factory(**kwargs),
+        command_func=command_function,
+    )
+
+
+def test_config_cache_round_trip(tmp_path, monkeypatch):
+    configs = []
+    app = make_app(tmp_path, configs, cache=True)
+
+    app.main()
+    cache_file = Path(tmp_path, "cache", "testapp", "testapp.config.cache")
+    assert cache_file.exists()
+    assert configs[0]["app"]["debug"] is True
+    assert type(configs[0]) is dict
+
+    # a second launch must not parse the toml file
+    def fail(*args, **kwargs):
+        raise AssertionError("tomlkit.loads should not be called")
+
+    monkeypatch.setattr("tomlkit.loads", fail)
+    app.main()
+    assert configs[1] == configs[0]
+
+
+def test_config_cache_invalidated_by_change(tmp_path):
+    configs = []
+    app = make_app(tmp_path, configs, cache=True)
+    app.main()
+
+    config_file = Path(tmp_path, "testapp", "testapp.config.ini")
+    stat = config_file.stat()
+    # same size and mtime, different content - caught by the hash
+    config_file.write_text(config_file.read_text().replace("true", "1234"))
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert config_file.stat().st_size == stat.st_size
+
+    app.main()
+    assert configs[1]["app"]["debug"] == 1234
+
+
+def test_config_cache_is_opt_in(tmp_path):
+    configs = []
+    app = make_app(tmp_path, configs)
+    app.main()
+
+    assert not Path(tmp_path, "cache").exists()
+    assert configs[0]["app"]["debug"] is True
+
+
+class NoCacheAppDirs:
+    """
+    An appdirs class without `user_cache_dir`.
+    """
+
+    def __init__(self, tmpdir):
+        self._dir = tmpdir
+
+    def __call__(self, name):
+        self.name = name
+        return self
+
+    @property
+    def user_data_dir(self):
+        return Path(self._dir, self.name)
+
+    @property
+    def user_log_dir(self):
+        return Path(self._dir, self.name, "logs")
+
+    @property
+    def user_name(self):
+        return "testuser"
+
+
+def test_appdirs_without_cache_dir(tmp_path):
+    configs = []
+    app = make_app(tmp_path, configs, appdirs_class=NoCacheAppDirs(tmp_path))
+    assert app.main().ok
+    assert configs[0]["app"]["debug"] is True
+
+    app = make_app(
+        tmp_path, configs, appdirs_class=NoCacheAppDirs(tmp_path), cache=True
+    )
+    app.error_handler = lambda app, ctx, error: None
+    result = app.main()
+    assert "dirs.cache_dir" in str(result.error)
+
+
+def test_cache_load_treats_corrupt_file_as_miss(tmp_path):
+    cache_file = Path(tmp_path, "corrupt.cache")
+    cache_file.write_bytes(b"not a pickle")
+    assert cache.load(cache_file, "key") is cache.MISSING
+
+    assert cache.store(cache_file, "key", {"a": 1})
+    assert cache.load(cache_file, "key") == {"a": 1}
+    assert cache.load(cache_file, "other") is cache.MISSING
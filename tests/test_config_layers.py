@@ -0,0 +1,134 @@
+from pathlib import Path
+import pytest
+import kapow.handlers.core
+from kapow import LaunchError
+from kapow.layers import merge
+from kapow.schema import Field
+from kapow.schema import Schema
+from tests.common import docopt_app
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def layers(tmp_path, monkeypatch):
+    write(
+        Path(tmp_path, "site", "testapp", "testapp.config.ini"),
+        '[app]\nname = "site"\nretries = 1\ntimeout = 10\n',
+    )
+    write(
+        Path(tmp_path, "testapp", "testapp.config.ini"),
+        '[app]\nname = "user"\nretries = 2\n',
+    )
+    project = Path(tmp_path, "project")
+    write(Path(project, ".testapp.config.ini"), '[app]\nname = "project"\n')
+    monkeypatch.chdir(project)
+    return tmp_path
+
+
+def make_app(tmpdir, parsed, cli_args=("run",), warm=False, env_handler=True, **kwargs):
+    def parser(content):
+        parsed.append(content)
+        return kapow.handlers.core.tomllib_parser(content)
+
+    return docopt_app(
+        tmpdir,
+        cli_args,
+        env_handler=env_handler,
+        config_handler=kapow.handlers.core.layered_config_handler_factory(
+            cli={"--debug": "app.debug"}, parser=parser, **kwargs
+        ),
+        command_func=lambda ctx: ctx.config,
+        warm=warm,
+    )
+
+
+def test_merge():
+    base = {"app": {"name": "a", "db": {"port": 1}}, "tags": [1]}
+    overlay = {"app": {"db": {"host": "h"}}, "tags": [2]}
+    assert merge(base, overlay) == {
+        "app": {"name": "a", "db": {"port": 1, "host": "h"}},
+        "tags": [2],
+    }
+    assert base["app"]["db"] == {"port": 1}
+
+
+def test_layers_are_merged_by_precedence(layers, monkeypatch):
+    monkeypatch.setenv("TESTAPP_APP__RETRIES", "5")
+    config = make_app(layers, []).main().value
+    assert config == {
+        "app": {"name": "project", "retries": 5, "timeout": 10},
+    }
+
+    config = make_app(layers, [], cli_args=["run", "--debug"]).main().value
+    assert config["app"]["debug"] is True
+
+    config = make_app(layers, [], precedence=("project", "user", "site")).main().value
+    assert config == {"app": {"name": "site", "retries": 1, "timeout": 10}}
+
+
+def test_only_changed_layers_are_parsed(layers):
+    parsed = []
+    make_app(layers, parsed).main()
+    assert len(parsed) == 3
+
+    parsed.clear()
+    assert make_app(layers, parsed).main().value["app"]["name"] == "project"
+    assert parsed == []
+
+    Path(layers, "project", ".testapp.config.ini").write_text(
+        '[app]\nname = "changed"\n'
+    )
+    assert make_app(layers, parsed).main().value["app"]["name"] == "changed"
+    assert parsed == ['[app]\nname = "changed"\n']
+
+
+def test_merged_config_is_not_validated_again(layers, monkeypatch):
+    schema = {"app": {"name": str, "retries": int, "debug": Field(bool, default=False)}}
+    settings = make_app(layers, [], schema=schema).main().value
+    assert settings.app.retries == 2
+    assert settings.app.debug is False
+
+    def fail(self, config):
+        raise AssertionError("the config should not be validated")
+
+    monkeypatch.setattr(Schema, "__call__", fail)
+    assert make_app(layers, [], schema=schema).main().value == settings
+
+
+def test_cli_layer_is_read_on_every_invocation(layers):
+    app = make_app(layers, [], warm=True)
+    assert "debug" not in app.main().value["app"]
+    app.cli_args = ["run", "--debug"]
+    assert app.main().value["app"]["debug"] is True
+
+
+def test_project_layer_follows_the_working_directory(layers, monkeypatch):
+    app = make_app(layers, [], warm=True, precedence=("user", "project"))
+    assert app.main().value["app"]["name"] == "project"
+
+    other = Path(layers, "other")
+    write(Path(other, ".testapp.config.ini"), '[app]\nname = "other"\n')
+    monkeypatch.chdir(other)
+    assert app.main().value["app"]["name"] == "other"
+
+
+def test_user_config_is_written(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = make_app(tmp_path, []).main().value
+    assert config["app"]["debug"] is True
+    assert Path(tmp_path, "testapp", "testapp.config.ini").exists()
+
+
+def test_unknown_layer():
+    with pytest.raises(LaunchError):
+        kapow.handlers.core.layered_config_handler_factory(precedence=("user", "db"))
+
+
+def test_env_layer_without_env_handler(layers, monkeypatch):
+    monkeypatch.setenv("TESTAPP_APP__RETRIES", "7")
+    app = make_app(layers, [], env_handler=None)
+    assert app.main().value["app"]["retries"] == 7
@@ -0,0 +1,53 @@
+import pytest
+import tomlkit
+import kapow.handlers.core
+from kapow import LaunchError
+from tests.common import docopt_app
+
+
+def run_app(tmp_path, **kwargs):
+    configs = []
+
+    def command_function(ctx):
+        configs.append(ctx.config)
+
+    docopt_app(
+        tmp_path,
+        config_handler=kapow.handlers.core.config_handler_factory(**kwargs),
+        command_func=command_function,
+    ).main()
+    return configs[0]
+
+
+def test_config_parser_default_is_tomlkit(tmp_path):
+    config = run_app(tmp_path)
+    assert isinstance(config, tomlkit.TOMLDocument)
+    assert config["app"]["debug"] is True
+
+
+def test_config_parser_tomllib(tmp_path):
+    pytest.importorskip("tomllib")
+    config = run_app(tmp_path, parser="tomllib")
+    assert type(config) is dict
+    assert config["app"]["debug"] is True
+
+
+def test_config_parser_custom_function(tmp_path):
+    def parser(content):
+        return {"length": len(content)}
+
+    config = run_app(tmp_path, parser=parser)
+    assert config["length"] > 0
+
+
+def test_config_parser_unknown():
+    with pytest.raises(LaunchError) as ex:
+        kapow.handlers.core.config_handler_factory(parser="yaml")
+    assert "Unknown config parser `yaml`" in str(ex.value)
+
+
+def test_config_parsers_agree():
+    content = '[app]\ndebug = true\nname = "x"\n[app.db]\nports = [1, 2]\n'
+    assert kapow.handlers.core.plain_config(
+        kapow.handlers.core.tomlkit_parser(content)
+    ) == kapow.handlers.core.tomllib_parser(content)
@@ -0,0 +1,120 @@
+import pickle
+from pathlib import Path
+import pytest
+import tomlkit
+import kapow.handlers.core
+from kapow import LaunchError
+from kapow.errors import ConfigError
+from kapow.schema import Field
+from kapow.schema import Schema
+from kapow.schema import Settings
+from tests.common import docopt_app
+
+SCHEMA = {
+    "app": {
+        "debug": Field(bool, default=False),
+        "wrk_dir": Path,
+        "retries": Field(int, default=3),
+        "tags": Field([str], default=[]),
+        "db": {"port": Field(int, default=5432)},
+    },
+}
+
+
+def test_schema_converts_config():
+    settings = Schema(SCHEMA)(
+        {"app": {"debug": "yes", "wrk_dir": "/tmp/wrk", "tags": ["a", "b"]}}
+    )
+    assert isinstance(settings, Settings)
+    assert settings.app.debug is True
+    assert settings.app.wrk_dir == Path("/tmp/wrk")
+    assert settings.app.retries == 3
+    assert settings.app.tags == ("a", "b")
+    assert settings["app"]["db"]["port"] == 5432
+
+
+def test_schema_accepts_tomlkit_documents():
+    doc = tomlkit.loads('[app]\nwrk_dir = "/tmp"\nretries = "5"\n')
+    settings = Schema(SCHEMA)(doc)
+    assert settings.app.retries == 5
+    assert settings.to_dict()["app"]["wrk_dir"] == Path("/tmp")
+
+
+def test_schema_reports_every_error():
+    with pytest.raises(ConfigError) as ex:
+        Schema(SCHEMA)({"app": {"debug": "maybe", "retries": True, "db": 1}})
+    assert ex.value.errors == [
+        "app.debug: expected bool, got 'maybe'",
+        "app.wrk_dir: missing required key",
+        "app.retries: expected int, got True",
+        "app.db: expected a table, got 1",
+    ]
+    assert isinstance(ex.value, LaunchError)
+
+
+def test_schema_extra_keys():
+    config = {"app": {"wrk_dir": "/tmp", "colour": "red"}, "other": {"a": [1]}}
+    settings = Schema(SCHEMA)(config)
+    assert settings.app.colour == "red"
+    assert settings.other.a == (1,)
+
+    with pytest.raises(ConfigError) as ex:
+        Schema(SCHEMA, allow_extra=False)(config)
+    assert ex.value.errors == ["app.colour: unknown key", "other: unknown key"]
+
+
+def test_schema_checks_defaults():
+    with pytest.raises(LaunchError):
+        Schema({"retries": Field(int, default="many")})
+
+
+def test_settings_are_read_only():
+    settings = Schema(SCHEMA)({"app": {"wrk_dir": "/tmp"}})
+    with pytest.raises(AttributeError):
+        settings.app.debug = True
+    with pytest.raises(TypeError):
+        settings.app["debug"] = True
+    assert pickle.loads(pickle.dumps(settings)) == settings
+
+
+def make_app(tmpdir, configs, **kwargs):
+    return docopt_app(
+        tmpdir,
+        config_handler=kapow.handlers.core.config_handler_factory(
+            schema=SCHEMA, **kwargs
+        ),
+        error_handler=lambda app, ctx, error: None,
+        command_func=lambda ctx: configs.append(ctx.config),
+    )
+
+
+def test_config_handler_with_schema(tmp_path):
+    configs = []
+    assert make_app(tmp_path, configs).main().ok
+    assert configs[0].app.debug is True
+    assert configs[0].app.wrk_dir == Path(tmp_path, "testapp", "wrk_dir")
+
+
+def test_config_handler_schema_errors(tmp_path):
+    configs = []
+    app = make_app(tmp_path, configs)
+    app.main()
+    config_file = Path(tmp_path, "testapp", "testapp.config.ini")
+    config_file.write_text(config_file.read_text().replace("true", '"sure"'))
+
+    result = app.main()
+    assert isinstance(result.error, ConfigError)
+    assert result.error.errors == ["app.debug: expected bool, got 'sure'"]
+
+
+def test_cached_settings_are_not_validated_again(tmp_path, monkeypatch):
+    configs = []
+    make_app(tmp_path, configs, cache=True).main()
+
+    def fail(self, config):
+        raise AssertionError("the config should not be validated")
+
+    monkeypatch.setattr(Schema, "__call__", fail)
+    make_app(tmp_path, configs, cache=True).main()
+    assert configs[1] == configs[0]
+    assert configs[1].app.debug is True
@@ -65,3 +65,28 @@ def test_confirm_error_func():
         pass
 
     assert confirm.error_func(test_handler) is None
+
+
+def test_confirm_directories_exist(tmp_path, monkeypatch):
+    app_home = Path(tmp_path, "app")
+    log_dir = Path(app_home, "logs")
+    other = Path(tmp_path, "other", "nested")
+
+    confirm.directories_exist(app_home, log_dir, other)
+    assert log_dir.is_dir()
+    assert other.is_dir()
+
+    # existing directories are not re-created
+    def fail(*args, **kwargs):
+        raise AssertionError("mkdir should not be called")
+
+    monkeypatch.setattr(Path, "mkdir", fail)
+    confirm.directories_exist(app_home, log_dir, other)
+
+
+def test_confirm_directories_exist_with_file(tmp_path):
+    this_file = Path(tmp_path, "dir", "file.txt")
+    this_file.parent.mkdir()
+    this_file.write_text("")
+    confirm.directories_exist(this_file)
+    assert this_file.is_file()
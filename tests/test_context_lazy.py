@@ -0,0 +1,97 @@
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+import kapow.handlers.core
+from kapow.context import Lazy
+from kapow.context import LazyContext
+from kapow.context import defer
+from tests.common import docopt_app
+
+
+def test_lazy_context_resolves_on_first_access():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 42
+
+    ctx = LazyContext()
+    defer(ctx, "answer", compute)
+    assert calls == []
+    assert isinstance(vars(ctx)["answer"], Lazy)
+    assert ctx.answer == 42
+    assert ctx.answer == 42
+    assert calls == [1]
+    assert vars(ctx)["answer"] == 42
+
+
+def test_defer_is_eager_for_other_contexts():
+    ctx = SimpleNamespace()
+    defer(ctx, "answer", lambda: 42)
+    assert vars(ctx)["answer"] == 42
+
+
+def make_app(tmpdir, command, **kwargs):
+    parsed = []
+
+    def parser(content):
+        parsed.append(content)
+        return kapow.handlers.core.tomlkit_parser(content)
+
+    app = docopt_app(
+        tmpdir,
+        context_class=LazyContext,
+        config_handler=kapow.handlers.core.config_handler_factory(parser=parser),
+        command_func=command,
+        **kwargs,
+    )
+    return app, parsed
+
+
+def test_lazy_config_is_not_read_by_commands_that_do_not_use_it(tmp_path):
+    app, parsed = make_app(tmp_path, lambda ctx: "no config")
+    result = app.main()
+    assert result.value == "no config"
+    assert parsed == []
+    assert not Path(tmp_path, "testapp", "testapp.config.ini").exists()
+
+
+def test_lazy_config_is_read_on_access(tmp_path):
+    app, parsed = make_app(tmp_path, lambda ctx: ctx.config["app"]["debug"])
+    assert app.main().value is True
+    assert len(parsed) == 1
+
+
+@pytest.mark.parametrize("snapshot", [False, True])
+def test_lazy_config_errors_are_raised_on_access(tmp_path, snapshot):
+    def validator(config):
+        raise ValueError("invalid config")
+
+    app = docopt_app(
+        tmp_path,
+        context_class=LazyContext,
+        config_handler=kapow.handlers.core.config_handler_factory(
+            config_validator=validator
+        ),
+        error_handler=lambda app, ctx, error: None,
+        command_func=lambda ctx: ctx.config,
+        snapshot=snapshot,
+    )
+    result = app.main()
+    assert result.failed_stage == "command"
+    assert str(result.error) == "invalid config"
+    # the failing config is not resolved again to write the snapshot
+    assert not Path(tmp_path, "cache", "testapp", "testapp.snapshot").exists()
+
+
+def test_lazy_config_is_read_once_by_warm_applications(tmp_path):
+    app, parsed = make_app(tmp_path, lambda ctx: ctx.config["app"]["debug"], warm=True)
+    assert app.main().value is True
+    assert app.main().value is True
+    assert len(parsed) == 1
+
+
+def test_lazy_env_vars(tmp_path, monkeypatch):
+    monkeypatch.setenv("TESTAPP_SETTING", "on")
+    app, _ = make_app(tmp_path, lambda ctx: ctx.env_vars)
+    assert app.main().value == {"TESTAPP_SETTING": "on"}
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+import pytest
+from kapow import LaunchError
+from kapow.handlers.docopt import CommandRegistry
+from kapow.handlers.docopt import docopt_command_finder
+from kapow.handlers.docopt import handlers
+
+
+def run_finder(finder, cli_args):
+    app = SimpleNamespace()
+    ctx = SimpleNamespace(cli_args=cli_args)
+    app, ctx = finder(app, ctx)
+    return getattr(app, "command", None)
+
+
+def make_commands():
+    def run(ctx):
+        pass
+
+    def db_init(ctx):
+        pass
+
+    def show_version(ctx):
+        pass
+
+    return SimpleNamespace(
+        run=run, db_init=db_init, show_version=show_version, not_a_function=1
+    )
+
+
+def test_docopt_command_finder_name_variants():
+    commands = make_commands()
+    finder = docopt_command_finder(commands)
+
+    assert run_finder(finder, {"run": True, "--debug": True}) is commands.run
+    assert run_finder(finder, {"db.init": True, "run": False}) is commands.db_init
+    assert run_finder(finder, {"show-version": True}) is commands.show_version
+    assert run_finder(finder, {"run": False, "--debug": True}) is None
+
+
+def test_docopt_command_finder_first_function_name_wins():
+    commands = make_commands()
+    finder = docopt_command_finder(commands)
+    # both match - `db_init` sorts before `run`, as with the original module scan
+    assert run_finder(finder, {"run": True, "db_init": True}) is commands.db_init
+
+
+def test_docopt_command_finder_indexes_once(monkeypatch):
+    calls = []
+    command_index = handlers.command_index
+
+    def counting_index(cmd_obj):
+        calls.append(cmd_obj)
+        return command_index(cmd_obj)
+
+    monkeypatch.setattr(handlers, "command_index", counting_index)
+    commands = make_commands()
+    finder = docopt_command_finder(commands)
+    for _ in range(3):
+        assert run_finder(finder, {"run": True}) is commands.run
+    assert len(calls) == 1
+
+
+def test_docopt_command_finder_registry():
+    commands = CommandRegistry()
+
+    @commands.register
+    def run(ctx):
+        pass
+
+    @commands.register("db-init", "db.init")
+    def initialize_database(ctx):
+        pass
+
+    finder = docopt_command_finder(commands)
+    assert run_finder(finder, {"run": True}) is run
+    assert run_finder(finder, {"db-init": True}) is initialize_database
+    assert run_finder(finder, {"initialize_database": True}) is None
+
+    with pytest.raises(LaunchError) as ex:
+
+        @commands.register("run")
+        def other(ctx):
+            pass
+
+    assert "`run` is already registered to `run`" in str(ex.value)
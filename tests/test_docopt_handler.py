@@ -0,0 +1,91 @@
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from docopt import DocoptExit
+from docopt import docopt
+from kapow.handlers.docopt import handlers
+from tests.common import TempAppDirs
+
+DOCS = """prog
+
+Usage:
+  prog run <name> [--count=<n>] [-v...]
+  prog stop [<names>...] [--force]
+  prog --version
+
+Options:
+  --count=<n>   Repeat count [default: 1].
+  --force       Force it.
+  -v            Verbosity.
+  -h --help     Show help.
+"""
+
+ARGVS = [
+    ["run", "x"],
+    ["run", "y", "--count=3", "-vvv"],
+    ["stop"],
+    ["stop", "a", "b", "--force"],
+    ["run", "x", "-v"],
+]
+
+
+def run_handler(argv, cache=False, tmp_path=None):
+    app = SimpleNamespace(
+        name="prog",
+        version="1.0",
+        cli_args=argv,
+        appdirs_class=TempAppDirs(tmp_path),
+    )
+    ctx = SimpleNamespace()
+    handler = handlers.docopt_handler(DOCS, cache=cache)
+    handler(app, ctx)
+    return ctx.cli_args
+
+
+@pytest.fixture(autouse=True)
+def clear_compiled():
+    handlers._compiled_docs.clear()
+    yield
+    handlers._compiled_docs.clear()
+
+
+def test_compiled_docopt_matches_docopt():
+    for argv in ARGVS * 2:
+        assert run_handler(argv) == docopt(DOCS, argv)
+
+
+def test_compiled_docopt_compiles_once(monkeypatch):
+    calls = []
+    compile_docs = handlers.compile_docs
+
+    def counting_compile(docs):
+        calls.append(docs)
+        return compile_docs(docs)
+
+    monkeypatch.setattr(handlers, "compile_docs", counting_compile)
+    for argv in ARGVS:
+        run_handler(argv)
+    assert len(calls) == 1
+
+
+def test_compiled_docopt_errors():
+    with pytest.raises(DocoptExit):
+        run_handler(["bogus"])
+
+    with pytest.raises(SystemExit):
+        run_handler(["--version"])
+
+
+def test_compiled_docopt_persistent_cache(tmp_path, monkeypatch):
+    assert run_handler(["run", "x"], cache=True, tmp_path=tmp_path)["<name>"] == "x"
+    assert Path(tmp_path, "cache", "prog", "prog.docopt.cache").exists()
+
+    # a new process only loads the cached grammar
+    handlers._compiled_docs.clear()
+
+    def fail(docs):
+        raise AssertionError("the grammar should be loaded from the cache")
+
+    monkeypatch.setattr(handlers, "compile_docs", fail)
+    args = run_handler(["stop", "a"], cache=True, tmp_path=tmp_path)
+    assert args == docopt(DOCS, ["stop", "a"])
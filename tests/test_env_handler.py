@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+import pytest
+from kapow.errors import ConfigError
+from kapow.handlers.core import env_handler_factory
+from kapow.handlers.core import parse_env_value
+
+
+def run_handler(handler, name="testapp"):
+    app = SimpleNamespace(name=name)
+    app, ctx = handler(app, SimpleNamespace())
+    return ctx
+
+
+def test_parse_env_value():
+    assert parse_env_value("true") is True
+    assert parse_env_value("Off") is False
+    assert parse_env_value("10") == 10
+    assert parse_env_value("1.5") == 1.5
+    assert parse_env_value("hello") == "hello"
+
+
+def test_env_handler_nested_typed_view(monkeypatch):
+    monkeypatch.setenv("TESTAPP_DEBUG", "true")
+    monkeypatch.setenv("TESTAPP_DB__POOL_SIZE", "10")
+    monkeypatch.setenv("TESTAPP_DB__HOST", "localhost")
+    monkeypatch.setenv("OTHERAPP_DB__HOST", "elsewhere")
+
+    ctx = run_handler(env_handler_factory())
+
+    assert ctx.env == {"debug": True, "db": {"pool_size": 10, "host": "localhost"}}
+    assert ctx.env_vars["TESTAPP_DB__POOL_SIZE"] == "10"
+    assert "OTHERAPP_DB__HOST" not in ctx.env_vars
+
+
+def test_env_handler_schema(monkeypatch):
+    monkeypatch.setenv("MY_DB__POOL_SIZE", "10")
+    monkeypatch.setenv("MY_DB__HOST", "1234")
+    monkeypatch.setenv("MY_VERBOSE", "1")
+    monkeypatch.setenv("MY_UNDECLARED", "x")
+
+    schema = {"db.pool_size": int, "db.host": str, "verbose": bool, "missing": int}
+    ctx = run_handler(env_handler_factory(schema=schema, prefix="MY_"))
+
+    assert ctx.env == {"db": {"pool_size": 10, "host": "1234"}, "verbose": True}
+    assert "MY_UNDECLARED" not in ctx.env_vars
+
+
+def test_env_handler_reuses_unchanged_view(monkeypatch):
+    monkeypatch.setenv("TESTAPP_DB__POOL_SIZE", "10")
+    handler = env_handler_factory()
+
+    first = run_handler(handler).env
+    assert run_handler(handler).env is first
+
+    monkeypatch.setenv("TESTAPP_DB__POOL_SIZE", "20")
+    second = run_handler(handler).env
+    assert second is not first
+    assert second["db"]["pool_size"] == 20
+
+
+def test_env_handler_schema_errors(monkeypatch):
+    monkeypatch.setenv("MY_VERBOSE", "maybe")
+    monkeypatch.setenv("MY_DB__POOL_SIZE", "ten")
+
+    schema = {"db.pool_size": int, "verbose": bool}
+    with pytest.raises(ConfigError) as ex:
+        run_handler(env_handler_factory(schema=schema, prefix="MY_"))
+    assert ex.value.errors == [
+        "MY_DB__POOL_SIZE: expected int, got 'ten'",
+        "MY_VERBOSE: expected bool, got 'maybe'",
+    ]
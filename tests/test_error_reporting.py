@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+import pytest
+import kapow.handlers.core
+from kapow import console
+from kapow import reporting
+from kapow.errors import LaunchError
+
+APP = SimpleNamespace(name="testapp")
+
+
+def raise_error(message="bad value"):
+    try:
+        raise ValueError(message)
+    except ValueError as ex:
+        return ex
+
+
+def test_plain_error_handler(capsys):
+    handler = kapow.handlers.core.error_handler_factory("plain")
+    handler(APP, None, raise_error())
+    output = capsys.readouterr().out
+    assert "testapp failed with error: bad value" in output
+    assert "Traceback (most recent call last)" in output
+    assert "ValueError: bad value" in output
+
+
+def test_json_error_handler(capsys):
+    handler = kapow.handlers.core.error_handler_factory("json")
+    handler(APP, None, raise_error())
+    record = json.loads(capsys.readouterr().out)
+    assert record["app"] == "testapp"
+    assert record["error"] == "bad value"
+    assert record["type"] == "builtins.ValueError"
+    assert "ValueError: bad value" in record["traceback"]
+    assert record["count"] == 1
+
+
+def test_repeated_errors_suppress_traceback(capsys):
+    handler = kapow.handlers.core.error_handler_factory("json", traceback_limit=2)
+    for _ in range(3):
+        handler(APP, None, raise_error())
+    handler(APP, None, raise_error("other value"))
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["count"] for r in records] == [1, 2, 3, 1]
+    assert [r["traceback"] is None for r in records] == [False, False, True, False]
+
+
+def test_traceback_limiter_window(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(reporting.time, "monotonic", lambda: now[0])
+    limiter = reporting.TracebackLimiter(limit=1, window=60)
+    error = raise_error()
+    assert limiter.allow(error) == (True, 1)
+    assert limiter.allow(error) == (False, 2)
+    now[0] += 61
+    assert limiter.allow(error) == (True, 1)
+
+
+def test_unknown_backend():
+    with pytest.raises(LaunchError):
+        kapow.handlers.core.error_handler_factory("html")
+
+
+def test_is_terminal(monkeypatch):
+    monkeypatch.delenv("FORCE_COLOR", raising=False)
+    monkeypatch.setattr(console, "_console", None)
+    assert console.is_terminal(io.StringIO()) is False
+    monkeypatch.setenv("FORCE_COLOR", "1")
+    assert console.is_terminal(io.StringIO()) is True
+
+
+def test_default_error_handler_without_terminal_does_not_import_rich():
+    code = (
+        "import sys, types, kapow.handlers.core\n"
+        "try:\n"
+        "    raise ValueError('no rich')\n"
+        "except ValueError as ex:\n"
+        "    kapow.handlers.core.error_handler(types.SimpleNamespace(name='x'), None, ex)\n"
+        "print('rich' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={k: v for k, v in os.environ.items() if k != "FORCE_COLOR"},
+    )
+    assert "x failed with error: no rich" in result.stdout
+    assert result.stdout.strip().endswith("False")
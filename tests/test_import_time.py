@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+# the import time budget is checked by benchmarks/bench_startup.py
+
+LAZY_MODULES = [
+    "tomlkit",
+    "rich",
+    "docopt",
+    "logging",
+    "logging.config",
+    "tracemalloc",
+    "json",
+    "pwd",
+]
+
+
+def run_python(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_kapow_does_not_load_heavy_dependencies():
+    result = run_python(
+        "import sys, kapow, kapow.handlers.docopt, kapow.handlers.argparse;"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    assert result.stdout.strip() == ""
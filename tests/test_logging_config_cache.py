@@ -0,0 +1,91 @@
+import logging
+import logging.config
+import logging.handlers
+import sys
+from importlib.resources import files
+from pathlib import Path
+import kapow.handlers.core
+from kapow import logconfig
+from kapow import resources
+from tests.common import docopt_app
+
+
+def make_app(tmpdir, command, **kwargs):
+    return docopt_app(
+        tmpdir,
+        logging_config_handler=kapow.handlers.core.logging_config_factory(cache=True),
+        command_func=command,
+        **kwargs,
+    )
+
+
+def test_compile_ini_matches_default_logging_config(tmp_path):
+    ini = files(resources).joinpath("logging.ini").read_text()
+    log_file = Path(tmp_path, "test.logs.txt")
+    ini_file = Path(tmp_path, "test.logging.ini")
+    ini_file.write_text(ini.format(appname="testapp", logfile=log_file))
+
+    config = logconfig.compile_ini(ini_file)
+
+    assert config["root"] == {"handlers": ["console", "logfile"], "level": "DEBUG"}
+    assert config["loggers"]["testapp"]["propagate"] is False
+    assert config["handlers"]["console"] == {
+        "class": "logging.StreamHandler",
+        "stream": "ext://sys.stdout",
+        "level": "DEBUG",
+        "formatter": "simple",
+    }
+    assert config["handlers"]["logfile"]["filename"] == str(log_file)
+    assert config["handlers"]["logfile"]["maxBytes"] == 500000
+    assert config["handlers"]["logfile"]["backupCount"] == 10
+    assert config["formatters"]["precise"]["format"] == "%(asctime)s|%(message)s"
+
+    logging.config.dictConfig(config)
+    try:
+        handlers = logging.getLogger("testapp").handlers
+        assert isinstance(handlers[0], logging.StreamHandler)
+        assert handlers[0].stream is sys.stdout
+        assert isinstance(handlers[1], logging.handlers.RotatingFileHandler)
+        logging.getLogger("testapp").info("compiled message")
+        assert "compiled message" in log_file.read_text()
+    finally:
+        for handler in handlers:
+            handler.close()
+
+
+def test_compile_ini_returns_none_for_evaluated_args(tmp_path):
+    ini_file = Path(tmp_path, "test.logging.ini")
+    ini_file.write_text(
+        "[loggers]\nkeys=root\n\n"
+        "[handlers]\nkeys=console\n\n"
+        "[formatters]\nkeys=\n\n"
+        "[logger_root]\nhandlers=console\n\n"
+        "[handler_console]\nclass=StreamHandler\nargs=(open('x'),)\n"
+    )
+    assert logconfig.compile_ini(ini_file) is None
+
+
+def test_logging_config_cache_skips_repeated_configuration(tmp_path):
+    def command(ctx):
+        logging.getLogger("testapp").info("cached message")
+
+    app = make_app(tmp_path, command)
+    logconfig.forget()
+
+    app.main()
+    handlers = list(logging.root.handlers)
+    cache_file = Path(tmp_path, "cache", "testapp", "testapp.logging.cache")
+    assert cache_file.exists()
+
+    # a second run in the same process keeps the configured handlers
+    app.main()
+    assert logging.root.handlers == handlers
+
+    log_file = Path(tmp_path, "testapp", "logs", "testapp.logs.txt")
+    assert log_file.read_text().count("cached message") == 2
+
+    # reconfiguring logging elsewhere is noticed
+    logging.root.handlers = []
+    app.main()
+    assert logging.root.handlers != []
+    assert logging.root.handlers != handlers
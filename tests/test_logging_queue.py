@@ -0,0 +1,56 @@
+import logging
+import logging.handlers
+from pathlib import Path
+import kapow.handlers.core
+from kapow import logqueue
+from tests.common import docopt_app
+
+
+def make_app(tmpdir, command, **kwargs):
+    return docopt_app(
+        tmpdir,
+        logging_config_handler=kapow.handlers.core.logging_config_factory(queue=True),
+        command_func=command,
+        **kwargs,
+    )
+
+
+def test_logging_queue_routes_records_to_listener(tmp_path):
+    def command(ctx):
+        logging.getLogger("testapp").info("queued message")
+
+    app = make_app(tmp_path, command)
+    try:
+        app.main()
+
+        app_logger = logging.getLogger("testapp")
+        assert len(app_logger.handlers) == 1
+        assert isinstance(app_logger.handlers[0], logging.handlers.QueueHandler)
+        assert len(app.log_listeners) == 2
+
+        logqueue.flush(app)
+        log_file = Path(tmp_path, "testapp", "logs", "testapp.logs.txt")
+        assert "queued message" in log_file.read_text()
+
+        # a second run replaces the listeners rather than adding more
+        app.main()
+        assert len(app.log_listeners) == 2
+    finally:
+        logqueue.stop(app)
+
+    assert app.log_listeners == []
+
+
+def test_logging_queue_flushed_by_error_handler(tmp_path, capsys):
+    def command(ctx):
+        logging.getLogger("testapp").info("before the failure")
+        raise Exception("command failed")
+
+    app = make_app(tmp_path, command)
+    try:
+        app.main()
+        log_file = Path(tmp_path, "testapp", "logs", "testapp.logs.txt")
+        assert "before the failure" in log_file.read_text()
+        assert "command failed" in capsys.readouterr().out
+    finally:
+        logqueue.stop(app)
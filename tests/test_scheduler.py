@@ -0,0 +1,166 @@
+import threading
+from common import Handler
+from kapow import Application
+from kapow import scheduler
+from kapow.handlers import docopt
+from kapow.spec import declare
+from tests.common import CLI_DOCS
+from tests.common import TempAppDirs
+
+
+def test_scheduler_plan_default_handlers():
+    app = Application(
+        "test",
+        "0.1.0",
+        cli_handler=docopt.docopt_handler(CLI_DOCS),
+        command_finder=docopt.docopt_command_finder(lambda ctx: None),
+    )
+    assert scheduler.plan(app) == [
+        ["cli_handler", "env_handler", "appdir_handler", "context_handler"],
+        ["config_handler", "logging_config_handler", "command_finder"],
+    ]
+
+
+def test_scheduler_plan_undeclared_handlers_are_barriers():
+    messages = []
+    app = Application(
+        "test",
+        "0.1.0",
+        env_handler=Handler("ENV", messages),
+        command_finder=Handler("CMD", messages).command(),
+    )
+    assert scheduler.plan(app) == [
+        ["cli_handler"],
+        ["env_handler"],
+        ["appdir_handler", "context_handler"],
+        ["config_handler", "logging_config_handler"],
+        ["command_finder"],
+    ]
+
+
+def test_scheduler_runs_independent_handlers_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    threads = set()
+
+    @declare(writes=["a"])
+    def handler_a(app, ctx):
+        barrier.wait()
+        threads.add(threading.get_ident())
+        ctx.a = 1
+        return app, ctx
+
+    @declare(writes=["b"])
+    def handler_b(app, ctx):
+        barrier.wait()
+        threads.add(threading.get_ident())
+        ctx.b = 2
+        return app, ctx
+
+    results = []
+
+    def command(ctx):
+        results.append((ctx.a, ctx.b))
+
+    app = Application(
+        "test",
+        "0.1.0",
+        cli_handler=None,
+        env_handler=handler_a,
+        appdir_handler=handler_b,
+        config_handler=None,
+        context_handler=None,
+        logging_config_handler=None,
+        command_func=command,
+        main_factory=scheduler.parallel_main_factory(max_workers=2),
+    )
+    app.main()
+
+    assert results == [(1, 2)]
+    assert len(threads) == 2
+
+
+def test_scheduler_default_pipeline(tmp_path):
+    results = []
+
+    def command(ctx):
+        results.append(ctx)
+
+    app = Application(
+        name="testapp",
+        version="0.0.1",
+        cli_handler=docopt.docopt_handler(CLI_DOCS),
+        command_finder=docopt.docopt_command_finder(command),
+        main_factory=scheduler.parallel_main_factory(),
+        profile=True,
+    )
+    app.initialize(cli_args=["run"], appdirs_class=TempAppDirs(tmp_path))
+    app.main()
+
+    ctx = results[0]
+    assert ctx.config["app"]["debug"] is True
+    assert ctx.files.config.exists()
+    assert ctx.files.logging_config.exists()
+    assert ctx.cli_args["run"] is True
+    assert len(app.profiler.timings) == 8
+
+
+def test_scheduler_error_in_concurrent_handler():
+    messages = []
+
+    @declare(writes=["a"])
+    def handler_a(app, ctx):
+        raise Exception("handler_a failed")
+
+    @declare(writes=["b"])
+    def handler_b(app, ctx):
+        return app, ctx
+
+    app = Application(
+        "test",
+        "0.1.0",
+        cli_handler=None,
+        env_handler=handler_a,
+        appdir_handler=handler_b,
+        config_handler=None,
+        context_handler=None,
+        logging_config_handler=None,
+        command_finder=Handler("CMD", messages).command(),
+        error_handler=Handler("ERR", messages).error_handler(),
+        main_factory=scheduler.parallel_main_factory(),
+    )
+    app.main()
+
+    assert messages == ["ERR handler_a failed"]
+
+
+def test_scheduler_async_command_and_handlers():
+    @declare(writes=["a"])
+    async def handler_a(app, ctx):
+        ctx.a = 1
+        return app, ctx
+
+    async def command(ctx):
+        return ctx.a + 1
+
+    def make_app(env_handler):
+        return Application(
+            "test",
+            "0.1.0",
+            cli_handler=None,
+            env_handler=env_handler,
+            appdir_handler=None,
+            config_handler=None,
+            context_handler=None,
+            logging_config_handler=None,
+            command_func=command,
+            main_factory=scheduler.parallel_main_factory(),
+        )
+
+    assert make_app(handler_a).main().value == 2
+
+    @declare(writes=["a"])
+    def sync_handler_a(app, ctx):
+        ctx.a = 2
+        return app, ctx
+
+    assert make_app(sync_handler_a).main().value == 3
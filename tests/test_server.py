@@ -0,0 +1,162 @@
+import os
+import socket
+import stat
+import subprocess
+import sys
+import time
+from pathlib import Path
+import pytest
+from kapow import Application
+from kapow.server import peer_uid
+from tests.common import Handler
+
+ROOT = Path(__file__).parent.parent
+
+SERVER = """
+import os
+import sys
+from kapow import Application
+from kapow.handlers import docopt
+from kapow.spec import once
+from tests.common import CLI_DOCS
+from tests.common import TempAppDirs
+
+calls = []
+
+
+@once
+def config_handler(app, ctx):
+    calls.append(1)
+    ctx.config = {}
+    return app, ctx
+
+
+def command(ctx):
+    print(
+        f"calls={len(calls)} cwd={os.getcwd()} "
+        f"value={os.environ.get('KAPOW_TEST_VALUE')}"
+    )
+    if ctx.cli_args["--debug"]:
+        raise Exception("debug failure")
+
+
+app = Application(
+    name="testapp",
+    version="0.0.1",
+    cli_handler=docopt.docopt_handler(CLI_DOCS),
+    config_handler=config_handler,
+    logging_config_handler=None,
+    command_func=command,
+)
+if sys.argv[3:] == ["other-user"]:
+    # every client looks like another user
+    import kapow.server
+
+    kapow.server.peer_uid = lambda conn: os.getuid() + 1
+
+app.initialize(appdirs_class=TempAppDirs(sys.argv[2]))
+app.serve(sys.argv[1], max_requests=3)
+"""
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="server mode requires os.fork"
+)
+
+
+def client(socket_path, *args, cwd):
+    env = dict(os.environ, PYTHONPATH=str(ROOT), KAPOW_TEST_VALUE="from client")
+    return subprocess.run(
+        [sys.executable, "-m", "kapow.client", str(socket_path), *args],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env=env,
+        timeout=30,
+    )
+
+
+def start_server(tmp_path, *args):
+    socket_path = Path(tmp_path, "testapp.sock")
+    script = Path(tmp_path, "server.py")
+    script.write_text(SERVER)
+    server = subprocess.Popen(
+        [sys.executable, str(script), str(socket_path), str(tmp_path), *args],
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=str(ROOT)),
+        umask=0o002,
+    )
+    for _ in range(200):
+        if socket_path.exists():
+            break
+        time.sleep(0.05)
+    return server, socket_path
+
+
+def test_server_runs_commands_for_clients(tmp_path):
+    server, socket_path = start_server(tmp_path)
+    try:
+        assert socket_path.exists()
+        assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+
+        workdir = Path(tmp_path, "work")
+        workdir.mkdir()
+        result = client(socket_path, "run", cwd=workdir)
+        assert result.returncode == 0
+        assert f"calls=1 cwd={workdir} value=from client" in result.stdout
+
+        result = client(socket_path, "run", "--debug", cwd=workdir)
+        assert result.returncode == 1
+        assert "calls=1" in result.stdout
+        assert "debug failure" in result.stdout
+
+        result = client(socket_path, "--version", cwd=workdir)
+        assert result.returncode == 0
+        assert "0.0.1" in result.stdout
+
+        assert server.wait(timeout=30) == 0
+        assert not socket_path.exists()
+    finally:
+        server.kill()
+        server.wait()
+
+
+def test_server_refuses_other_users(tmp_path):
+    server, socket_path = start_server(tmp_path, "other-user")
+    try:
+        assert socket_path.exists()
+        result = client(socket_path, "run", cwd=tmp_path)
+        assert result.returncode == 1
+        assert "calls=" not in result.stdout
+    finally:
+        server.kill()
+        server.wait()
+
+
+def test_peer_uid():
+    a, b = socket.socketpair(socket.AF_UNIX)
+    with a, b:
+        assert peer_uid(a) in (os.getuid(), None)
+
+
+def test_server_option_runs_locally_without_a_server(tmp_path):
+    messages = []
+    app = Application(
+        name="testapp",
+        version="0.0.1",
+        cli_handler=None,
+        env_handler=None,
+        appdir_handler=None,
+        config_handler=None,
+        context_handler=None,
+        logging_config_handler=None,
+        command_finder=Handler("FINDER", messages).command(),
+        server=Path(tmp_path, "missing.sock"),
+    )
+    app.main()
+    assert messages == ["FINDER HANDLER", "FINDER CALLED"]
+
+
+def test_client_without_server(tmp_path):
+    result = client(Path(tmp_path, "missing.sock"), "run", cwd=tmp_path)
+    assert result.returncode == 1
+    assert "No kapow server is listening" in result.stderr